@@ -0,0 +1,55 @@
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey
+from zero_knowledge_proofs.ff_based.linear_algebra.modular_exponantiation import ModularExponantiation
+from zero_knowledge_proofs.ff_based.proof_signature_from_set import dummy_data
+
+from petlib.bn import Bn
+from time import time
+import csv
+
+# A 128 bit exponent stands for the large ones
+EXPONENTS = [3, 17, 65537, 0xb7e151628aed2a6abf7158809cf4f3c7]
+
+
+def exponent_chains(exponents=EXPONENTS, repetitions=1):
+    """
+    Number of steps (squarings and multiplications) of the chain of each exponent, compared to the right to left
+    binary decomposition used before, and time to prove and verify the modular exponentiation with it.
+    """
+    G = FFGroup()
+    order = G.order()
+    com_pk = PublicKey(G, 1)
+    signature, _, _, modulo = dummy_data()
+    random_commitment_modulo = order.random()
+    commitment_modulo = com_pk.commit([modulo], random_commitment_modulo)
+
+    with open('./exponent_chains.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['exponent', 'squarings', 'multiplications', 'binary_steps', 'proof', 'verification'])
+        for exponent in exponents:
+            chain = ModularExponantiation.chain(exponent)
+            squarings = sum(1 for index_1, index_2 in chain if index_1 == index_2)
+            binary_steps = exponent.bit_length() - 1 + bin(exponent).count('1')
+            message = signature.mod_pow(Bn.from_decimal(str(exponent)), modulo)
+
+            time_proof = 0
+            time_verification = 0
+            for _ in range(repetitions):
+                time_start = time()
+                proof = ModularExponantiation(com_pk, signature, message, modulo, commitment_modulo,
+                                              random_commitment_modulo, exponent=exponent)
+                time_proof += time() - time_start
+                time_start = time()
+                assert proof.verify(com_pk, message, commitment_modulo, exponent=exponent)
+                time_verification += time() - time_start
+            time_proof /= repetitions
+            time_verification /= repetitions
+
+            filewriter.writerow([exponent, squarings, len(chain) - squarings, binary_steps, time_proof,
+                                 time_verification])
+            print("Exponent: ", exponent, " steps: ", len(chain), " (binary: ", binary_steps, ") proof: ", time_proof,
+                  " verification: ", time_verification)
+
+
+if __name__ == '__main__':
+    exponent_chains()
@@ -0,0 +1,73 @@
+from petlib.bn import Bn
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey
+from primitives.ring import KeyRing
+from zero_knowledge_proofs.ff_based.proof_one_out_of_many_ff import OneOutOfManyProof
+from zero_knowledge_proofs.ff_based.proof_poly_eval_ff import PolynomialProof
+
+from time import time
+import csv
+
+
+def engine_times(com_pk, key_ring, index):
+    """
+    Time proving and verifying membership of key_ring.moduli[index] with both engines of ProofSignatureSet.
+    """
+    order = com_pk.order
+    modulus = key_ring.moduli[index]
+    random = order.random()
+    commitment = com_pk.commit([modulus], random)
+    commitment_zero = com_pk.commit([Bn.from_num(0)], Bn.from_num(0))
+
+    time_start = time()
+    proof = PolynomialProof(com_pk, key_ring, commitment, commitment_zero, modulus, Bn.from_num(0), random,
+                            Bn.from_num(0))
+    time_polynomial_proof = time() - time_start
+    time_start = time()
+    assert proof.verify(com_pk, key_ring, commitment, commitment_zero)
+    time_polynomial_verification = time() - time_start
+
+    time_start = time()
+    proof = OneOutOfManyProof(com_pk, key_ring, commitment, modulus, random)
+    time_one_out_of_many_proof = time() - time_start
+    time_start = time()
+    assert proof.verify(com_pk, key_ring, commitment)
+    time_one_out_of_many_verification = time() - time_start
+
+    return time_polynomial_proof, time_polynomial_verification, time_one_out_of_many_proof, \
+        time_one_out_of_many_verification
+
+
+def crossover(sizes_ring=[2 ** k for k in range(2, 15)]):
+    """
+    Compare the membership engines by ring size, and report from which size on the one-out-of-many engine verifies
+    faster. The ring polynomial needed by the polynomial engine is built beforehand and not counted.
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+
+    crossover_size = None
+    with open('./membership_engines.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['size', 'polynomial_proof', 'polynomial_verification', 'one_out_of_many_proof',
+                             'one_out_of_many_verification'])
+        for size in sizes_ring:
+            key_ring = KeyRing([order.random() for _ in range(size)], order)
+            times = engine_times(com_pk, key_ring, size // 2)
+            filewriter.writerow([size] + list(times))
+            print("Ring size: ", size)
+            print("    polynomial: proof ", times[0], " verification ", times[1])
+            print("    one-out-of-many: proof ", times[2], " verification ", times[3])
+
+            if times[3] < times[1] and crossover_size is None:
+                crossover_size = size
+            elif times[3] >= times[1]:
+                crossover_size = None
+
+    print("One-out-of-many verifies faster from ring size: ", crossover_size)
+    return crossover_size
+
+
+if __name__ == '__main__':
+    crossover()
@@ -0,0 +1,51 @@
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey
+from zero_knowledge_proofs.ff_based.linear_algebra.modular_exponantiation import ModularExponantiation
+from zero_knowledge_proofs.ff_based.proof_signature_from_set import dummy_data
+
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+import csv
+import os
+
+
+def parallel_steps(workers_list=(None, 2, 4), repetitions=2):
+    """
+    Time to prove and verify the modular exponentiation of an RSA signature with the step proofs generated, and the
+    group equations checked, by pools of different sizes. The pool is started before the measurement, so that its
+    start-up cost is left out, as it is for a long running prover.
+    """
+    G = FFGroup()
+    order = G.order()
+    com_pk = PublicKey(G, 1)
+    signature, message, exponent, modulo = dummy_data()
+    random_commitment_modulo = order.random()
+    commitment_modulo = com_pk.commit([modulo], random_commitment_modulo)
+
+    with open('./parallel_steps.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['workers', 'cores', 'proof', 'verification'])
+        for workers in workers_list:
+            executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+            time_proof = 0
+            time_verification = 0
+            for _ in range(repetitions):
+                time_start = time()
+                proof = ModularExponantiation(com_pk, signature, message, modulo, commitment_modulo,
+                                              random_commitment_modulo, exponent=exponent, workers=executor)
+                time_proof += time() - time_start
+                time_start = time()
+                assert proof.verify(com_pk, message, commitment_modulo, workers=executor)
+                time_verification += time() - time_start
+            if executor:
+                executor.shutdown()
+            time_proof /= repetitions
+            time_verification /= repetitions
+
+            filewriter.writerow([workers, os.cpu_count(), time_proof, time_verification])
+            print("Workers: ", workers, " cores: ", os.cpu_count(), " proof: ", time_proof, " verification: ",
+                  time_verification)
+
+
+if __name__ == '__main__':
+    parallel_steps()
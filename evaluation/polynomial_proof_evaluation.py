@@ -0,0 +1,212 @@
+from petlib.bn import Bn
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey
+from primitives.polynomial import Polynomial
+from primitives.ring import KeyRing
+from zero_knowledge_proofs.ff_based.proof_poly_eval_ff import PolynomialProof
+
+from functools import reduce
+from random import Random
+from time import time
+import csv
+import math
+import os
+
+
+def naive_hidden_polynomial_computation(polynomial, value_to_eval, random_hidden, bit_length, order):
+    """
+    Former computation of the deltas, expanding bit_length + 1 small polynomials per coefficient. Kept as the
+    reference for the benchmark.
+    """
+    final_poly = Polynomial([0], modulo=order)
+    for i in range(len(polynomial)):
+        bin_repr_i = PolynomialProof.binary_repr_int(i, bit_length + 1)
+        temp_poly = []
+        for j in range(bit_length + 1):
+            temp_poly.append(
+                (Polynomial([random_hidden[j], value_to_eval.mod_pow(int(math.pow(2, j)), order)], modulo=order) **
+                 bin_repr_i[j]) * Polynomial([bin_repr_i[j], (1 - bin_repr_i[j])], modulo=order))
+
+        final_poly += reduce(lambda a, b: a * b, temp_poly) * polynomial[i]
+
+    return final_poly.coefficients[:bit_length + 1]
+
+
+def delta_computation(sizes_ring=[2 ** k for k in range(4, 17)], naive_limit=2 ** 10):
+    """
+    Time the computation of the deltas of PolynomialProof, with the bit folding and (for rings up to naive_limit)
+    with the former per-coefficient expansion.
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+
+    with open('./delta_computation.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        for size in sizes_ring:
+            polynomial_list = [order.random() for _ in range(size + 1)]
+            value_to_eval = order.random()
+            proof = PolynomialProof.__new__(PolynomialProof)
+            proof.order = order
+            proof.polynomial = polynomial_list
+            proof.bit_length = PolynomialProof.index_bit_length(size + 1)
+            random_hidden = [order.random() for _ in range(proof.bit_length + 1)]
+
+            time_start = time()
+            powers = PolynomialProof.square_ladder(value_to_eval, proof.bit_length + 1, order)
+            deltas = proof.hidden_polynomial_computation(powers, random_hidden)
+            time_folding = time() - time_start
+
+            time_naive = None
+            if size <= naive_limit:
+                time_start = time()
+                naive_deltas = naive_hidden_polynomial_computation(polynomial_list, value_to_eval, random_hidden,
+                                                                   proof.bit_length, order)
+                time_naive = time() - time_start
+                assert naive_deltas == deltas[:len(naive_deltas)]
+
+            filewriter.writerow([size, time_folding, time_naive])
+            print("Ring size: ", size, " folding: ", time_folding, " naive: ", time_naive)
+
+
+def proof_times(com_pk, polynomial_list, root):
+    """
+    Time proving and verifying that the ring polynomial given by polynomial_list vanishes at root.
+    """
+    order = com_pk.order
+    random_to_eval = order.random()
+    commitment_to_eval = com_pk.commit([root], random_to_eval)
+    random_eval = order.random()
+    commitment_eval = com_pk.commit([Bn.from_num(0)], random_eval)
+
+    time_start = time()
+    proof = PolynomialProof(com_pk, polynomial_list, commitment_to_eval, commitment_eval, root, Bn.from_num(0),
+                            random_to_eval, random_eval)
+    time_proof = time() - time_start
+
+    time_start = time()
+    assert proof.verify(com_pk, polynomial_list, commitment_to_eval, commitment_eval)
+    time_verification = time() - time_start
+
+    return time_proof, time_verification
+
+
+def sizes_above_powers_of_two(exponents=range(4, 13)):
+    """
+    Time PolynomialProof for rings of 2^k and 2^k + 1 keys, against the former behaviour that padded the polynomial
+    with zeros up to the next power of two in the degree.
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+
+    with open('./polynomial_proof_sizes.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['size', 'bits', 'proof', 'verification', 'padded_bits', 'padded_proof',
+                             'padded_verification'])
+        for exponent in exponents:
+            for size in [2 ** exponent, 2 ** exponent + 1]:
+                roots = [order.random() for _ in range(size)]
+                polynomial_list = Polynomial.from_roots_opt(roots, order).coefficients
+                padded_bits = int(math.ceil(math.log(size, 2))) + 1
+                padded_list = polynomial_list + [Bn.from_num(0)] * (2 ** padded_bits - len(polynomial_list))
+
+                time_proof, time_verification = proof_times(com_pk, polynomial_list, roots[0])
+                padded_time_proof, padded_time_verification = proof_times(com_pk, padded_list, roots[0])
+
+                bits = PolynomialProof.index_bit_length(len(polynomial_list)) + 1
+                filewriter.writerow([size, bits, time_proof, time_verification, padded_bits, padded_time_proof,
+                                     padded_time_verification])
+                print("Ring size: ", size, " bits: ", bits, " proof: ", time_proof, " verification: ",
+                      time_verification)
+                print("    padded bits: ", padded_bits, " proof: ", padded_time_proof, " verification: ",
+                      padded_time_verification)
+
+
+def batch_verification(sizes_batch=[1, 4, 16, 64], size_ring=256):
+    """
+    Time verifying batches of membership proofs against one key ring, one by one and with
+    PolynomialProof.batch_verify.
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+    roots = [order.random() for _ in range(size_ring)]
+    key_ring = KeyRing(roots, order)
+
+    with open('./polynomial_proof_batch.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['proofs', 'individual', 'batch'])
+        for size in sizes_batch:
+            proofs, commitments_to_eval, commitments_eval = [], [], []
+            for root in roots[:size]:
+                random_to_eval, random_eval = order.random(), order.random()
+                commitments_to_eval.append(com_pk.commit([root], random_to_eval))
+                commitments_eval.append(com_pk.commit([Bn.from_num(0)], random_eval))
+                proofs.append(PolynomialProof(com_pk, key_ring, commitments_to_eval[-1], commitments_eval[-1], root,
+                                              Bn.from_num(0), random_to_eval, random_eval))
+
+            time_start = time()
+            assert all(proof.verify(com_pk, key_ring, commitment_to_eval, commitment_eval) for
+                       proof, commitment_to_eval, commitment_eval in zip(proofs, commitments_to_eval, commitments_eval))
+            time_individual = time() - time_start
+
+            time_start = time()
+            assert PolynomialProof.batch_verify(proofs, key_ring, com_pk, commitments_to_eval, commitments_eval) == []
+            time_batch = time() - time_start
+
+            filewriter.writerow([size, time_individual, time_batch])
+            print("Proofs: ", size, " individual: ", time_individual, " batch: ", time_batch)
+
+
+def parallel_prover(size_ring=2 ** 14, workers_list=None):
+    """
+    Time PolynomialProof for one large ring with an increasing number of workers. The proofs are built with the same
+    seeded random source, so that they can be checked to be identical.
+    """
+    if workers_list is None:
+        workers_list = [1]
+        while workers_list[-1] * 2 <= os.cpu_count():
+            workers_list.append(workers_list[-1] * 2)
+
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+    roots = [order.random() for _ in range(size_ring)]
+    polynomial_list = Polynomial.from_roots_opt(roots, order).coefficients
+    random_to_eval, random_eval = order.random(), order.random()
+    commitment_to_eval = com_pk.commit([roots[0]], random_to_eval)
+    commitment_eval = com_pk.commit([Bn.from_num(0)], random_eval)
+
+    def seeded_source(seed):
+        generator = Random(seed)
+        return lambda bound: Bn.from_decimal(str(generator.randrange(int(bound))))
+
+    time_start = time()
+    reference = PolynomialProof(com_pk, polynomial_list, commitment_to_eval, commitment_eval, roots[0], Bn.from_num(0),
+                                random_to_eval, random_eval, random_source=seeded_source(0))
+    time_sequential = time() - time_start
+
+    with open('./polynomial_proof_parallel.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['workers', 'proof', 'speedup'])
+        filewriter.writerow([0, time_sequential, 1])
+        print("Ring size: ", size_ring, " sequential proof: ", time_sequential)
+        for workers in workers_list:
+            time_start = time()
+            proof = PolynomialProof(com_pk, polynomial_list, commitment_to_eval, commitment_eval, roots[0],
+                                    Bn.from_num(0), random_to_eval, random_eval, workers=workers,
+                                    random_source=seeded_source(0))
+            time_parallel = time() - time_start
+            assert proof.challenge == reference.challenge
+
+            filewriter.writerow([workers, time_parallel, time_sequential / time_parallel])
+            print("    {0} workers: {1} (speedup {2:.2f})".format(workers, time_parallel,
+                                                                 time_sequential / time_parallel))
+
+
+if __name__ == '__main__':
+    delta_computation()
+    sizes_above_powers_of_two()
+    batch_verification()
+    parallel_prover()
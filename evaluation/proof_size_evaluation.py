@@ -0,0 +1,61 @@
+from evaluation.range_proof_evaluation import proof_size
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey
+from primitives.polynomial import Polynomial
+from primitives.transcript import compact, transcript_size, transcript_sizes
+from zero_knowledge_proofs.ff_based.proof_range_ff import ProofRange
+from zero_knowledge_proofs.ff_based.proof_signature_from_set import ProofSignatureSet, dummy_data, dummy_roots
+
+from petlib.bn import Bn
+from time import time
+import csv
+
+
+def compact_sizes(size_set=8, engine='polynomial'):
+    """
+    Size of the proof of a signature from a set, of one of its step proofs and of a range proof, as stored by the
+    prover and in compact form, and time to verify the compact form. The size of each sub-proof of the compact
+    signature proof is written to a second file.
+    """
+    G = FFGroup()
+    order = G.order()
+    com_pk = PublicKey(G, 1)
+    signed_message, message, exponent, modulo = dummy_data()
+    polynomial_list = Polynomial.from_roots_opt(dummy_roots(modulo, size_set), order).coefficients
+
+    bound = Bn.from_num(2).pow(2049)
+    number = bound.random()
+    random = order.random()
+    commitment = com_pk.commit([number], random)
+    range_proof = ProofRange(com_pk, number, commitment, random, -bound, bound)
+    time_start = time()
+    assert compact(range_proof).verify(com_pk, commitment, -bound, bound)
+    time_range_verification = time() - time_start
+
+    proof = ProofSignatureSet(com_pk, signed_message, message, modulo, polynomial_list, engine=engine)
+    compact_proof = compact(proof)
+    time_start = time()
+    assert compact_proof.verify(com_pk, message, polynomial_list)
+    time_signature_verification = time() - time_start
+    step_proof = proof.signature_verification_proof.proofs_exponantiations[0]
+
+    with open('./compact_proof_sizes.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['proof', 'full_size', 'compact_size', 'compact_verification'])
+        for name, full, verification in [('range', range_proof, time_range_verification),
+                                         ('square_step', step_proof, None),
+                                         ('signature_set', proof, time_signature_verification)]:
+            full_size, size = proof_size(full), transcript_size(compact(full))
+            filewriter.writerow([name, full_size, size, verification])
+            print("Proof: ", name, " full size: ", full_size, " compact size: ", size, " verification: ",
+                  verification)
+
+    with open('./compact_proof_breakdown.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['path', 'size'])
+        for path, size in transcript_sizes(compact_proof).items():
+            filewriter.writerow([path, size])
+
+
+if __name__ == '__main__':
+    compact_sizes()
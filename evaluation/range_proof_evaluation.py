@@ -0,0 +1,241 @@
+from petlib.ec import EcGroup, EcPt, Bn
+from primitives.algebra_lib import FFGroup, FFElement
+from primitives.hash_function import compute_challenge
+from primitives.pedersen import PublicKey, Commitment
+from zero_knowledge_proofs.ec_based.proof_range_bulletproof_ec import AggregatedRangeProof
+from zero_knowledge_proofs.ec_based.proof_range_bulletproof_ec import ProofRange as BulletproofRange
+from zero_knowledge_proofs.ec_based.proof_range_ec import ProofRange
+from zero_knowledge_proofs.ec_based.proof_square_ec import ProofSameLog as ProofSameLogEc
+from zero_knowledge_proofs.ff_based.proof_range_ff import ProofRange as ProofRangeFf, RangeProofBundle
+from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSameLog as ProofSameLogFf
+
+from copy import copy
+from time import time
+import csv
+
+# Attributes holding parameters or keys rather than proof data
+NOT_PROOF_DATA = {'com_pk', 'com_pk_commitment_square', 'group', 'order', 'security_parameter_1',
+                  'security_parameter_2', 'security_space'}
+
+
+def proof_size(proof):
+    """
+    Size in bytes of the points and numbers of a proof, following nested proofs and lists. Numbers are counted with
+    a sign bit, as some responses of the Peng-Bao proof are signed.
+    """
+    if isinstance(proof, EcPt):
+        return len(proof.export())
+    if isinstance(proof, FFElement):
+        return proof_size(proof.value)
+    if isinstance(proof, Commitment):
+        return proof_size(proof.commitment)
+    if isinstance(proof, Bn):
+        return (proof.num_bits() + 8) // 8
+    if isinstance(proof, list):
+        return sum(proof_size(element) for element in proof)
+    if hasattr(proof, '__dict__') and not isinstance(proof, PublicKey):
+        return sum(proof_size(value) for name, value in vars(proof).items() if name not in NOT_PROOF_DATA)
+    return 0
+
+
+def range_proof_times(proof_class, com_pk, number, lower_bound, upper_bound):
+    order = com_pk.order
+    random_commitment = order.random()
+    commitment = com_pk.commit([number], random_commitment)
+
+    time_start = time()
+    proof = proof_class(com_pk, number, commitment, random_commitment, lower_bound, upper_bound)
+    time_proof = time() - time_start
+
+    time_start = time()
+    verified = proof.verify(com_pk, commitment, lower_bound, upper_bound)
+    time_verification = time() - time_start
+
+    return time_proof, time_verification, proof_size(proof), verified
+
+
+def range_proofs(bits_list=[8, 16, 32, 64], repetitions=5):
+    """
+    Compare the Peng-Bao range proof with the Bulletproofs one, for ranges [0, 2^bits - 1].
+    """
+    G = EcGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+
+    with open('./range_proofs_ec.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['bits', 'scheme', 'proof', 'verification', 'size', 'verified'])
+        for bits in bits_list:
+            upper_bound = Bn.from_num(2).pow(bits) - 1
+            for name, proof_class in [('peng_bao', ProofRange), ('bulletproofs', BulletproofRange)]:
+                results = [range_proof_times(proof_class, com_pk, upper_bound.random(), Bn.from_num(0), upper_bound)
+                           for _ in range(repetitions)]
+                time_proof = sum(result[0] for result in results) / repetitions
+                time_verification = sum(result[1] for result in results) / repetitions
+                size = results[0][2]
+                verified = sum(result[3] for result in results)
+                filewriter.writerow([bits, name, time_proof, time_verification, size, verified])
+                print("Bits: ", bits, name, " proof: ", time_proof, " verification: ", time_verification,
+                      " size: ", size, " verified: ", verified, "/", repetitions)
+
+
+def aggregation(values_list=[1, 2, 4, 8, 16], bits=64):
+    """
+    Size and time of one aggregated Bulletproofs range proof for several values.
+    """
+    G = EcGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+    bound = Bn.from_num(2).pow(bits)
+
+    with open('./range_proofs_aggregation_ec.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['values', 'proof', 'verification', 'size'])
+        for values in values_list:
+            numbers = [bound.random() for _ in range(values)]
+            randoms = [order.random() for _ in range(values)]
+            commitments = [com_pk.commit([number], random) for number, random in zip(numbers, randoms)]
+
+            time_start = time()
+            proof = AggregatedRangeProof(com_pk, numbers, commitments, randoms, bits)
+            time_proof = time() - time_start
+            time_start = time()
+            assert proof.verify(com_pk, commitments, bits)
+            time_verification = time() - time_start
+
+            filewriter.writerow([values, time_proof, time_verification, proof_size(proof)])
+            print("Values: ", values, " proof: ", time_proof, " verification: ", time_verification,
+                  " size: ", proof_size(proof))
+
+
+def former_same_log_verify(proof, commitment_one, commitment_two, base_g_one, base_h_one, base_g_two, base_h_two):
+    """
+    Former ProofSameLog verification, recomputing both announcements with three separate exponentiations each and
+    the challenge negated modulo the order. Kept as the reference for the benchmark.
+    """
+    if isinstance(base_g_one, EcPt):
+        return proof.challenge == compute_challenge(
+            [proof.response_exponent * base_g_one + proof.response_random_one * base_h_one +
+             proof.challenge.int_neg() * commitment_one] +
+            [proof.response_exponent * base_g_two + proof.response_random_two * base_h_two +
+             proof.challenge.int_neg() * commitment_two], proof.order)
+
+    return proof.challenge == compute_challenge(
+        [base_g_one ** proof.response_exponent * base_h_one ** proof.response_random_one *
+         commitment_one ** proof.challenge.int_neg().mod(proof.order)] +
+        [base_g_two ** proof.response_exponent * base_h_two ** proof.response_random_two *
+         commitment_two ** proof.challenge.int_neg().mod(proof.order)], proof.order)
+
+
+def same_log_verification(repetitions=50):
+    """
+    Microbenchmark of ProofSameLog verification, former and current, over finite fields and elliptic curves. The
+    statement is the one of ProofSquare: the commitment to the root serves as base of the commitment to the square.
+    """
+    with open('./same_log_verification.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['group', 'former', 'current'])
+        for name, group, proof_class in [('ff', FFGroup(), ProofSameLogFf), ('ec', EcGroup(), ProofSameLogEc)]:
+            com_pk = PublicKey(group, 1)
+            order = com_pk.order
+            g, h = com_pk.generators[0], com_pk.generators[1]
+            exponent, random_one, random_two = order.random(), order.random(), order.random()
+            commitment_one = com_pk.commit([exponent], random_one)
+            com_pk_two = PublicKey(group, 1)
+            com_pk_two.generators[0] = commitment_one.commitment
+            commitment_two = com_pk_two.commit([exponent], random_two)
+            statement = [commitment_one.commitment, commitment_two.commitment, g, h, commitment_one.commitment, h]
+            proofs = [proof_class(exponent, random_one, random_two, g, h, commitment_one.commitment, h, order)
+                      for _ in range(repetitions)]
+
+            time_start = time()
+            assert all(former_same_log_verify(proof, *statement) for proof in proofs)
+            time_former = (time() - time_start) / repetitions
+
+            time_start = time()
+            assert all(proof.verify(*statement) for proof in proofs)
+            time_current = (time() - time_start) / repetitions
+
+            filewriter.writerow([name, time_former, time_current])
+            print("Group: ", name, " former: ", time_former, " current: ", time_current)
+
+
+def offline_online_split(repetitions=10, bits=2048):
+    """
+    Latency of the FF ProofRange without precomputation, against the time to prepare a RangeProofBundle offline and
+    the remaining online proof once the number is known.
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+    lower_bound, upper_bound = -Bn.from_num(2).pow(bits), Bn.from_num(2).pow(bits)
+    numbers = [upper_bound.random() for _ in range(repetitions)]
+    randoms = [order.random() for _ in range(repetitions)]
+    commitments = [com_pk.commit([number], random) for number, random in zip(numbers, randoms)]
+
+    time_start = time()
+    for number, commitment, random in zip(numbers, commitments, randoms):
+        ProofRangeFf(com_pk, number, commitment, random, lower_bound, upper_bound)
+    time_full = (time() - time_start) / repetitions
+
+    time_start = time()
+    bundles = [RangeProofBundle(com_pk) for _ in range(repetitions)]
+    time_offline = (time() - time_start) / repetitions
+
+    time_start = time()
+    proofs = [ProofRangeFf(com_pk, number, commitment, random, lower_bound, upper_bound, bundle=bundle)
+              for number, commitment, random, bundle in zip(numbers, commitments, randoms, bundles)]
+    time_online = (time() - time_start) / repetitions
+    assert all(proof.verify(com_pk, commitment, lower_bound, upper_bound)
+               for proof, commitment in zip(proofs, commitments))
+
+    with open('./range_proof_offline_online.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['full', 'offline', 'online'])
+        filewriter.writerow([time_full, time_offline, time_online])
+    print("Full proof: ", time_full, " offline bundle: ", time_offline, " online proof: ", time_online)
+
+
+def early_rejection(repetitions=10, bits=2049):
+    """
+    Time to verify a valid FF ProofRange against the time to reject one whose checks fail, from the cheapest check
+    (the sign of a response) to the most expensive one (the last group equation).
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+    lower_bound, upper_bound = -Bn.from_num(2).pow(bits), Bn.from_num(2).pow(bits)
+    number = upper_bound.random()
+    random = order.random()
+    commitment = com_pk.commit([number], random)
+    proof = ProofRangeFf(com_pk, number, commitment, random, lower_bound, upper_bound)
+
+    def tampered(name, value):
+        tampered_proof = copy(proof)
+        setattr(tampered_proof, name, value)
+        return tampered_proof
+
+    cases = [('valid', proof, True),
+             ('negative_response', tampered('response_ms_2', -proof.response_ms_2), False),
+             ('wrong_bound', proof, False),
+             ('wrong_response', tampered('response_rs_2', proof.response_rs_2 + 1), False)]
+
+    with open('./range_proof_early_rejection.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['case', 'verification'])
+        for name, case_proof, expected in cases:
+            case_upper_bound = number if name == 'wrong_bound' else upper_bound
+            time_start = time()
+            for _ in range(repetitions):
+                assert case_proof.verify(com_pk, commitment, lower_bound, case_upper_bound) == expected
+            time_verification = (time() - time_start) / repetitions
+            filewriter.writerow([name, time_verification])
+            print("Case: ", name, " verification: ", time_verification)
+
+
+if __name__ == '__main__':
+    range_proofs()
+    aggregation()
+    same_log_verification()
+    offline_online_split()
+    early_rejection()
@@ -0,0 +1,52 @@
+from primitives.algebra_lib import FFGroup
+from primitives.polynomial import Polynomial
+
+from time import time
+import csv
+import os
+
+
+def build_times(size_ring, workers_list, leaf_size=64):
+    """
+    Time the construction of the ring polynomial of size_ring random moduli, sequentially with from_roots_opt and
+    with from_roots_parallel for each worker count.
+    """
+    order = FFGroup().order()
+    roots = [order.random() for _ in range(size_ring)]
+
+    time_start = time()
+    reference = Polynomial.from_roots_opt(roots, order)
+    time_sequential = time() - time_start
+
+    times_parallel = []
+    for workers in workers_list:
+        time_start = time()
+        polynomial = Polynomial.from_roots_parallel(roots, order, workers=workers, leaf_size=leaf_size)
+        times_parallel.append(time() - time_start)
+        assert polynomial.coefficients == reference.coefficients
+
+    return time_sequential, times_parallel
+
+
+def parallel_speedup(sizes_ring=[1024, 4096, 16384], workers_list=None):
+    if workers_list is None:
+        workers_list = [1]
+        while workers_list[-1] * 2 <= os.cpu_count():
+            workers_list.append(workers_list[-1] * 2)
+
+    with open('./ring_polynomial_parallel.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['size', 'from_roots_opt'] + ['workers_{0}'.format(w) for w in workers_list])
+        for size in sizes_ring:
+            time_sequential, times_parallel = build_times(size, workers_list)
+            filewriter.writerow([size, time_sequential] + times_parallel)
+
+            print("Ring size: ", size)
+            print("    from_roots_opt: ", time_sequential)
+            for workers, time_parallel in zip(workers_list, times_parallel):
+                print("    {0} workers: {1} (speedup {2:.2f})".format(workers, time_parallel,
+                                                                     times_parallel[0] / time_parallel))
+
+
+if __name__ == '__main__':
+    parallel_speedup()
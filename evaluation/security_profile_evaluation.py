@@ -0,0 +1,79 @@
+from evaluation.range_proof_evaluation import proof_size
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey
+from primitives.polynomial import Polynomial
+from zero_knowledge_proofs.ff_based.proof_range_ff import ProofRange
+from zero_knowledge_proofs.ff_based.proof_signature_from_set import ProofSignatureSet, dummy_data, dummy_roots
+from zero_knowledge_proofs.ff_based.security_profile import PROFILES
+
+from petlib.bn import Bn
+from time import time
+import csv
+
+
+def range_proof_profiles(repetitions=10, bits=2049):
+    """
+    Time and size of the FF ProofRange under each security profile, for values in [-2^bits, 2^bits], the range used
+    by the modular proofs.
+    """
+    G = FFGroup()
+    com_pk = PublicKey(G, 1)
+    order = com_pk.order
+    lower_bound, upper_bound = -Bn.from_num(2).pow(bits), Bn.from_num(2).pow(bits)
+    numbers = [upper_bound.random() for _ in range(repetitions)]
+    randoms = [order.random() for _ in range(repetitions)]
+    commitments = [com_pk.commit([number], random) for number, random in zip(numbers, randoms)]
+
+    with open('./security_profiles_range_proof.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['profile', 'proof', 'verification', 'size'])
+        for name in PROFILES:
+            time_start = time()
+            proofs = [ProofRange(com_pk, number, commitment, random, lower_bound, upper_bound, profile=name)
+                      for number, commitment, random in zip(numbers, commitments, randoms)]
+            time_proof = (time() - time_start) / repetitions
+            time_start = time()
+            assert all(proof.verify(com_pk, commitment, lower_bound, upper_bound, profile=name)
+                       for proof, commitment in zip(proofs, commitments))
+            time_verification = (time() - time_start) / repetitions
+            size = proof_size(proofs[0])
+
+            filewriter.writerow([name, time_proof, time_verification, size])
+            print("Profile: ", name, " proof: ", time_proof, " verification: ", time_verification, " size: ", size)
+
+
+def signature_profiles(repetitions=2, size_set=8):
+    """
+    Time of the proof of a signature from a set under each security profile, and size of its signature (modular
+    exponentiation) part, where the profile applies.
+    """
+    G = FFGroup()
+    order = G.order()
+    com_pk = PublicKey(G, 1)
+    signed_message, message, exponent, modulo = dummy_data()
+    polynomial_list = Polynomial.from_roots_opt(dummy_roots(modulo, size_set), order).coefficients
+
+    with open('./security_profiles_signature.csv', 'w', newline='') as file:
+        filewriter = csv.writer(file, delimiter=',', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(['profile', 'proof', 'verification', 'signature_size'])
+        for name in PROFILES:
+            time_proof = 0
+            time_verification = 0
+            for _ in range(repetitions):
+                time_start = time()
+                proof = ProofSignatureSet(com_pk, signed_message, message, modulo, polynomial_list, profile=name)
+                time_proof += time() - time_start
+                time_start = time()
+                assert proof.verify(com_pk, message, polynomial_list, profile=name)
+                time_verification += time() - time_start
+            time_proof /= repetitions
+            time_verification /= repetitions
+            size = proof_size(proof.signature_verification_proof)
+
+            filewriter.writerow([name, time_proof, time_verification, size])
+            print("Profile: ", name, " proof: ", time_proof, " verification: ", time_verification, " size: ", size)
+
+
+if __name__ == '__main__':
+    range_proof_profiles()
+    signature_profiles()
@@ -1,5 +1,7 @@
 from petlib.bn import Bn
+from collections import OrderedDict
 from hashlib import sha512
+from threading import Lock
 
 
 class FFGroup:
@@ -27,10 +29,116 @@ class FFGroup:
             "81099144573950922883933823309397903831307729923277144841334749422315595743437219371821139976270089085817737914449263008752457618988770955139245864971428025146021819160336876692205993068777078938240475549226164124952577975303221660397947822711916352061614341728562734417872584743294922245761212731150483802964283263230741041446988298186702952974697967148198190463075071628059974486966250538161512056563568090071474143434146441589514816635339916481756264419884177841781745530245175458079612447970067897693825433138760936325168807521204548329680909932742314536162869895548442852131478295912996232046258690790851591666552"),
             self.modulo, self.order())
 
+        # Powers of fixed bases to exponents that repeat across proofs (see cached_power)
+        self.power_cache = OrderedDict()
+        self.power_cache_size = 256
+        self.power_cache_hits = 0
+        self.power_cache_misses = 0
+        self.power_cache_lock = Lock()
+
     def order(self):
         return Bn.from_decimal(
             "52137169930799554717614356857506293818498877974737694294258188871929297414763123103907744062376810056827189091305705434921846346757741920691072816664704800302679217118985586829201265273391676324053123901757229727135241424267879269925766038354395247471758947327023181961662857375240340094119735806654078071568415490759313899749642836086369437285822445537863499850137938649445050574793896418443324129366783154447555359885480360150449533448644540185781810834062108093885074870413486811350157518533438291933078172819638193255100503198570696887787567964374981238663391668092217407521167528524716096503249760795640678745829")
 
+    def cached_power(self, base, exponent):
+        """
+        base ** exponent, remembering the most recently used results. Meant for exponents that are the same in many
+        proofs, such as the bounds of range proofs, so that both provers and verifiers compute them once. The cache is
+        keyed by the value of the base and the exponent reduced modulo the order, and keeps power_cache_size entries.
+        The cache and its counters are shared by the threads using the group (such as RangeProofPrecomputation), so
+        they are only accessed under power_cache_lock. The exponentiation itself runs outside of it.
+
+        Example:
+            >>> group = FFGroup()
+            >>> bound = Bn.from_num(2) ** 2049
+            >>> group.cached_power(group.generator, bound) == group.generator ** bound
+            True
+            >>> group.cached_power(group.generator, bound + group.order()) == group.generator ** bound
+            True
+            >>> group.power_cache_hits, group.power_cache_misses, group.power_cache_hit_rate()
+            (1, 1, 0.5)
+        """
+        key = (base.value, Bn.from_num(exponent).mod(self.order()))
+        with self.power_cache_lock:
+            if key in self.power_cache:
+                self.power_cache_hits += 1
+                self.power_cache.move_to_end(key)
+                return self.power_cache[key]
+            self.power_cache_misses += 1
+
+        power = base ** key[1]
+        with self.power_cache_lock:
+            self.power_cache[key] = power
+            if len(self.power_cache) > self.power_cache_size:
+                self.power_cache.popitem(last=False)
+        return power
+
+    def power_cache_hit_rate(self):
+        with self.power_cache_lock:
+            hits, misses = self.power_cache_hits, self.power_cache_misses
+        lookups = hits + misses
+        return hits / lookups if lookups else 0.0
+
+    def is_member(self, element):
+        """
+        Whether element (an FFElement or its value) is in the subgroup of order order(). The modulo is the safe prime
+        2 * order() + 1, so the subgroup is the one of the quadratic residues and membership is given by the Jacobi
+        symbol of the value, at a fraction of the cost of checking element ** order() == 1.
+
+        Example:
+            >>> group = FFGroup()
+            >>> element = group.hash_to_point(b'0')
+            >>> group.is_member(element), (element ** group.order()).value
+            (True, 1)
+            >>> minus_one = FFElement(group.modulo - 1, group.modulo, group.order())
+            >>> group.is_member(element * minus_one), group.is_member(Bn.from_num(0))
+            (False, False)
+        """
+        value = element.value if isinstance(element, FFElement) else element
+        return 0 < value < self.modulo and jacobi_symbol(int(value), int(self.modulo)) == 1
+
+    def multi_exponentiation(self, elements, exponents, window=5, workers=None):
+        """
+        Compute the product of elements[i] ** exponents[i] with Straus' interleaved method: each element gets a table
+        of its first 2^window powers, and all exponents are scanned together window by window, so that the squarings
+        are shared by all elements instead of being repeated in each exponentiation. This is the finite field
+        counterpart of EcGroup.wsum.
+
+        Given workers (a number of processes or an Executor), the elements are split in as many chunks, whose products
+        are computed in parallel. Each chunk repeats the squarings, so this pays off for long products only.
+
+        Example:
+            >>> group = FFGroup()
+            >>> order = group.order()
+            >>> elements = [group.hash_to_point(str(i).encode()) for i in range(4)]
+            >>> exponents = [order.random(), Bn.from_num(12345), Bn.from_num(-7), order.random()]
+            >>> expected = elements[0] ** exponents[0]
+            >>> for element, exponent in zip(elements[1:], exponents[1:]):
+            ...     expected = expected * element ** exponent
+            >>> group.multi_exponentiation(elements, exponents) == expected
+            True
+            >>> group.multi_exponentiation([], []).value
+            1
+            >>> group.multi_exponentiation(elements, exponents, workers=2) == expected
+            True
+        """
+        order = self.order()
+        exponents = [int(Bn.from_num(exponent).mod(order)) for exponent in exponents]
+        values = [element.value for element in elements]
+
+        if workers and len(elements) > 1:
+            from primitives.pool import map_in_pool, pool_size
+
+            size = -(-len(elements) // pool_size(workers))
+            tasks = [([value.binary() for value in values[start:start + size]], exponents[start:start + size],
+                      self.modulo.binary(), window) for start in range(0, len(elements), size)]
+            result = Bn.from_num(1)
+            for partial in map_in_pool(_straus_chunk, tasks, workers):
+                result = result.mod_mul(Bn.from_binary(partial), self.modulo)
+            return FFElement(result, self.modulo, order)
+
+        return FFElement(straus(values, exponents, self.modulo, window), self.modulo, order)
+
     def hash_to_point(self, hinput):
         """
         Hash a string into an FFElement from the group. It will always give the same number of the cyclic group without
@@ -48,6 +156,51 @@ class FFGroup:
         return self.generator ** x
 
 
+def straus(values, exponents, modulo, window):
+    """ Product of values[i] ** exponents[i] mod modulo, for non negative int exponents (see multi_exponentiation) """
+    mask = (1 << window) - 1
+
+    tables = []
+    for value in values:
+        table = [Bn.from_num(1), value]
+        for _ in range(mask - 1):
+            table.append(table[-1].mod_mul(value, modulo))
+        tables.append(table)
+
+    result = Bn.from_num(1)
+    bits = max([exponent.bit_length() for exponent in exponents] + [0])
+    for shift in range((bits - 1) // window * window, -1, -window):
+        if result != 1:
+            for _ in range(window):
+                result = result.mod_mul(result, modulo)
+        for table, exponent in zip(tables, exponents):
+            digit = (exponent >> shift) & mask
+            if digit:
+                result = result.mod_mul(table[digit], modulo)
+    return result
+
+
+def jacobi_symbol(a, n):
+    """ Jacobi symbol (a / n) of the int a, for an odd positive int n """
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _straus_chunk(task):
+    values, exponents, modulo, window = task
+    return straus([Bn.from_binary(value) for value in values], exponents, Bn.from_binary(modulo), window).binary()
+
+
 class FFElement:
     def __init__(self, value, modulo, order):
         self.modulo = modulo
@@ -0,0 +1,97 @@
+from petlib.bn import Bn
+from primitives.algebra_lib import FFGroup
+
+
+class CoefficientArray:
+    """
+    Compact container for polynomial coefficients. All coefficients live in one contiguous buffer as fixed-width
+    big-endian records (as many bytes as the modulo, so about 256 bytes per coefficient for our group), and are only
+    converted to Bn when accessed. Slices share the underlying buffer, and the buffer itself can be exported as a
+    memoryview, e.g. to write it to disk or hand it to another process. It behaves as a read-only sequence, which is
+    all that Polynomial and PolynomialProof need from their coefficient lists.
+    """
+    def __init__(self, buffer, width):
+        """
+        :param buffer: Object exposing the buffer protocol (bytes, bytearray, mmap, memoryview) holding the records
+        :param width: Size in bytes of each record
+        """
+        self.buffer = memoryview(buffer).cast('B')
+        self.width = width
+        if len(self.buffer) % width != 0:
+            raise ValueError("Expecting a buffer made of records of {0} bytes".format(width))
+
+    @classmethod
+    def from_values(cls, values, modulo):
+        """
+        Pack coefficients, reduced modulo `modulo`, in a new array with records as wide as the modulo.
+
+        Example:
+            >>> order = FFGroup().order()
+            >>> values = [order.random() for _ in range(10)]
+            >>> array = CoefficientArray.from_values(values, order)
+            >>> array.width == len(order.binary())
+            True
+            >>> list(array) == values
+            True
+            >>> len(array.to_memoryview()) == 10 * array.width
+            True
+        """
+        modulo = Bn.from_num(modulo)
+        width = len(modulo.binary())
+        buffer = bytearray(width * len(values))
+        for index, value in enumerate(values):
+            buffer[index * width:(index + 1) * width] = Bn.from_num(value).mod(modulo).binary().rjust(width, b'\0')
+
+        return cls(buffer, width)
+
+    def __len__(self):
+        return len(self.buffer) // self.width
+
+    def __getitem__(self, index):
+        """
+        Example:
+            >>> array = CoefficientArray.from_values([Bn.from_num(i) for i in range(6)], Bn.from_num(1000))
+            >>> array[1], array[-1]
+            (1, 5)
+            >>> sub_array = array[2:5]
+            >>> list(sub_array)
+            [2, 3, 4]
+            >>> sub_array.to_memoryview().obj is array.to_memoryview().obj
+            True
+            >>> array[1::2]
+            [1, 3, 5]
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return CoefficientArray(self.buffer[start * self.width:max(start, stop) * self.width], self.width)
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("coefficient index out of range")
+        return Bn.from_binary(self.buffer[index * self.width:(index + 1) * self.width].tobytes())
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, CoefficientArray):
+            return self.width == other.width and self.buffer == other.buffer
+        return list(self) == list(other)
+
+    def to_memoryview(self):
+        """ Zero-copy, read-only view of the records """
+        return self.buffer.toreadonly()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -54,6 +54,36 @@ class PublicKey:
 
         return commitment
 
+    def multi_exponentiation(self, commitments, exponents):
+        """
+        Product of commitments[i] ** exponents[i], computed as a single multi-exponentiation in the group (wsum over
+        elliptic curves, FFGroup.multi_exponentiation over finite fields). The generators can be included by wrapping
+        them in a Commitment.
+
+        Example:
+            >>> G = EcGroup()
+            >>> pk = PublicKey(G, 1)
+            >>> com1, com2 = pk.commit([10], 1), pk.commit([20], 2)
+            >>> pk.multi_exponentiation([com1, com2], [3, 4]) == pk.commit([110], 11)
+            True
+
+            >>> G = FFGroup()
+            >>> pk = PublicKey(G, 1)
+            >>> com1, com2 = pk.commit([Bn.from_num(10)], Bn.from_num(1)), pk.commit([Bn.from_num(20)], Bn.from_num(2))
+            >>> generator = Commitment(pk.generators[0])
+            >>> pk.multi_exponentiation([com1, com2, generator], [Bn.from_num(3), Bn.from_num(4), Bn.from_num(-110)]) == pk.commit([Bn.from_num(0)], Bn.from_num(11))
+            True
+        """
+        exponents = [Bn.from_num(exponent).mod(self.order) for exponent in exponents]
+        elements = [commitment.commitment for commitment in commitments]
+
+        if type(self.group) == EcGroup:
+            if not elements:
+                return Commitment(self.group.infinite())
+            return Commitment(self.group.wsum(exponents, elements))
+        elif type(self.group) == FFGroup:
+            return Commitment(self.group.multi_exponentiation(elements, exponents))
+
 
 class Commitment:
     """A Pedersen commitment"""
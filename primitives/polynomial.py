@@ -1,7 +1,9 @@
 from petlib.bn import Bn
 from functools import reduce
 from primitives.algebra_lib import FFGroup
+from primitives.coefficient_array import CoefficientArray
 from primitives.pedersen import PublicKey
+from primitives.pool import map_in_pool
 from time import time
 
 
@@ -16,10 +18,15 @@ class Polynomial:
         """ input: coefficients are in the form a_0, a_1 ...a_n
         """
         self.coefficients = coefficients
-        while self.coefficients[-1] == 0 and len(self.coefficients) > 1:
-            self.coefficients.pop()
-        if type(self.coefficients[0]) == int:
-            self.coefficients = [Bn.from_num(i) for i in coefficients]
+        if isinstance(coefficients, CoefficientArray):
+            # Compact coefficients are kept as they are, trailing zeros are dropped by (zero-copy) slicing
+            while self.coefficients[-1] == 0 and len(self.coefficients) > 1:
+                self.coefficients = self.coefficients[:-1]
+        else:
+            while self.coefficients[-1] == 0 and len(self.coefficients) > 1:
+                self.coefficients.pop()
+            if type(self.coefficients[0]) == int:
+                self.coefficients = [Bn.from_num(i) for i in coefficients]
         self.degree = len(self.coefficients)
         self.modulo = modulo
 
@@ -42,6 +49,18 @@ class Polynomial:
             >>> sum = poly1.to_big_number(modulo=Bn.from_num(5)) + poly2.to_big_number(modulo=Bn.from_num(5))
             >>> sum.coefficients
             [4, 2, 1, 2, 1]
+
+            Coefficients can also be given as a compact CoefficientArray
+            >>> compact = CoefficientArray.from_values([Bn.from_num(c) for c in [3, 5, 2, 2, 6, 0]], Bn.from_num(13))
+            >>> poly3 = Polynomial(compact, Bn.from_num(13))
+            >>> len(poly3.coefficients)
+            5
+            >>> (poly1.to_big_number(Bn.from_num(13)) + poly3).coefficients
+            [4, 7, 6, 2, 11]
+            >>> (poly3 * Polynomial([1, 1], Bn.from_num(13))).coefficients
+            [3, 8, 7, 4, 8, 6]
+            >>> poly3.eval(2) == poly3.to_big_number(Bn.from_num(13)).eval(2)
+            True
         """
         c1 = self.coefficients
         c2 = other.coefficients
@@ -130,11 +149,228 @@ class Polynomial:
         if type(point) == int:
             point = Bn.from_num(point)
         result = Bn.from_num(0)
-        for index, coefficient in enumerate(self.coefficients):
-            result = result.mod_add(coefficient * point.mod_pow(index, self.modulo), self.modulo)
+        for coefficient in reversed(self.coefficients):
+            result = result.mod_mul(point, self.modulo).mod_add(coefficient, self.modulo)
 
         return result
 
+    def multipoint_eval(self, points):
+        """
+        Evaluation of the polynomial in several points at once. We build the subproduct tree of the points and walk
+        the remainder tree down from its root, so that each leaf (x - point) ends up holding P(point). Products and
+        remainders are computed with Kronecker substitution and Newton inversion, which gives quasi-linear cost in the
+        number of points instead of one full evaluation per point.
+
+        Example:
+            >>> a = Polynomial.from_roots_opt([1, 2, 3, 3, 4, 5], Bn.from_num(7))
+            >>> a.multipoint_eval([3, 5, 6, 0])
+            [0, 0, 3, 3]
+            >>> [a.eval(point) for point in [3, 5, 6, 0]]
+            [0, 0, 3, 3]
+
+            >>> order = FFGroup().order()
+            >>> points = [order.random() for _ in range(40)]
+            >>> big_poly = Polynomial([order.random() for _ in range(70)], order)
+            >>> big_poly.multipoint_eval(points) == [big_poly.eval(point) for point in points]
+            True
+        """
+        modulo = Polynomial._big_modulo(self.modulo)
+        points = [Bn.from_num(point).mod(modulo) for point in points]
+        if not points:
+            return []
+
+        tree = Polynomial.subproduct_tree(points, modulo)
+        remainders = [Polynomial._rem_monic([Bn.from_num(c).mod(modulo) for c in self.coefficients],
+                                            tree[-1][0], modulo)]
+        for level in reversed(tree[:-1]):
+            children = []
+            for index, node in enumerate(level):
+                children.append(Polynomial._rem_monic(remainders[index // 2], node, modulo))
+            remainders = children
+
+        return [remainder[0] for remainder in remainders]
+
+    def verify_ring(self, roots):
+        """
+        Check that this polynomial is exactly the ring polynomial prod(x - root) of the given roots, i.e. that every
+        member is a root and that no stray roots were introduced. Besides the degree and the leading coefficient, we
+        compare P(z) with prod(z - root) at a random point z of the field. By Schwartz-Zippel two different
+        polynomials of degree len(roots) agree at z with probability at most len(roots) / modulo, so the check is
+        linear in the ring size. Use multipoint_eval to locate the offending members once a ring is rejected.
+
+        Example:
+            >>> order = FFGroup().order()
+            >>> roots = [order.random() for _ in range(20)]
+            >>> polynomial = Polynomial.from_roots_opt(roots, order)
+            >>> polynomial.verify_ring(roots)
+            True
+            >>> polynomial.verify_ring(roots[:-1] + [order.random()])
+            False
+            >>> polynomial.verify_ring(roots[:-1])
+            False
+            >>> (polynomial * Polynomial([order.random(), 1], order)).verify_ring(roots)
+            False
+        """
+        modulo = Polynomial._big_modulo(self.modulo)
+        if len(self.coefficients) != len(roots) + 1 or self.coefficients[-1] != 1:
+            return False
+
+        point = modulo.random()
+        product = Bn.from_num(1)
+        for root in roots:
+            product = product.mod_mul(point.mod_sub(root, modulo), modulo)
+
+        return self.eval(point) == product
+
+    def add_root(self, root):
+        """
+        Multiply the polynomial by (x - root), in place and in a single pass over the coefficients.
+
+        Example:
+            >>> a = Polynomial.from_roots_opt([1, 2, 3, 3, 4], Bn.from_num(7))
+            >>> a.add_root(5)
+            >>> a.coefficients == Polynomial.from_roots_opt([1, 2, 3, 3, 4, 5], Bn.from_num(7)).coefficients
+            True
+            >>> a.degree
+            7
+        """
+        modulo = Polynomial._big_modulo(self.modulo)
+        root = Bn.from_num(root).mod(modulo)
+        if isinstance(self.coefficients, CoefficientArray):
+            self.coefficients = list(self.coefficients)
+        coefficients = self.coefficients
+        coefficients.append(Bn.from_num(coefficients[-1]))
+        for index in range(len(coefficients) - 2, 0, -1):
+            coefficients[index] = Bn.from_num(coefficients[index - 1]).mod_sub(
+                root.mod_mul(coefficients[index], modulo), modulo)
+        coefficients[0] = Bn.from_num(0).mod_sub(root.mod_mul(coefficients[0], modulo), modulo)
+        self.degree = len(coefficients)
+
+    def remove_root(self, root):
+        """
+        Divide the polynomial by (x - root), in place, by synthetic division. Raises a ValueError, leaving the
+        polynomial untouched, if root is not a root of the polynomial.
+
+        Example:
+            >>> a = Polynomial.from_roots_opt([1, 2, 3, 3, 4, 5], Bn.from_num(7))
+            >>> a.remove_root(3)
+            >>> a.coefficients == Polynomial.from_roots_opt([1, 2, 3, 4, 5], Bn.from_num(7)).coefficients
+            True
+            >>> a.remove_root(6)
+            Traceback (most recent call last):
+            ...
+            ValueError: 6 is not a root of the polynomial
+        """
+        modulo = Polynomial._big_modulo(self.modulo)
+        root = Bn.from_num(root).mod(modulo)
+        if len(self.coefficients) < 2 or self.eval(root) != 0:
+            raise ValueError("{0} is not a root of the polynomial".format(root))
+
+        if isinstance(self.coefficients, CoefficientArray):
+            self.coefficients = list(self.coefficients)
+        coefficients = self.coefficients
+        carry = Bn.from_num(coefficients[-1])
+        for index in range(len(coefficients) - 2, -1, -1):
+            coefficients[index], carry = carry, Bn.from_num(coefficients[index]).mod_add(root.mod_mul(carry, modulo), modulo)
+        coefficients.pop()
+        self.degree = len(coefficients)
+
+    def update_roots(self, added=(), revoked=()):
+        """
+        Divide the polynomial by prod(x - revoked) and multiply it by prod(x - added), in a single pass over the
+        coefficients. The quotient is produced from the leading coefficient down, and each coefficient of the result
+        is emitted as soon as the quotient coefficients it depends on are known, so the pass costs
+        O(n (len(added) + len(revoked))) multiplications. Raises a ValueError, leaving the polynomial untouched, if
+        the revoked roots (with their multiplicity) are not roots of the polynomial.
+
+        Example:
+            >>> a = Polynomial.from_roots_opt([1, 2, 3, 3, 4, 5], Bn.from_num(7))
+            >>> a.update_roots(added=[6, 6, 1], revoked=[3, 5])
+            >>> a.coefficients == Polynomial.from_roots_opt([1, 2, 3, 4, 6, 6, 1], Bn.from_num(7)).coefficients
+            True
+            >>> a.degree
+            8
+            >>> a.update_roots(revoked=[6, 6, 6])
+            Traceback (most recent call last):
+            ...
+            ValueError: The revoked roots are not roots of the polynomial
+        """
+        modulo = Polynomial._big_modulo(self.modulo)
+        divisor = Polynomial._monic_from_roots(revoked, modulo)
+        multiplier = Polynomial._monic_from_roots(added, modulo)
+        coefficients = self.coefficients
+        revoked_count, added_count = len(divisor) - 1, len(multiplier) - 1
+        quotient_degree = len(coefficients) - 1 - revoked_count
+        if quotient_degree < 0:
+            raise ValueError("The revoked roots are not roots of the polynomial")
+
+        # p_m = q_(m - k) + sum_(t < k) d_t q_(m - t), so q_(m - k) follows from p_m and the k quotient coefficients
+        # above it. The result r_s = sum_t m_t q_(s - t) only needs quotient coefficients computed by then.
+        quotient = {}
+        result = [None] * (quotient_degree + added_count + 1)
+
+        def emit(index):
+            value = Bn.from_num(0)
+            for t in range(max(0, index - quotient_degree), min(added_count, index) + 1):
+                value = value.mod_add(multiplier[t].mod_mul(quotient[index - t], modulo), modulo)
+            result[index] = value
+
+        for index in range(quotient_degree, -1, -1):
+            value = Bn.from_num(coefficients[index + revoked_count]).mod(modulo)
+            for t in range(max(0, index + revoked_count - quotient_degree), revoked_count):
+                value = value.mod_sub(divisor[t].mod_mul(quotient[index + revoked_count - t], modulo), modulo)
+            quotient[index] = value
+            emit(index + added_count)
+            # Only the quotient coefficients still needed by the divisor and the multiplier are kept
+            quotient.pop(index + max(revoked_count, added_count) + 1, None)
+        for index in range(added_count - 1, -1, -1):
+            emit(index)
+
+        for index in range(revoked_count):
+            expected = Bn.from_num(0)
+            for t in range(max(0, index - quotient_degree), index + 1):
+                expected = expected.mod_add(divisor[t].mod_mul(quotient[index - t], modulo), modulo)
+            if Bn.from_num(coefficients[index]).mod(modulo) != expected:
+                raise ValueError("The revoked roots are not roots of the polynomial")
+
+        self.coefficients = result
+        self.degree = len(result)
+
+    @staticmethod
+    def _monic_from_roots(roots, modulo):
+        """ Coefficients of prod(x - root) over the roots, [1] if there are none """
+        if not roots:
+            return [Bn.from_num(1)]
+        coefficients = Polynomial.from_roots_opt([Bn.from_num(root) for root in roots], modulo).coefficients
+        return [Bn.from_num(coefficient) for coefficient in coefficients]
+
+    @staticmethod
+    def subproduct_tree(points, modulo):
+        """
+        Subproduct tree of the points. Level 0 holds the monic linear polynomials (x - point), and every node of the
+        next level is the product of two consecutive nodes (an odd node is carried up as is). The last level holds
+        prod(x - point) alone. Coefficients are lists of Bn in the form a_0, a_1 ...a_n.
+
+        Example:
+            >>> tree = Polynomial.subproduct_tree([1, 2, 3], Bn.from_num(7))
+            >>> tree[0]
+            [[6, 1], [5, 1], [4, 1]]
+            >>> tree[-1]
+            [[1, 4, 1, 1]]
+        """
+        modulo = Polynomial._big_modulo(modulo)
+        level = [[Bn.from_num(0).mod_sub(Bn.from_num(point), modulo), Bn.from_num(1)] for point in points]
+        tree = [level]
+        while len(level) > 1:
+            next_level = [Polynomial._mul_coefficients(level[i], level[i + 1], modulo)
+                          for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2 == 1:
+                next_level.append(level[-1])
+            level = next_level
+            tree.append(level)
+
+        return tree
+
     @staticmethod
     def from_roots(roots, modulo):
         """
@@ -222,6 +458,322 @@ class Polynomial:
 
         return Polynomial(polynomial, modulo)
 
+    @staticmethod
+    def from_roots_parallel(roots, modulo, workers=None, leaf_size=64):
+        """
+        Calculate polynomial from roots with a process pool. Roots are split in chunks of leaf_size whose products
+        are built in parallel, and the partial polynomials are then multiplied pairwise up the tree. When a level has
+        fewer products than workers, each product is further split in blocks of its longest factor, and the products
+        of the blocks are summed by the workers as well, each one adding up a slice of the coefficients. The parent
+        process only moves the encoded coefficients between levels.
+
+        Example:
+            >>> Polynomial.from_roots_parallel([1, 2, 3, 3, 4, 5], Bn.from_num(1000), workers=2, leaf_size=2).coefficients
+            [360, 58, 949, 520, 130, 982, 1]
+
+            >>> order = FFGroup().order()
+            >>> roots = [order.random() for _ in range(50)]
+            >>> Polynomial.from_roots_parallel(roots, order, workers=2, leaf_size=8).coefficients == Polynomial.from_roots_opt(roots, order).coefficients
+            True
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        import os
+
+        modulo = Polynomial._big_modulo(modulo)
+        if workers is None:
+            workers = os.cpu_count()
+        roots = [Bn.from_num(root).mod(modulo).binary() for root in roots]
+        modulo_binary = modulo.binary()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = [roots[i:i + leaf_size] for i in range(0, len(roots), leaf_size)]
+            level = list(executor.map(_leaf_product, [(chunk, modulo_binary) for chunk in chunks]))
+
+            while len(level) > 1:
+                pairs = [(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+                blocks_per_pair = max(1, workers // len(pairs))
+                tasks = []
+                for pair_index, (c1, c2) in enumerate(pairs):
+                    short, long = (c1, c2) if len(c1) <= len(c2) else (c2, c1)
+                    block = -(-len(long) // blocks_per_pair)
+                    for offset in range(0, len(long), block):
+                        tasks.append((pair_index, offset, (short, long[offset:offset + block], modulo_binary)))
+
+                blocks = [[] for _ in pairs]
+                for (pair_index, offset, _), partial in zip(tasks, executor.map(_block_product, [t[2] for t in tasks])):
+                    blocks[pair_index].append((offset, partial))
+
+                # The products of the blocks of a pair overlap, so each pair is cut in as many slices of its
+                # coefficients as it has blocks, and the overlapping parts falling in a slice are summed in a worker
+                next_level = [pair_blocks[0][1] if len(pair_blocks) == 1 else [] for pair_blocks in blocks]
+                sums = []
+                for pair_index, ((c1, c2), pair_blocks) in enumerate(zip(pairs, blocks)):
+                    if len(pair_blocks) == 1:
+                        continue
+                    length = len(c1) + len(c2) - 1
+                    width = -(-length // len(pair_blocks))
+                    for start in range(0, length, width):
+                        end = min(start + width, length)
+                        segments = [(max(offset - start, 0), partial[max(start - offset, 0):end - offset])
+                                    for offset, partial in pair_blocks if offset < end and offset + len(partial) > start]
+                        sums.append((pair_index, (end - start, segments, modulo_binary)))
+                for (pair_index, _), coefficients in zip(sums, executor.map(_sum_segments, [s[1] for s in sums])):
+                    next_level[pair_index] += coefficients
+
+                if len(level) % 2 == 1:
+                    next_level.append(level[-1])
+                level = next_level
+
+        return Polynomial([Bn.from_binary(c) for c in level[0]], modulo)
+
+    @staticmethod
+    def fold_linear_factors(coefficients, factors, modulo, workers=None, chunk_bits=12):
+        """
+        Coefficients of sum_i coefficients[i] * prod_j factors[j][bit_j(i)], where bit_j(i) is the j-th bit of i
+        (lsb first) and each factor is a linear polynomial [a_0, a_1]. Instead of expanding one product per
+        coefficient, we fold the coefficient vector one bit at a time: pairs of partial polynomials differing only in
+        bit j are merged as zero_factor * even + one_factor * odd. Level j handles n / 2^j polynomials of degree j,
+        so the whole computation costs O(n) modular multiplications.
+
+        For very large vectors, `workers` (a number of processes or an Executor) folds chunks of 2^chunk_bits
+        coefficients over their first chunk_bits bits in parallel, and the partial polynomials are then folded over
+        the remaining bits.
+
+        Example:
+            >>> modulo = Bn.from_num(101)
+            >>> x = [Bn.from_num(0), Bn.from_num(1)]
+            >>> factors = [(x, [Bn.from_num(2), Bn.from_num(3)]), (x, [Bn.from_num(5), Bn.from_num(7)])]
+            >>> Polynomial.fold_linear_factors([1, 1, 1, 1], factors, modulo)
+            [10, 36, 32]
+            >>> (Polynomial([0, 0, 1], 101) + Polynomial([2, 3], 101) * Polynomial([0, 1], 101) + Polynomial([5, 7], 101) * Polynomial([0, 1], 101) + Polynomial([2, 3], 101) * Polynomial([5, 7], 101)).coefficients
+            [10, 36, 32]
+
+            >>> order = FFGroup().order()
+            >>> coefficients = [order.random() for _ in range(100)]
+            >>> factors = [([order.random(), order.random()], [order.random(), order.random()]) for _ in range(7)]
+            >>> Polynomial.fold_linear_factors(coefficients, factors, order, workers=2, chunk_bits=4) == Polynomial.fold_linear_factors(coefficients, factors, order)
+            True
+        """
+        if workers and len(coefficients) > 2 ** chunk_bits and len(factors) > chunk_bits:
+            chunk = 2 ** chunk_bits
+            chunk_factors = [([c.binary() for c in zero_factor], [c.binary() for c in one_factor])
+                             for zero_factor, one_factor in factors[:chunk_bits]]
+            tasks = [([Bn.from_num(c).binary() for c in coefficients[offset:offset + chunk]], chunk_factors,
+                      modulo.binary()) for offset in range(0, len(coefficients), chunk)]
+            partial_polynomials = [[Bn.from_binary(c) for c in polynomial]
+                                   for polynomial in map_in_pool(_fold_linear_factors_chunk, tasks, workers)]
+            return Polynomial.fold_linear_polynomials(partial_polynomials, factors[chunk_bits:], modulo)
+
+        return Polynomial.fold_linear_polynomials([[Bn.from_num(c)] for c in coefficients], factors, modulo)
+
+    @staticmethod
+    def fold_linear_polynomials(polynomials, factors, modulo):
+        """
+        Same as fold_linear_factors, starting from a vector of polynomials (lists of coefficients) instead of
+        constants.
+        """
+        for zero_factor, one_factor in factors:
+            folded = []
+            for index in range(0, len(polynomials), 2):
+                even = polynomials[index]
+                odd = polynomials[index + 1] if index + 1 < len(polynomials) else None
+                result = [Bn.from_num(0)] * (len(even) + 1)
+                for k, coefficient in enumerate(even):
+                    result[k] = result[k].mod_add(coefficient.mod_mul(zero_factor[0], modulo), modulo)
+                    result[k + 1] = result[k + 1].mod_add(coefficient.mod_mul(zero_factor[1], modulo), modulo)
+                if odd is not None:
+                    for k, coefficient in enumerate(odd):
+                        result[k] = result[k].mod_add(coefficient.mod_mul(one_factor[0], modulo), modulo)
+                        result[k + 1] = result[k + 1].mod_add(coefficient.mod_mul(one_factor[1], modulo), modulo)
+                folded.append(result)
+            polynomials = folded
+
+        if len(polynomials) > 1:
+            raise ValueError("Expecting at most 2^len(factors) coefficients")
+        if not polynomials:
+            return [Bn.from_num(0)] * (len(factors) + 1)
+        return polynomials[0]
+
+    @staticmethod
+    def fold_multilinear(coefficients, points, modulo, workers=None, chunk_bits=12):
+        """
+        Value of sum_i coefficients[i] * prod_j points[j][bit_j(i)], where bit_j(i) is the j-th bit of i (lsb first),
+        i.e. the evaluation of the multilinear extension of the coefficient vector. The vector is folded one bit at a
+        time, values[t] = values[2t] * points[j][0] + values[2t + 1] * points[j][1], which costs O(n) modular
+        multiplications instead of one product of len(points) values per coefficient.
+
+        For very large vectors, giving `workers` (a number of processes or an Executor) folds chunks of
+        2^chunk_bits coefficients over their first chunk_bits bits in parallel, and the partial values are then
+        folded over the remaining bits.
+
+        Example:
+            >>> modulo = Bn.from_num(101)
+            >>> points = [(Bn.from_num(2), Bn.from_num(3)), (Bn.from_num(5), Bn.from_num(7))]
+            >>> Polynomial.fold_multilinear([1, 2, 3, 4], points, modulo)
+            65
+            >>> (1 * 2 * 5 + 2 * 3 * 5 + 3 * 2 * 7 + 4 * 3 * 7) % 101
+            65
+
+            >>> order = FFGroup().order()
+            >>> coefficients = [order.random() for _ in range(100)]
+            >>> points = [(order.random(), order.random()) for _ in range(7)]
+            >>> Polynomial.fold_multilinear(coefficients, points, order, workers=2, chunk_bits=4) == Polynomial.fold_multilinear(coefficients, points, order)
+            True
+        """
+        if workers and len(coefficients) > 2 ** chunk_bits and len(points) > chunk_bits:
+            chunk = 2 ** chunk_bits
+            chunk_points = [(zero_value.binary(), one_value.binary()) for zero_value, one_value in points[:chunk_bits]]
+            tasks = [([Bn.from_num(c).binary() for c in coefficients[offset:offset + chunk]], chunk_points,
+                      modulo.binary()) for offset in range(0, len(coefficients), chunk)]
+            partial_values = [Bn.from_binary(value) for value in map_in_pool(_fold_multilinear_chunk, tasks, workers)]
+            return Polynomial.fold_multilinear(partial_values, points[chunk_bits:], modulo)
+
+        values = [Bn.from_num(c) for c in coefficients]
+        for zero_value, one_value in points:
+            folded = []
+            for index in range(0, len(values) - 1, 2):
+                folded.append(values[index].mod_mul(zero_value, modulo).mod_add(
+                    values[index + 1].mod_mul(one_value, modulo), modulo))
+            if len(values) % 2 == 1:
+                folded.append(values[-1].mod_mul(zero_value, modulo))
+            values = folded
+
+        if len(values) > 1:
+            raise ValueError("Expecting at most 2^len(points) coefficients")
+        return values[0] if values else Bn.from_num(0)
+
+    @staticmethod
+    def fold_multilinear_batch(coefficients, points_list, modulo):
+        """
+        fold_multilinear of the same coefficient vector at several points (one list of (zero_value, one_value) pairs
+        per entry of points_list). The coefficients are read and decoded in a single pass, which performs the first
+        fold of every evaluation; the remaining folds work on vectors of half the size.
+
+        Example:
+            >>> modulo = Bn.from_num(101)
+            >>> points_list = [[(Bn.from_num(2), Bn.from_num(3)), (Bn.from_num(5), Bn.from_num(7))],
+            ...                [(Bn.from_num(1), Bn.from_num(4)), (Bn.from_num(6), Bn.from_num(9))]]
+            >>> Polynomial.fold_multilinear_batch([1, 2, 3, 4, 5], points_list[:1] * 3, modulo)
+            Traceback (most recent call last):
+            ...
+            ValueError: Expecting at most 2^len(points) coefficients
+            >>> Polynomial.fold_multilinear_batch([1, 2, 3, 4], points_list, modulo)
+            [65, 23]
+            >>> [Polynomial.fold_multilinear([1, 2, 3, 4], points, modulo) for points in points_list]
+            [65, 23]
+        """
+        folded = [[] for _ in points_list]
+        first_points = [points[0] for points in points_list]
+        for index in range(0, len(coefficients), 2):
+            even = Bn.from_num(coefficients[index])
+            odd = Bn.from_num(coefficients[index + 1]) if index + 1 < len(coefficients) else None
+            for values, (zero_value, one_value) in zip(folded, first_points):
+                value = even.mod_mul(zero_value, modulo)
+                if odd is not None:
+                    value = value.mod_add(odd.mod_mul(one_value, modulo), modulo)
+                values.append(value)
+
+        return [Polynomial.fold_multilinear(values, points[1:], modulo) for values, points in zip(folded, points_list)]
+
+    @staticmethod
+    def _big_modulo(modulo):
+        if type(modulo) == int:
+            return Bn.from_num(modulo)
+        return modulo
+
+    @staticmethod
+    def _mul_coefficients(c1, c2, modulo, threshold=32):
+        """
+        Product of two coefficient lists modulo `modulo`. Short operands use the schoolbook product, longer ones
+        Kronecker substitution: both lists are packed in a single big number with slots wide enough to hold a
+        coefficient of the product, so that one big number multiplication replaces all the coefficient ones.
+
+        Example:
+            >>> modulo = Bn.from_num(13)
+            >>> Polynomial._mul_coefficients([Bn.from_num(1), Bn.from_num(2)], [Bn.from_num(3), Bn.from_num(3)], modulo)
+            [3, 9, 6]
+            >>> c1 = [Bn.from_num(i) for i in range(40)]
+            >>> c2 = [Bn.from_num(i + 1) for i in range(50)]
+            >>> Polynomial._mul_coefficients(c1, c2, modulo) == Polynomial._mul_coefficients(c1, c2, modulo, threshold=100)
+            True
+        """
+        if not c1 or not c2:
+            return []
+
+        if min(len(c1), len(c2)) <= threshold:
+            res = [Bn.from_num(0)] * (len(c1) + len(c2) - 1)
+            for index_1, coefficient_1 in enumerate(c1):
+                for index_2, coefficient_2 in enumerate(c2):
+                    res[index_1 + index_2] = res[index_1 + index_2].mod_add(
+                        coefficient_1.mod_mul(coefficient_2, modulo), modulo)
+            return res
+
+        # Big number multiplication is only sub-quadratic for operands of similar size, so the longer list is
+        # multiplied block by block, each block having the length of the shorter one.
+        short, long = (c1, c2) if len(c1) <= len(c2) else (c2, c1)
+        block = len(short)
+        slot_bits = 2 * modulo.num_bits() + block.bit_length() + 1
+        width = (slot_bits + 7) // 8
+        packed_short = Bn.from_binary(b''.join(c.binary().rjust(width, b'\0') for c in reversed(short)))
+
+        res = [Bn.from_num(0)] * (len(c1) + len(c2) - 1)
+        length = 2 * block - 1
+        for offset in range(0, len(long), block):
+            chunk = long[offset:offset + block]
+            chunk = chunk + [Bn.from_num(0)] * (block - len(chunk))
+            packed_chunk = Bn.from_binary(b''.join(c.binary().rjust(width, b'\0') for c in reversed(chunk)))
+            packed = (packed_short * packed_chunk).binary().rjust(length * width, b'\0')
+            for i in range(min(length, len(res) - offset)):
+                coefficient = Bn.from_binary(packed[(length - 1 - i) * width:(length - i) * width])
+                res[offset + i] = res[offset + i].mod_add(coefficient, modulo)
+
+        return res
+
+    @staticmethod
+    def _inverse_series(coefficients, precision, modulo):
+        """
+        Inverse of a power series with constant term 1, modulo x^precision, by Newton iteration.
+
+        Example:
+            >>> modulo = Bn.from_num(13)
+            >>> Polynomial._inverse_series([Bn.from_num(1), Bn.from_num(12)], 4, modulo)
+            [1, 1, 1, 1]
+        """
+        inverse = [Bn.from_num(1)]
+        current = 1
+        while current < precision:
+            current = min(2 * current, precision)
+            error = Polynomial._mul_coefficients(coefficients[:current], inverse, modulo)[:current]
+            error = [(-e).mod(modulo) for e in error]
+            error[0] = error[0].mod_add(Bn.from_num(2), modulo)
+            inverse = Polynomial._mul_coefficients(inverse, error, modulo)[:current]
+
+        return inverse
+
+    @staticmethod
+    def _rem_monic(dividend, divisor, modulo):
+        """
+        Remainder of dividend by a monic divisor. The quotient is computed as the reversed product of the reversed
+        dividend by the inverse series of the reversed divisor.
+
+        Example:
+            >>> modulo = Bn.from_num(7)
+            >>> dividend = [Bn.from_num(c) for c in [3, 3, 4, 3, 4, 3, 1]]
+            >>> Polynomial._rem_monic(dividend, [Bn.from_num(4), Bn.from_num(1)], modulo)
+            [0]
+            >>> Polynomial._rem_monic(dividend, [Bn.from_num(1), Bn.from_num(1)], modulo)
+            [3]
+        """
+        degree_divisor = len(divisor) - 1
+        if len(dividend) <= degree_divisor:
+            return dividend + [Bn.from_num(0)] * (degree_divisor - len(dividend))
+
+        quotient_length = len(dividend) - degree_divisor
+        inverse = Polynomial._inverse_series(divisor[::-1], quotient_length, modulo)
+        quotient = Polynomial._mul_coefficients(dividend[::-1][:quotient_length], inverse, modulo)[:quotient_length][::-1]
+        product = Polynomial._mul_coefficients(quotient, divisor, modulo)
+        return [dividend[i].mod_sub(product[i], modulo) for i in range(degree_divisor)]
+
     @staticmethod
     def zip_longest(iter1, iter2, fillchar=Bn.from_num(0)):
         for i in range(max(len(iter1), len(iter2))):
@@ -233,6 +785,52 @@ class Polynomial:
                 yield (iter1[i], iter2[i])
             i += 1
 
+def _leaf_product(arguments):
+    """ Worker of Polynomial.from_roots_parallel: coefficients of the product of (x - root) for a chunk of roots. Big
+    numbers are exchanged with the worker processes as their binary encoding. """
+    roots, modulo = arguments
+    polynomial = Polynomial.from_roots_opt([Bn.from_binary(root) for root in roots], Bn.from_binary(modulo))
+    return [Bn.from_num(c).binary() for c in polynomial.coefficients]
+
+
+def _block_product(arguments):
+    """ Worker of Polynomial.from_roots_parallel: product of two coefficient lists. """
+    c1, c2, modulo = arguments
+    product = Polynomial._mul_coefficients([Bn.from_binary(c) for c in c1], [Bn.from_binary(c) for c in c2],
+                                           Bn.from_binary(modulo))
+    return [c.binary() for c in product]
+
+
+def _sum_segments(arguments):
+    """ Worker of Polynomial.from_roots_parallel: sum of the (offset, coefficients) segments of a slice of length
+    coefficients of a product. """
+    length, segments, modulo = arguments
+    modulo = Bn.from_binary(modulo)
+    result = [Bn.from_num(0)] * length
+    for offset, coefficients in segments:
+        for index, coefficient in enumerate(coefficients):
+            result[offset + index] = result[offset + index].mod_add(Bn.from_binary(coefficient), modulo)
+    return [c.binary() for c in result]
+
+
+def _fold_multilinear_chunk(arguments):
+    """ Worker of Polynomial.fold_multilinear: fold a chunk of coefficients over the first bits. """
+    coefficients, points, modulo = arguments
+    points = [(Bn.from_binary(zero_value), Bn.from_binary(one_value)) for zero_value, one_value in points]
+    return Polynomial.fold_multilinear([Bn.from_binary(c) for c in coefficients], points,
+                                       Bn.from_binary(modulo)).binary()
+
+
+def _fold_linear_factors_chunk(arguments):
+    """ Worker of Polynomial.fold_linear_factors: fold a chunk of coefficients over the first bits. """
+    coefficients, factors, modulo = arguments
+    factors = [([Bn.from_binary(c) for c in zero_factor], [Bn.from_binary(c) for c in one_factor])
+               for zero_factor, one_factor in factors]
+    polynomial = Polynomial.fold_linear_factors([Bn.from_binary(c) for c in coefficients], factors,
+                                                Bn.from_binary(modulo))
+    return [c.binary() for c in polynomial]
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -0,0 +1,29 @@
+import os
+
+
+def map_in_pool(function, tasks, workers):
+    """ Map function over tasks with the given Executor, or with a pool of `workers` processes. """
+    from concurrent.futures import Executor, ProcessPoolExecutor
+
+    if isinstance(workers, Executor):
+        return list(workers.map(function, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, tasks))
+
+
+def pool_size(workers):
+    """
+    Number of processes given by workers, a number or an Executor. The size of an Executor is the one it was created
+    with, or the number of cores if it does not tell.
+
+    Example:
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> with ThreadPoolExecutor(max_workers=3) as executor:
+        ...     pool_size(executor)
+        3
+        >>> pool_size(2)
+        2
+    """
+    if isinstance(workers, int):
+        return workers
+    return getattr(workers, '_max_workers', None) or os.cpu_count() or 1
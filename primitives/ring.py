@@ -0,0 +1,179 @@
+from collections import Counter
+from hashlib import sha512
+
+from petlib.bn import Bn
+from primitives.algebra_lib import FFGroup
+from primitives.coefficient_array import CoefficientArray
+from primitives.polynomial import Polynomial
+
+
+class Ring:
+    """
+    Set of RSA moduli (the ring of public keys) together with its ring polynomial prod(x - modulus) over Z_order[X],
+    whose coefficients are the polynomial_list consumed by ProofSignatureSet. Keys can be added and revoked without
+    rebuilding the polynomial from scratch.
+    """
+    def __init__(self, moduli, order):
+        """
+        Example:
+            >>> order = FFGroup().order()
+            >>> moduli = [order.random() for _ in range(4)]
+            >>> ring = Ring(moduli, order)
+            >>> ring.polynomial.verify_ring(moduli)
+            True
+            >>> ring.digest == Ring(moduli[::-1], order).digest
+            True
+        """
+        self.order = order
+        self.moduli = sorted(moduli)
+        self.polynomial = Polynomial.from_roots_opt(self.moduli, order)
+        self.digest = ring_digest(self.moduli, order)
+
+    def update(self, added=(), revoked=()):
+        """
+        Apply a batch of additions and revocations and return the new ring digest. The whole batch is checked before
+        touching the polynomial, so an invalid batch leaves the ring as it was. The polynomial is divided by the
+        product of (x - modulus) over the revoked keys and multiplied by the one over the added keys in a single pass
+        over the coefficients (see Polynomial.update_roots).
+
+        Example:
+            >>> order = FFGroup().order()
+            >>> moduli = [order.random() for _ in range(6)]
+            >>> new_moduli = [order.random() for _ in range(2)]
+            >>> ring = Ring(moduli, order)
+            >>> digest = ring.update(added=new_moduli, revoked=moduli[:3])
+            >>> rebuilt = Ring(moduli[3:] + new_moduli, order)
+            >>> digest == rebuilt.digest
+            True
+            >>> ring.polynomial.coefficients == rebuilt.polynomial.coefficients
+            True
+
+            >>> ring.update(revoked=moduli[:1])
+            Traceback (most recent call last):
+            ...
+            ValueError: Revoking a modulus that is not in the ring
+        """
+        remaining = Counter(self.moduli)
+        revoked_count = Counter(revoked)
+        if any(remaining[modulus] < count for modulus, count in revoked_count.items()):
+            raise ValueError("Revoking a modulus that is not in the ring")
+        if len(self.moduli) - len(revoked) + len(added) < 1:
+            raise ValueError("Expecting at least one modulus left in the ring")
+
+        self.polynomial.update_roots(added, revoked)
+
+        self.moduli = sorted(list((remaining - revoked_count).elements()) + list(added))
+        self.digest = ring_digest(self.moduli, self.order)
+
+        return self.digest
+
+    def key_ring(self):
+        """
+        Immutable snapshot of the current ring, to hand to verifiers (see KeyRing).
+
+        Example:
+            >>> order = FFGroup().order()
+            >>> ring = Ring([order.random() for _ in range(3)], order)
+            >>> key_ring = ring.key_ring()
+            >>> digest = ring.update(added=[order.random()])
+            >>> key_ring.digest == digest, len(key_ring.coefficients)
+            (False, 4)
+        """
+        return KeyRing(self.moduli, self.order, self.polynomial.coefficients)
+
+
+class KeyRing:
+    """
+    Immutable published ring of keys, as seen by verifiers. It owns the sorted moduli, the ring digest and the
+    coefficients of the ring polynomial, reduced and checked once, so that verifying many proofs against the same ring
+    pays the ring setup (building or loading the polynomial and checking it matches the moduli) a single time.
+    KeyRing can be given wherever a polynomial_list is expected by PolynomialProof and ProofSignatureSet.
+
+    The coefficients are kept in a read-only CoefficientArray and only decoded when accessed, so that a large ring
+    takes the memory of its compact records rather than that of as many Bn.
+    """
+    def __init__(self, moduli, order, coefficients=None):
+        """
+        :param moduli: Keys of the ring
+        :param order: Order of the group the proofs work in
+        :param coefficients: Coefficients of the ring polynomial, e.g. loaded from a RingStore. They are computed from
+            the moduli if not given, and checked against them otherwise. A CoefficientArray of reduced coefficients is
+            kept without a copy.
+
+        Example:
+            >>> order = FFGroup().order()
+            >>> moduli = [order.random() for _ in range(5)]
+            >>> key_ring = KeyRing(moduli, order)
+            >>> key_ring.coefficients == tuple(Polynomial.from_roots_opt(moduli, order).coefficients)
+            True
+            >>> key_ring.digest == ring_digest(moduli, order)
+            True
+            >>> type(key_ring.coefficients).__name__, key_ring.coefficients.to_memoryview().readonly
+            ('CoefficientArray', True)
+            >>> KeyRing(moduli[:4], order, key_ring.coefficients)
+            Traceback (most recent call last):
+            ...
+            ValueError: Coefficients do not match the moduli of the ring
+            >>> key_ring.digest = None  # doctest: +IGNORE_EXCEPTION_DETAIL
+            Traceback (most recent call last):
+            ...
+            AttributeError: read-only attribute
+        """
+        self._order = order
+        self._moduli = tuple(sorted(moduli))
+        self._digest = ring_digest(self._moduli, order)
+
+        if coefficients is None:
+            polynomial = Polynomial.from_roots_opt(list(self._moduli), order)
+        else:
+            if not (isinstance(coefficients, CoefficientArray) and all(c < order for c in coefficients)):
+                coefficients = [Bn.from_num(c).mod(order) for c in coefficients]
+            polynomial = Polynomial(coefficients, order)
+            if not polynomial.verify_ring(self._moduli):
+                raise ValueError("Coefficients do not match the moduli of the ring")
+
+        coefficients = polynomial.coefficients
+        if not isinstance(coefficients, CoefficientArray):
+            coefficients = CoefficientArray.from_values(coefficients, order)
+        self._coefficients = CoefficientArray(coefficients.to_memoryview(), coefficients.width)
+
+    @property
+    def order(self):
+        return self._order
+
+    @property
+    def moduli(self):
+        return self._moduli
+
+    @property
+    def digest(self):
+        return self._digest
+
+    @property
+    def coefficients(self):
+        return self._coefficients
+
+    def __len__(self):
+        return len(self._moduli)
+
+
+def ring_digest(moduli, order):
+    """
+    Digest identifying a ring: sha512 over the group order and the sorted moduli.
+
+    Example:
+        >>> ring_digest([Bn.from_num(3), Bn.from_num(5)], Bn.from_num(7)) == ring_digest([Bn.from_num(5), Bn.from_num(3)], Bn.from_num(7))
+        True
+    """
+    m = sha512()
+    m.update(Bn.from_num(order).hex().encode())
+    for modulus in sorted(moduli):
+        m.update(b',' + Bn.from_num(modulus).hex().encode())
+
+    return m.hexdigest()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
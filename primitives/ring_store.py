@@ -0,0 +1,127 @@
+import mmap
+import os
+import struct
+
+from petlib.bn import Bn
+from primitives.algebra_lib import FFGroup
+from primitives.coefficient_array import CoefficientArray
+from primitives.polynomial import Polynomial
+from primitives.ring import ring_digest
+
+
+class RingStore:
+    """
+    On-disk store of ring polynomials. Each ring is kept in its own file, named after the digest of its sorted moduli
+    and the group order, holding a header followed by the coefficients as fixed-width big-endian records. Loading a
+    ring maps the file with mmap, so verifier processes start without rebuilding the polynomial, share the pages of
+    the file, and only decode the coefficients as they are read (see CoefficientArray).
+    """
+    MAGIC = b'RSRP'
+    VERSION = 1
+    # magic, version, record width, number of coefficients, byte length of the order
+    HEADER = struct.Struct('>4sHIQI')
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest + '.ring')
+
+    def save(self, moduli, order, coefficients):
+        """
+        Store the coefficients of the ring polynomial of moduli and return the digest of the ring. The file is
+        written next to its final location and renamed, so readers never map a partially written ring.
+
+        Example:
+            >>> import tempfile
+            >>> order = FFGroup().order()
+            >>> moduli = [order.random() for _ in range(5)]
+            >>> polynomial = Polynomial.from_roots_opt(moduli, order)
+            >>> store = RingStore(tempfile.mkdtemp())
+            >>> digest = store.save(moduli, order, polynomial.coefficients)
+            >>> coefficients = store.load(moduli, order)
+            >>> len(coefficients)
+            6
+            >>> list(coefficients) == polynomial.coefficients
+            True
+            >>> coefficients[-1]
+            1
+            >>> store.load(moduli[1:], order) is None
+            True
+            >>> digest == store.save(moduli, order, coefficients)
+            True
+        """
+        digest = ring_digest(moduli, order)
+        order_binary = order.binary()
+        width = len(order_binary)
+
+        temporary_path = self.path(digest) + '.tmp'
+        with open(temporary_path, 'wb') as ring_file:
+            ring_file.write(self.HEADER.pack(self.MAGIC, self.VERSION, width, len(coefficients), len(order_binary)))
+            ring_file.write(order_binary)
+            if isinstance(coefficients, CoefficientArray) and coefficients.width == width:
+                ring_file.write(coefficients.to_memoryview())
+            else:
+                for coefficient in coefficients:
+                    ring_file.write(Bn.from_num(coefficient).mod(order).binary().rjust(width, b'\0'))
+        os.replace(temporary_path, self.path(digest))
+
+        return digest
+
+    def load(self, moduli, order):
+        """
+        Map the coefficients of the ring polynomial of moduli as a CoefficientArray, or return None if the ring is not
+        in the store.
+        """
+        return self.load_digest(ring_digest(moduli, order), order)
+
+    def load_digest(self, digest, order):
+        """
+        Map the coefficients of the ring stored under digest, or return None if there is none. Files that are not
+        ring files, or that were cut short, raise a ValueError.
+
+        Example:
+            >>> import tempfile
+            >>> order = FFGroup().order()
+            >>> moduli = [order.random() for _ in range(3)]
+            >>> store = RingStore(tempfile.mkdtemp())
+            >>> digest = store.save(moduli, order, Polynomial.from_roots_opt(moduli, order).coefficients)
+            >>> len(store.load_digest(digest, order))
+            4
+            >>> os.truncate(store.path(digest), os.path.getsize(store.path(digest)) - 1)
+            >>> store.load_digest(digest, order)
+            Traceback (most recent call last):
+            ...
+            ValueError: Unexpected ring file format
+            >>> os.truncate(store.path(digest), 0)
+            >>> store.load_digest(digest, order)
+            Traceback (most recent call last):
+            ...
+            ValueError: Unexpected ring file format
+        """
+        if not os.path.exists(self.path(digest)):
+            return None
+
+        with open(self.path(digest), 'rb') as ring_file:
+            if os.fstat(ring_file.fileno()).st_size < self.HEADER.size:
+                raise ValueError("Unexpected ring file format")
+            mapped = mmap.mmap(ring_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, width, count, order_length = self.HEADER.unpack_from(mapped, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("Unexpected ring file format")
+        offset = self.HEADER.size
+        start = offset + order_length
+        if len(mapped) != start + count * width:
+            raise ValueError("Unexpected ring file format")
+        if Bn.from_binary(mapped[offset:start]) != order:
+            raise ValueError("Ring stored for a different group order")
+
+        return CoefficientArray(memoryview(mapped)[start:start + count * width], width)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,151 @@
+from petlib.bn import Bn
+from petlib.ec import EcPt
+
+from primitives.algebra_lib import FFElement
+from primitives.pedersen import Commitment
+
+
+def compact(proof):
+    """
+    Compact form of proof, holding only the attributes listed in the TRANSCRIPT of its class: the commitments and
+    responses the verifier needs. Values the verifier derives from the statement (commitments shifted by the bounds,
+    keys with a commitment as generator, challenges) and data kept for the prover or for evaluation (keys, groups,
+    timings) are left out. So are the parameters of the statement and of the verification policy (exponents, bounds of
+    the ranges, security parameters and profiles, membership engines): the verifier takes them as arguments of
+    verify rather than from the proof, which the prover controls. Sub-proofs are compacted as well. Objects without
+    a TRANSCRIPT are kept as they are.
+
+    Example:
+        >>> from primitives.algebra_lib import FFGroup
+        >>> from primitives.pedersen import PublicKey
+        >>> from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSquare
+        >>> G = FFGroup()
+        >>> com_pk = PublicKey(G, 1)
+        >>> random_commitment = com_pk.order.random()
+        >>> commitment_sqr = com_pk.commit([Bn.from_num(25)], random_commitment)
+        >>> proof = compact(ProofSquare(com_pk, Bn.from_num(5), commitment_sqr, random_commitment))
+        >>> sorted(vars(proof))
+        ['commitment_sqr_root', 'proof_same_log']
+        >>> proof.verify(com_pk, commitment_sqr)
+        True
+    """
+    if isinstance(proof, list):
+        return [compact(element) for element in proof]
+    fields = getattr(type(proof), 'TRANSCRIPT', None)
+    if fields is None:
+        return proof
+    compacted = type(proof).__new__(type(proof))
+    for name in fields:
+        setattr(compacted, name, compact(getattr(proof, name)))
+    return compacted
+
+
+def transcript_size(value):
+    """
+    Size in bytes of the group elements and numbers in the transcript of value. Numbers are counted with a sign bit,
+    as some responses are signed.
+    """
+    if isinstance(value, EcPt):
+        return len(value.export())
+    if isinstance(value, FFElement):
+        return transcript_size(value.value)
+    if isinstance(value, Commitment):
+        return transcript_size(value.commitment)
+    if isinstance(value, Bn):
+        return (value.num_bits() + 8) // 8
+    if isinstance(value, int):
+        return (value.bit_length() + 8) // 8
+    if isinstance(value, list):
+        return sum(transcript_size(element) for element in value)
+    fields = getattr(type(value), 'TRANSCRIPT', None)
+    if fields is None:
+        return 0
+    return sum(transcript_size(getattr(value, name)) for name in fields)
+
+
+def transcript_sizes(proof, path=''):
+    """
+    transcript_size of proof and of each of its sub-proofs, by path in the proof tree ('' for proof itself).
+
+    Example:
+        >>> from primitives.algebra_lib import FFGroup
+        >>> from primitives.pedersen import PublicKey
+        >>> from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSquare
+        >>> G = FFGroup()
+        >>> com_pk = PublicKey(G, 1)
+        >>> random_commitment = com_pk.order.random()
+        >>> commitment_sqr = com_pk.commit([Bn.from_num(25)], random_commitment)
+        >>> proof = ProofSquare(com_pk, Bn.from_num(5), commitment_sqr, random_commitment)
+        >>> sizes = transcript_sizes(proof)
+        >>> list(sizes)
+        ['', 'proof_same_log']
+        >>> sizes[''] == transcript_size(proof.commitment_sqr_root) + sizes['proof_same_log']
+        True
+    """
+    sizes = {path: transcript_size(proof)}
+    for name in getattr(type(proof), 'TRANSCRIPT', ()):
+        value = getattr(proof, name)
+        elements = enumerate(value) if isinstance(value, list) else [(None, value)]
+        for index, element in elements:
+            if hasattr(type(element), 'TRANSCRIPT'):
+                label = name if index is None else '{0}/{1}'.format(name, index)
+                sizes.update(transcript_sizes(element, path + '/' + label if path else label))
+    return sizes
+
+
+def encode(proof):
+    """
+    The compact form of proof (see compact) as nested tuples of strings, bytes and picklable values, so that it can
+    be sent to or from another process. Numbers and group elements cannot be pickled as such.
+
+    Example:
+        >>> import pickle
+        >>> from primitives.algebra_lib import FFGroup
+        >>> from primitives.pedersen import PublicKey
+        >>> from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSquare
+        >>> G = FFGroup()
+        >>> com_pk = PublicKey(G, 1)
+        >>> random_commitment = com_pk.order.random()
+        >>> commitment_sqr = com_pk.commit([Bn.from_num(25)], random_commitment)
+        >>> proof = ProofSquare(com_pk, Bn.from_num(5), commitment_sqr, random_commitment)
+        >>> received = decode(pickle.loads(pickle.dumps(encode(proof))), G)
+        >>> received.verify(com_pk, commitment_sqr)
+        True
+    """
+    if isinstance(proof, FFElement):
+        return 'element', proof.value.binary()
+    if isinstance(proof, Commitment):
+        return 'commitment', encode(proof.commitment)
+    if isinstance(proof, Bn):
+        return 'number', proof.repr()
+    if isinstance(proof, list):
+        return 'list', [encode(element) for element in proof]
+    fields = getattr(type(proof), 'TRANSCRIPT', None)
+    if fields is None:
+        return 'value', proof
+    return 'proof', type(proof), [(name, encode(getattr(proof, name))) for name in fields]
+
+
+def decode(encoded, group):
+    """ Proof in compact form from its encoding (see encode), with the group elements in the FFGroup group """
+    kind = encoded[0]
+    if kind == 'element':
+        return FFElement(Bn.from_binary(encoded[1]), group.modulo, group.order())
+    if kind == 'commitment':
+        return Commitment(decode(encoded[1], group))
+    if kind == 'number':
+        return Bn.from_decimal(encoded[1])
+    if kind == 'list':
+        return [decode(element, group) for element in encoded[1]]
+    if kind == 'value':
+        return encoded[1]
+    proof = encoded[1].__new__(encoded[1])
+    for name, value in encoded[2]:
+        setattr(proof, name, decode(value, group))
+    return proof
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,214 @@
+from petlib.bn import Bn
+from petlib.ec import EcGroup
+
+from primitives.algebra_lib import FFElement, FFGroup
+from primitives.pedersen import Commitment
+
+
+class EarlyRejection(Exception):
+    """ Raised by a fail fast VerificationContext at the first failing check, with its label """
+
+
+class VerificationContext:
+    """
+    Collector of the checks of a proof tree. Instead of evaluating their group equations one by one, verifiers push
+    them into the context as products prod_i bases[i] ** exponents[i] that must equal the identity. verify() then
+    raises every equation to a random weight and checks all of them with a single multi-exponentiation, where bases
+    shared by several equations (the generators, the commitments of the statement) are only counted once. Checks that
+    do not involve the group, such as hash comparisons or signs of responses, are decided when they are required.
+
+    If the combined check fails, the equations are evaluated one by one to report the labels of the failing ones in
+    failures. Sub-verifiers get a child context, whose labels are prefixed with the path in the proof tree.
+
+    With fail_fast, the first failing check raises EarlyRejection instead of letting the verification go on, so that
+    junk proofs are rejected after the cheap checks, which verifiers run first. The verifier that created the context
+    turns it into False; callers who build a fail fast context themselves catch it. If the combined check of the
+    equations fails, a fail fast context does not look for the failing ones and reports 'equations' instead.
+
+    Over finite fields, workers (a number of processes or an Executor) splits the combined multi-exponentiation
+    between processes (see FFGroup.multi_exponentiation). The bases of the deferred equations must also be in the
+    subgroup of prime order: an element of order 2 could otherwise cancel out in the combined check for half of the
+    weights. check rejects the equations with a base outside of it right away.
+    """
+    # Size of the random weights used to combine the equations
+    WEIGHT_BITS = 128
+
+    def __init__(self, group, weight_bits=WEIGHT_BITS, fail_fast=False, workers=None):
+        self.group = group
+        self.weight_bits = weight_bits
+        self.fail_fast = fail_fast
+        self.workers = workers
+        self.equations = []
+        self.failures = []
+        self.prefix = ''
+        # Values of the bases already checked to be in the subgroup, shared with the child contexts
+        self.members = set()
+
+    def child(self, label):
+        """ Context sharing the checks of this one, for a sub-proof labelled label """
+        child = VerificationContext.__new__(VerificationContext)
+        child.__dict__.update(self.__dict__)
+        child.prefix = self.label(label) + '/'
+        return child
+
+    def label(self, label):
+        return self.prefix + str(label)
+
+    def require(self, label, condition):
+        """ Record a check that is decided right away. Returns condition. """
+        if not condition:
+            self.failures.append(self.label(label))
+            if self.fail_fast:
+                raise EarlyRejection(self.label(label))
+        return condition
+
+    def check(self, label, bases, exponents):
+        """
+        Defer the check prod_i bases[i] ** exponents[i] == identity. Bases are group elements or Commitments, and
+        exponents are reduced modulo the order of the group. Over finite fields, the check fails right away if a base
+        is not in the subgroup of prime order.
+
+        Example:
+            >>> G = FFGroup()
+            >>> g = G.hash_to_point(b'0')
+            >>> minus_one = FFElement(G.modulo - 1, G.modulo, G.order())
+            >>> context = VerificationContext(G)
+            >>> context.check('opening', [g * minus_one, g], [2, -2])
+            >>> len(context.equations), context.verify(), context.failures
+            (0, False, ['opening'])
+        """
+        bases = [base.commitment if isinstance(base, Commitment) else base for base in bases]
+        if type(self.group) == FFGroup and not all(self.is_member(base) for base in bases):
+            self.require(label, False)
+            return
+        self.equations.append((self.label(label), bases, [Bn.from_num(exponent) for exponent in exponents]))
+
+    def verify(self):
+        """
+        Decide all deferred equations at once.
+
+        Example:
+            >>> G = FFGroup()
+            >>> order = G.order()
+            >>> g, h = G.hash_to_point(b'0'), G.hash_to_point(b'1')
+            >>> x, r = order.random(), order.random()
+            >>> commitment = g ** x * h ** r
+            >>> context = VerificationContext(G)
+            >>> context.check('opening', [commitment, g, h], [-1, x, r])
+            >>> sub_context = context.child('proof')
+            >>> sub_context.check('doubled', [commitment, g, h], [-2, 2 * x, 2 * r])
+            >>> sub_context.require('sign', x > 0)
+            True
+            >>> len(context.equations), context.verify()
+            (2, True)
+
+            A wrong equation is reported by its label
+            >>> sub_context.check('wrong', [commitment, g], [-1, x])
+            >>> context.verify(), context.failures
+            (False, ['proof/wrong'])
+
+            Elliptic curve equations are combined with wsum
+            >>> G = EcGroup()
+            >>> order = G.order()
+            >>> g, h = G.hash_to_point(b'0'), G.hash_to_point(b'1')
+            >>> context = VerificationContext(G)
+            >>> context.check('opening', [x * g + r * h, g, h], [-1, x, r])
+            >>> context.verify()
+            True
+
+            A fail fast context stops at the first failing check
+            >>> context = VerificationContext(G, fail_fast=True)
+            >>> try:
+            ...     context.child('proof').require('sign', x < 0)
+            ... except EarlyRejection as rejection:
+            ...     print(rejection)
+            proof/sign
+
+            and does not look for the failing equations
+            >>> context = VerificationContext(G, fail_fast=True)
+            >>> context.check('opening', [x * g + r * h, g, h], [-1, x, r + 1])
+            >>> context.verify(), context.failures
+            (False, ['equations'])
+        """
+        if not self.equations:
+            return not self.failures
+
+        weight_bound = Bn.from_num(2).pow(self.weight_bits)
+        combined = {}
+        for _, bases, exponents in self.equations:
+            weight = weight_bound.random() if len(self.equations) > 1 else Bn.from_num(1)
+            for base, exponent in zip(bases, exponents):
+                key = self.key(base)
+                if key in combined:
+                    combined[key][1] = combined[key][1] + weight * exponent
+                else:
+                    combined[key] = [base, weight * exponent]
+
+        bases = [base for base, _ in combined.values()]
+        exponents = [exponent for _, exponent in combined.values()]
+        if self.is_identity(self.multi_exponentiation(bases, exponents, self.workers)):
+            return not self.failures
+
+        # Looking for the failing equations costs about as many exponentiations as checking them one by one, which a
+        # fail fast context does not pay
+        if self.fail_fast:
+            self.failures.append(self.label('equations'))
+            return False
+        for label, bases, exponents in self.equations:
+            if not self.is_identity(self.multi_exponentiation(bases, exponents)):
+                self.failures.append(label)
+        return False
+
+    def multi_exponentiation(self, bases, exponents, workers=None):
+        order = self.group.order()
+        exponents = [exponent.mod(order) for exponent in exponents]
+        if type(self.group) == EcGroup:
+            if not bases:
+                return self.group.infinite()
+            return self.group.wsum(exponents, bases)
+        return self.group.multi_exponentiation(bases, exponents, workers=workers)
+
+    def is_member(self, base):
+        if base.value not in self.members:
+            if not self.group.is_member(base):
+                return False
+            self.members.add(base.value)
+        return True
+
+    def is_identity(self, element):
+        if type(self.group) == EcGroup:
+            return element == self.group.infinite()
+        return element.value == 1
+
+    def key(self, base):
+        if type(self.group) == FFGroup:
+            return base.value
+        return base.export()
+
+
+def child_context(context, label):
+    """ context.child(label), or None for verifiers that were not given a context """
+    if context is None:
+        return None
+    return context.child(label)
+
+
+def verify_in_order(context, checks):
+    """
+    Run checks, pairs of a label and a verification taking the child context of that label (None if there is no
+    context), in the given order, which should be of increasing cost. Without a context, the first failure ends the
+    verification. With one, all checks run so that their equations are collected and their failures reported,
+    unless the context is fail fast.
+    """
+    verified = True
+    for label, check in checks:
+        verified = check(child_context(context, label)) and verified
+        if not verified and context is None:
+            return False
+    return verified
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,340 @@
+from functools import lru_cache
+
+from petlib.ec import EcGroup, Bn
+from primitives.hash_function import compute_challenge
+from primitives.pedersen import PublicKey, Commitment
+from primitives.verification_context import VerificationContext
+
+
+class AggregatedRangeProof:
+    """
+    Aggregated range proof following 'Bulletproofs: Short Proofs for Confidential Transactions and More', from Bunz et
+    al. It proves that each of m Pedersen commitments (value times generators[0] plus random times generators[1]) opens
+    to a value in [0, 2^bit_length), with 2 log2(m bit_length) + 4 points and 5 scalars. The verifier checks all the
+    equations, including the inner product argument, with a single multi-scalar multiplication.
+    """
+    def __init__(self, com_pk, numbers, commitments, random_commitments, bit_length):
+        """
+        :param numbers: Committed values
+        :param commitments: Commitments to the values
+        :param random_commitments: Randoms used in the commitments
+        :param bit_length: Number of bits of the range. m * bit_length must be a power of two.
+        """
+        order = com_pk.order
+        size = len(numbers) * bit_length
+        self.check_parameters(order, size, bit_length)
+        generators_g, generators_h, generator_u = bulletproof_generators(com_pk.group.nid(), size)
+        g, h = com_pk.generators[0], com_pk.generators[1]
+
+        bits_left = []
+        for number in numbers:
+            number = int(Bn.from_num(number).mod(order))
+            bits_left += [Bn.from_num((number >> i) & 1) for i in range(bit_length)]
+        bits_right = [bit.mod_sub(1, order) for bit in bits_left]
+
+        random_a = order.random()
+        self.commitment_a = com_pk.group.wsum([random_a] + bits_left + bits_right, [h] + generators_g + generators_h)
+        blinding_left = [order.random() for _ in range(size)]
+        blinding_right = [order.random() for _ in range(size)]
+        random_s = order.random()
+        self.commitment_s = com_pk.group.wsum([random_s] + blinding_left + blinding_right,
+                                              [h] + generators_g + generators_h)
+
+        y, z = self.challenges_y_z(commitments, order)
+        powers_y = powers(y, size, order)
+        powers_z = powers(z, len(numbers) + 2, order)
+        powers_two = powers(Bn.from_num(2), bit_length, order)
+
+        # l(X) = left_0 + left_1 X and r(X) = right_0 + right_1 X
+        left_0 = [bit.mod_sub(z, order) for bit in bits_left]
+        left_1 = blinding_left
+        right_0 = [powers_y[i].mod_mul(bits_right[i].mod_add(z, order), order).mod_add(
+            powers_z[2 + i // bit_length].mod_mul(powers_two[i % bit_length], order), order) for i in range(size)]
+        right_1 = [powers_y[i].mod_mul(blinding_right[i], order) for i in range(size)]
+
+        t_1 = inner_product(left_0, right_1, order).mod_add(inner_product(left_1, right_0, order), order)
+        t_2 = inner_product(left_1, right_1, order)
+        random_t_1, random_t_2 = order.random(), order.random()
+        self.commitment_t_1 = com_pk.group.wsum([t_1, random_t_1], [g, h])
+        self.commitment_t_2 = com_pk.group.wsum([t_2, random_t_2], [g, h])
+
+        x = self.challenge_x(y, z, order)
+        left = [a.mod_add(b.mod_mul(x, order), order) for a, b in zip(left_0, left_1)]
+        right = [a.mod_add(b.mod_mul(x, order), order) for a, b in zip(right_0, right_1)]
+        self.t_hat = inner_product(left, right, order)
+        self.random_t = random_t_2.mod_mul(x.mod_mul(x, order), order).mod_add(random_t_1.mod_mul(x, order), order)
+        for j, random_commitment in enumerate(random_commitments):
+            self.random_t = self.random_t.mod_add(powers_z[2 + j].mod_mul(random_commitment, order), order)
+        self.random_mu = random_a.mod_add(random_s.mod_mul(x, order), order)
+
+        # Inner product argument for <left, right> = t_hat, with the H generators scaled by y^-i
+        w = self.challenge_w(x, order)
+        generator_u = w * generator_u
+        inverse_y = y.mod_inverse(order)
+        generators_h = [power * generator for power, generator in zip(powers(inverse_y, size, order), generators_h)]
+
+        self.commitments_left, self.commitments_right = [], []
+        challenge = w
+        while len(left) > 1:
+            half = len(left) // 2
+            cross_left = inner_product(left[:half], right[half:], order)
+            cross_right = inner_product(left[half:], right[:half], order)
+            self.commitments_left.append(com_pk.group.wsum(left[:half] + right[half:] + [cross_left],
+                                                           generators_g[half:] + generators_h[:half] + [generator_u]))
+            self.commitments_right.append(com_pk.group.wsum(left[half:] + right[:half] + [cross_right],
+                                                            generators_g[:half] + generators_h[half:] + [generator_u]))
+
+            challenge = compute_challenge([challenge, self.commitments_left[-1], self.commitments_right[-1]], order)
+            inverse = challenge.mod_inverse(order)
+            left = [a.mod_mul(challenge, order).mod_add(b.mod_mul(inverse, order), order)
+                    for a, b in zip(left[:half], left[half:])]
+            right = [a.mod_mul(inverse, order).mod_add(b.mod_mul(challenge, order), order)
+                     for a, b in zip(right[:half], right[half:])]
+            generators_g = [com_pk.group.wsum([inverse, challenge], [a, b])
+                            for a, b in zip(generators_g[:half], generators_g[half:])]
+            generators_h = [com_pk.group.wsum([challenge, inverse], [a, b])
+                            for a, b in zip(generators_h[:half], generators_h[half:])]
+
+        self.final_left, self.final_right = left[0], right[0]
+
+    def verify(self, com_pk, commitments, bit_length, context=None):
+        """
+        Verify the proof. The check of t_hat and the inner product argument are combined with a random weight, and the
+        folding of the generators is expressed through the challenges, so that the whole verification is one wsum.
+        Given a VerificationContext, that equation is deferred to the context, and only the shape of the proof is
+        reflected in the returned value.
+
+        The range is part of the statement, so bit_length is given by the verifier, with the same constraints as for
+        the prover (see check_parameters).
+
+        Example:
+            >>> G = EcGroup()
+            >>> com_pk = PublicKey(G, 1)
+            >>> order = com_pk.order
+            >>> numbers = [Bn.from_num(0), Bn.from_num(5), Bn.from_num(255), Bn.from_num(100)]
+            >>> randoms = [order.random() for _ in numbers]
+            >>> commitments = [com_pk.commit([number], random) for number, random in zip(numbers, randoms)]
+            >>> proof = AggregatedRangeProof(com_pk, numbers, commitments, randoms, 8)
+            >>> len(proof.commitments_left)
+            5
+            >>> proof.verify(com_pk, commitments, 8)
+            True
+            >>> proof.verify(com_pk, commitments[::-1], 8)
+            False
+
+            The proof is for 8 bits, and not for a larger range
+            >>> proof.verify(com_pk, commitments, 16)
+            False
+            >>> proof.verify(com_pk, commitments, 6)
+            Traceback (most recent call last):
+            ...
+            ValueError: Expecting a power of two number of bits over all values
+
+            Should not verify, 256 does not fit in 8 bits
+            >>> numbers[2] = Bn.from_num(256)
+            >>> commitments[2] = com_pk.commit([numbers[2]], randoms[2])
+            >>> AggregatedRangeProof(com_pk, numbers, commitments, randoms, 8).verify(com_pk, commitments, 8)
+            False
+        """
+        order = com_pk.order
+        size = len(commitments) * bit_length
+        self.check_parameters(order, size, bit_length)
+        rounds = size.bit_length() - 1
+        well_formed = len(self.commitments_left) == rounds and len(self.commitments_right) == rounds
+        if context is not None:
+            context.require('structure', well_formed)
+        if not well_formed:
+            return False
+        generators_g, generators_h, generator_u = bulletproof_generators(com_pk.group.nid(), size)
+        g, h = com_pk.generators[0], com_pk.generators[1]
+
+        y, z = self.challenges_y_z(commitments, order)
+        x = self.challenge_x(y, z, order)
+        w = self.challenge_w(x, order)
+        challenges = []
+        challenge = w
+        for commitment_left, commitment_right in zip(self.commitments_left, self.commitments_right):
+            challenge = compute_challenge([challenge, commitment_left, commitment_right], order)
+            challenges.append(challenge)
+
+        # Scalar of generators_g[i] after folding: prod_k challenge_k^(+1 or -1), the first round deciding on the
+        # most significant bit of i
+        scalars = [Bn.from_num(1)]
+        for challenge in challenges:
+            inverse = challenge.mod_inverse(order)
+            scalars = [value for scalar in scalars
+                       for value in (scalar.mod_mul(inverse, order), scalar.mod_mul(challenge, order))]
+
+        powers_y = powers(y, size, order)
+        inverse_powers_y = powers(y.mod_inverse(order), size, order)
+        powers_z = powers(z, len(commitments) + 3, order)
+        powers_two = powers(Bn.from_num(2), bit_length, order)
+        sum_two = Bn.from_num(2).pow(bit_length).mod_sub(1, order)
+        delta = z.mod_sub(powers_z[2], order).mod_mul(sum(powers_y, Bn.from_num(0)).mod(order), order)
+        for j in range(len(commitments)):
+            delta = delta.mod_sub(powers_z[3 + j].mod_mul(sum_two, order), order)
+
+        weight = order.random()
+        exponents_g = [z.int_neg().mod_sub(self.final_left.mod_mul(scalar, order), order) for scalar in scalars]
+        exponents_h = []
+        final_right_inverses = [self.final_right.mod_mul(scalar, order) for scalar in reversed(scalars)]
+        for i in range(size):
+            # scalars are symmetric: the inverse of scalars[i] is scalars[size - 1 - i]
+            exponent = powers_z[2 + i // bit_length].mod_mul(powers_two[i % bit_length], order)
+            exponent = exponent.mod_sub(final_right_inverses[i], order).mod_mul(inverse_powers_y[i], order)
+            exponents_h.append(exponent.mod_add(z, order))
+
+        points = generators_g + generators_h + [self.commitment_a, self.commitment_s, g, h, generator_u,
+                                                self.commitment_t_1, self.commitment_t_2]
+        exponents = exponents_g + exponents_h + [
+            Bn.from_num(1), x,
+            weight.mod_mul(self.t_hat.mod_sub(delta, order), order),
+            weight.mod_mul(self.random_t, order).mod_sub(self.random_mu, order),
+            w.mod_mul(self.t_hat.mod_sub(self.final_left.mod_mul(self.final_right, order), order), order),
+            weight.mod_mul(x, order).int_neg(),
+            weight.mod_mul(x.mod_mul(x, order), order).int_neg()]
+        for j, commitment in enumerate(commitments):
+            points.append(commitment.commitment)
+            exponents.append(weight.mod_mul(powers_z[2 + j], order).int_neg())
+        for challenge, commitment_left, commitment_right in zip(challenges, self.commitments_left,
+                                                                self.commitments_right):
+            square = challenge.mod_mul(challenge, order)
+            points += [commitment_left, commitment_right]
+            exponents += [square, square.mod_inverse(order)]
+
+        exponents = [exponent.mod(order) for exponent in exponents]
+        if context is not None:
+            context.check('equation', points, exponents)
+            return True
+        return com_pk.group.wsum(exponents, points) == com_pk.group.infinite()
+
+    def challenges_y_z(self, commitments, order):
+        y = compute_challenge(commitments + [self.commitment_a, self.commitment_s], order)
+        z = compute_challenge([y, self.commitment_a, self.commitment_s], order)
+        return y, z
+
+    def challenge_x(self, y, z, order):
+        return compute_challenge([y, z, self.commitment_t_1, self.commitment_t_2], order)
+
+    def challenge_w(self, x, order):
+        return compute_challenge([x, self.t_hat, self.random_t, self.random_mu], order)
+
+    @staticmethod
+    def check_parameters(order, size, bit_length):
+        if size < 1 or size & (size - 1):
+            raise ValueError("Expecting a power of two number of bits over all values")
+        if Bn.from_num(2).pow(bit_length + 1) >= order:
+            raise ValueError("Range too large for the order of the group")
+
+
+class ProofRange:
+    """
+    Range proof with the same interface as proof_range_ec.ProofRange, built on AggregatedRangeProof: number is in
+    [lower_bound, upper_bound] if both number - lower_bound and upper_bound - number fit in bit_length bits, which is
+    proven with a single proof aggregating the two values.
+    """
+    def __init__(self, com_pk, number, commitment_number, random_commitment, lower_bound, upper_bound):
+        """
+        Generate the proof that number 'number' is between 'lower_bound' and 'upper_bound'
+        """
+        bit_length = self.range_bit_length(lower_bound, upper_bound)
+        self.proof = AggregatedRangeProof(com_pk, [number - lower_bound, upper_bound - number],
+                                          self.bound_commitments(com_pk, commitment_number, lower_bound, upper_bound),
+                                          [random_commitment, random_commitment.int_neg()], bit_length)
+
+    def verify(self, com_pk, commitment_number, lower_bound, upper_bound, context=None):
+        """
+        Verify the proof. Given a VerificationContext, the group equation is deferred to the context, as in
+        proof_range_ec.ProofRange.
+
+        Example:
+            >>> G = EcGroup()
+            >>> com_pk = PublicKey(G, 1)
+            >>> order = com_pk.order
+            >>> number = Bn.from_num(7)
+            >>> random_commitment = order.random()
+            >>> commitment = com_pk.commit([number], random_commitment)
+            >>> lower_bound = Bn.from_num(3)
+            >>> upper_bound = Bn.from_num(9)
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound)
+            True
+
+            Should not verify
+            >>> upper_bound = Bn.from_num(5)
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound)
+            False
+
+            Should not verify
+            >>> number = Bn.from_num(2)
+            >>> random_commitment = order.random()
+            >>> commitment = com_pk.commit([number], random_commitment)
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound)
+            False
+
+            The same checks deferred to a VerificationContext
+            >>> context = VerificationContext(G)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound, context.child('wrong_range'))
+            True
+            >>> number = Bn.from_num(4)
+            >>> commitment = com_pk.commit([number], random_commitment)
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound, context.child('range'))
+            True
+            >>> context.verify(), context.failures
+            (False, ['wrong_range/equation'])
+        """
+        return self.proof.verify(com_pk, self.bound_commitments(com_pk, commitment_number, lower_bound, upper_bound),
+                                 self.range_bit_length(lower_bound, upper_bound), context)
+
+    @staticmethod
+    def bound_commitments(com_pk, commitment_number, lower_bound, upper_bound):
+        """ Commitments to number - lower_bound and upper_bound - number, derived from the commitment to number """
+        generator = Commitment(com_pk.generators[0])
+        return [commitment_number / generator ** lower_bound, generator ** upper_bound / commitment_number]
+
+    @staticmethod
+    def range_bit_length(lower_bound, upper_bound):
+        """
+        Smallest power of two number of bits holding upper_bound - lower_bound.
+
+        Example:
+            >>> [ProofRange.range_bit_length(Bn.from_num(3), Bn.from_num(upper)) for upper in [3, 4, 9, 300]]
+            [1, 1, 4, 16]
+        """
+        bits = max(1, (upper_bound - lower_bound).num_bits())
+        return 1 << (bits - 1).bit_length()
+
+
+@lru_cache(maxsize=16)
+def bulletproof_generators(nid, size):
+    """
+    Generators for vectors of the given size, and the generator of the inner product, hashed to the curve with their
+    own prefix so that they are independent of the Pedersen generators.
+    """
+    group = EcGroup(nid)
+    generators_g = [group.hash_to_point(b'bulletproof_g' + str(i).encode()) for i in range(size)]
+    generators_h = [group.hash_to_point(b'bulletproof_h' + str(i).encode()) for i in range(size)]
+    return generators_g, generators_h, group.hash_to_point(b'bulletproof_u')
+
+
+def inner_product(vector_1, vector_2, order):
+    result = Bn.from_num(0)
+    for a, b in zip(vector_1, vector_2):
+        result = result.mod_add(a.mod_mul(b, order), order)
+    return result
+
+
+def powers(value, length, order):
+    result = [Bn.from_num(1)]
+    for _ in range(length - 1):
+        result.append(result[-1].mod_mul(value, order))
+    return result[:length]
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -1,6 +1,7 @@
 from petlib.ec import EcGroup, Bn
 from primitives.pedersen import PublicKey, Commitment
 from primitives.hash_function import compute_challenge
+from primitives.verification_context import VerificationContext
 from zero_knowledge_proofs.ec_based.proof_square_ec import ProofSameLog, ProofSquare
 
 
@@ -87,9 +88,10 @@ class ProofRange:
         self.response_rs_1 = self.challenge_1 * r_1 + r_2 + r_3
         self.response_rs_2 = r_1 + self.challenge_2 * r_2 + r_3
 
-    def verify(self, com_pk, commitment_number, lower_bound, upper_bound):
+    def verify(self, com_pk, commitment_number, lower_bound, upper_bound, context=None):
         """
-        Verify the proof
+        Verify the proof. Given a VerificationContext, the group equations of the proof and of its sub-proofs are
+        deferred to the context, and only the checks decided right away are reflected in the returned value.
 
         Example:
             >>> G = EcGroup()
@@ -118,7 +120,42 @@ class ProofRange:
             >>> proof.verify(com_pk, commitment, lower_bound, upper_bound)
             False
 
+            The same checks deferred to a VerificationContext
+            >>> lower_bound, upper_bound = Bn.from_num(0), Bn.from_num(2) ** 64
+            >>> number = Bn.from_num(2) ** 32
+            >>> commitment = com_pk.commit([number], random_commitment)
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound)
+            >>> context = VerificationContext(G)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound, context.child('range'))
+            True
+            >>> proof.verify(com_pk, com_pk.commit([number]), lower_bound, upper_bound, context.child('other_commitment'))
+            True
+            >>> context.verify(), context.failures
+            (False, ['other_commitment/lower_bound', 'other_commitment/upper_bound'])
         """
+        if context is not None:
+            g, h = com_pk.generators[0], com_pk.generators[1]
+            decided = [
+                self.proof_same_log.verify(self.commitment_two, self.commitment_difference_bound_number, g, h,
+                                           self.commitment_one, h, context.child('same_log')),
+                self.proof_square.verify(self.com_pk_commitment_square, self.commitment_square,
+                                         context.child('square')),
+                self.proof_square_2.verify(com_pk, self.commitment_m_3, context.child('square_2')),
+                context.require('positive_1', self.response_ms_1.repr()[0] != '-'),
+                context.require('positive_2', self.response_ms_2.repr()[0] != '-')
+            ]
+            commitments_m = [self.commitment_m_1, self.commitment_m_2, self.commitment_m_3]
+            challenge_1 = compute_challenge(commitments_m, self.security_parameter_1)
+            challenge_2 = compute_challenge(commitments_m, self.security_parameter_1)
+            context.check('lower_bound', [self.commitment_one, g, commitment_number], [1, lower_bound - 1, -1])
+            context.check('upper_bound', [self.commitment_two, g, commitment_number], [1, -(upper_bound + 1), 1])
+            context.check('sum', [self.commitment_square] + commitments_m, [1, -1, -1, -1])
+            context.check('response_1', commitments_m + [g, h], [challenge_1, 1, 1, -self.response_ms_1,
+                                                                -self.response_rs_1])
+            context.check('response_2', commitments_m + [g, h], [1, challenge_2, 1, -self.response_ms_2,
+                                                                -self.response_rs_2])
+            return all(decided)
+
         check1 = self.proof_same_log.verify(
             self.commitment_two, self.commitment_difference_bound_number,
             com_pk.generators[0], com_pk.generators[1], self.commitment_one, com_pk.generators[1]
@@ -1,6 +1,7 @@
 from petlib.ec import EcGroup, Bn
 from primitives.pedersen import PublicKey, Commitment
 from primitives.hash_function import compute_challenge
+from primitives.verification_context import VerificationContext
 
 
 class ProofSquare:
@@ -30,9 +31,9 @@ class ProofSquare:
             generator_1, generator_com_pk_2, self.order
         )
 
-    def verify(self, com_pk, commitment_sqr):
+    def verify(self, com_pk, commitment_sqr, context=None):
         """
-        Verification of the proof
+        Verification of the proof, optionally deferring its group equations to a VerificationContext
 
         Example:
             >>> G = EcGroup()
@@ -60,7 +61,7 @@ class ProofSquare:
 
         return self.proof_same_log.verify(
             self.commitment_sqr_root, commitment_sqr, com_pk.generators[0], com_pk.generators[1],
-            self.commitment_sqr_root.commitment, com_pk.generators[1]
+            self.commitment_sqr_root.commitment, com_pk.generators[1], context
         )
 
 
@@ -80,15 +81,19 @@ class ProofSameLog:
         commitment_one = Commitment(random_hiding_exponent * base_g_one + random_hiding_commitment_one * base_h_one)
         commitment_two = Commitment(random_hiding_exponent * base_g_two + random_hiding_commitment_two * base_h_two)
 
+        # Kept in the proof so that the verification equations can be deferred to a VerificationContext
+        self.announcement_one = commitment_one
+        self.announcement_two = commitment_two
         self.challenge = compute_challenge([commitment_one] + [commitment_two], self.order)
 
         self.response_exponent = random_hiding_exponent + self.challenge * exponent
         self.response_random_one = random_hiding_commitment_one + self.challenge * random_commitment_one
         self.response_random_two = random_hiding_commitment_two + self.challenge * random_commitment_two
 
-    def verify(self, commitment_one, commitment_two, base_g_one, base_h_one, base_g_two, base_h_two):
+    def verify(self, commitment_one, commitment_two, base_g_one, base_h_one, base_g_two, base_h_two, context=None):
         """
-        Verification.
+        Verification. Given a VerificationContext, the challenge is checked against the announcements of the proof and
+        the two equations recomputing them are deferred to the context.
         Example:
             >>> G = EcGroup()
             >>> com_pk = PublicKey(G, 1)
@@ -103,6 +108,12 @@ class ProofSameLog:
             >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment)
             True
 
+            >>> context = VerificationContext(G)
+            >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment, context)
+            True
+            >>> context.verify()
+            True
+
             Should not verify
             >>> shared_exponent = Bn.from_num(27)
             >>> random_commitment = order.random()
@@ -114,6 +125,12 @@ class ProofSameLog:
             >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment)
             False
 
+            >>> context = VerificationContext(G)
+            >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment, context.child('same_log'))
+            True
+            >>> context.verify(), context.failures
+            (False, ['same_log/announcement_two'])
+
 
         """
         if type(commitment_one) == Commitment:
@@ -122,14 +139,25 @@ class ProofSameLog:
         if type(commitment_two) == Commitment:
             commitment_two = commitment_two.commitment
 
-        return self.challenge == compute_challenge(
-            [self.response_exponent * base_g_one +
-             self.response_random_one * base_h_one +
-             (self.challenge.int_neg()) * commitment_one] +
-            [self.response_exponent * base_g_two +
-             self.response_random_two * base_h_two +
-             (self.challenge.int_neg()) * commitment_two], self.order
-        )
+        if context is not None:
+            context.check('announcement_one', [base_g_one, base_h_one, commitment_one, self.announcement_one],
+                          [self.response_exponent, self.response_random_one, self.challenge.int_neg(), -1])
+            context.check('announcement_two', [base_g_two, base_h_two, commitment_two, self.announcement_two],
+                          [self.response_exponent, self.response_random_two, self.challenge.int_neg(), -1])
+            return context.require('challenge', self.challenge == compute_challenge(
+                [self.announcement_one, self.announcement_two], self.order))
+
+        # Each announcement is recomputed with one simultaneous multiplication (wsum), which shares the doublings of
+        # the three terms, and the challenge is negated on the point rather than on the scalar
+        if self.challenge != compute_challenge([self.announcement_one, self.announcement_two], self.order):
+            return False
+        group = base_g_one.group
+        scalars_one = [self.response_exponent.mod(self.order), self.response_random_one.mod(self.order),
+                       self.challenge]
+        scalars_two = [scalars_one[0], self.response_random_two.mod(self.order), self.challenge]
+        return group.wsum(scalars_one, [base_g_one, base_h_one, -commitment_one]) == \
+            self.announcement_one.commitment and \
+            group.wsum(scalars_two, [base_g_two, base_h_two, -commitment_two]) == self.announcement_two.commitment
 
 if __name__ == '__main__':
     import doctest
@@ -3,19 +3,26 @@ from primitives.algebra_lib import FFGroup
 from zero_knowledge_proofs.ff_based.proof_range_ff import ProofRange
 
 from petlib.ec import Bn
+from copy import copy
 from time import time
 
 
 class ModularAdditionZKP:
+    # Attributes of the compact form of the proof (see primitives.transcript). The bounds of the range proofs follow
+    # from the upper_bound_moduli given to the verifier.
+    TRANSCRIPT = ('range_added_value_1', 'range_added_value_2', 'range_result', 'range_modulo',
+                  'range_secret_exponent')
+
     def __init__(self, com_pk, added_value_1, added_value_2, result, modulo,
                  commitment_added_1, commitment_added_2, commitment_result, commitment_modulo,
                  random_comm_value1, random_comm_value2, random_comm_result, random_comm_modulo,
-                 upper_bound_moduli=2050):
+                 upper_bound_moduli=2050, profile=None):
         """
         Prove that added_value_1 + added_value_2 = result mod modulo in zero knowledge.
 
         :param security_parameter: We should prepare it in such a way that we do not use the hardcoded values. For
         the moment we stick to that for evaluation
+        :param profile: SecurityProfile, or its name, of the range and same log proofs
         """
         # Sanity checks
         self.group = com_pk.group
@@ -23,6 +30,7 @@ class ModularAdditionZKP:
 
         order_bits = self.order.num_bits()
         modulo_bits = modulo.num_bits()
+        self.upper_bound_moduli = upper_bound_moduli
         self.upper_bound_calculations = Bn.from_num(2) ** (upper_bound_moduli)
         self.lower_bound_calculations = - Bn.from_num(2) ** (upper_bound_moduli)
 
@@ -31,16 +39,16 @@ class ModularAdditionZKP:
         # Range proofs
         self.time_range_proofs = time()
         self.range_added_value_1 = ProofRange(com_pk, added_value_1, commitment_added_1, random_comm_value1,
-                                         self.lower_bound_calculations, self.upper_bound_calculations)
+                                         self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
         self.range_added_value_2 = ProofRange(com_pk, added_value_2, commitment_added_2, random_comm_value2,
-                                         self.lower_bound_calculations, self.upper_bound_calculations)
+                                         self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
         self.range_result = ProofRange(com_pk, result, commitment_result, random_comm_result,
-                                  self.lower_bound_calculations, self.upper_bound_calculations)
+                                  self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
         self.range_modulo = ProofRange(com_pk, modulo, commitment_modulo, random_comm_modulo,
-                                  self.lower_bound_calculations, self.upper_bound_calculations)
+                                  self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
         self.time_secret_exponent = time()
         secret_exponent = (result - added_value_1 - added_value_2) / modulo
@@ -48,14 +56,16 @@ class ModularAdditionZKP:
         secret_random = (random_comm_result - random_comm_value1 - random_comm_value2 - random_comm_modulo * secret_exponent).mod(self.order)
         self.commitment_secret_exponent = Commitment(commitment_modulo.commitment ** secret_exponent_mod_order * com_pk.generators[1] ** secret_random)
         # print(commitment_result / (commitment_added_1 * commitment_added_2) == Commitment(commitment_modulo.commitment ** secret_exponent * com_pk.generators[1] ** secret_random))
-        com_pk_exponent = PublicKey(self.group, 1)
+        com_pk_exponent = copy(com_pk)
         com_pk_exponent.generators = [commitment_modulo.commitment, com_pk.generators[1]]
-        self.range_secret_exponent = ProofRange(com_pk_exponent, secret_exponent, self.commitment_secret_exponent, secret_random, self.lower_bound_calculations, self.upper_bound_calculations)
+        self.range_secret_exponent = ProofRange(com_pk_exponent, secret_exponent, self.commitment_secret_exponent, secret_random, self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
         self.time_end = time()
 
-    def verify(self, com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo):
+    def verify(self, com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo,
+               profile=None, upper_bound_moduli=2050):
         """
-        Verify modular addition
+        Verify modular addition, with the range proofs under the SecurityProfile (or its name) profile, the default one
+        if not given, and for values in [-2^upper_bound_moduli, 2^upper_bound_moduli]
 
         Example:
             >>> added_value1, added_value2, result, modulo = generate_dummy_data()
@@ -76,16 +86,18 @@ class ModularAdditionZKP:
             True
 
         """
-        check1 = self.range_added_value_1.verify(com_pk, commitment_added_1, self.lower_bound_calculations, self.upper_bound_calculations)
-        check2 = self.range_added_value_2.verify(com_pk, commitment_added_2, self.lower_bound_calculations, self.upper_bound_calculations)
-        check3 = self.range_result.verify(com_pk, commitment_result, self.lower_bound_calculations, self.upper_bound_calculations)
-        check4 = self.range_modulo.verify(com_pk, commitment_modulo, self.lower_bound_calculations, self.upper_bound_calculations)
-
-        com_pk_exponent = PublicKey(self.group, 1)
+        upper_bound = Bn.from_num(2) ** upper_bound_moduli
+        lower_bound = - upper_bound
+        check1 = self.range_added_value_1.verify(com_pk, commitment_added_1, lower_bound, upper_bound, profile=profile)
+        check2 = self.range_added_value_2.verify(com_pk, commitment_added_2, lower_bound, upper_bound, profile=profile)
+        check3 = self.range_result.verify(com_pk, commitment_result, lower_bound, upper_bound, profile=profile)
+        check4 = self.range_modulo.verify(com_pk, commitment_modulo, lower_bound, upper_bound, profile=profile)
+
+        com_pk_exponent = copy(com_pk)
         com_pk_exponent.generators = [commitment_modulo.commitment, com_pk.generators[1]]
         check5 = self.range_secret_exponent.verify(com_pk_exponent,
                                                    commitment_result / (commitment_added_1 * commitment_added_2),
-                                                   self.lower_bound_calculations, self.upper_bound_calculations)
+                                                   lower_bound, upper_bound, profile=profile)
 
         return check1 and check2 and check3 and check4 and check5
 
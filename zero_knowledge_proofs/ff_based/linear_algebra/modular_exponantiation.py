@@ -1,9 +1,15 @@
 from primitives.pedersen import PublicKey, Commitment
 from primitives.algebra_lib import FFGroup
-from zero_knowledge_proofs.ff_based.linear_algebra.modular_multiplication import ModularMultiplicationZKP
+from primitives.pool import map_in_pool
+from primitives.transcript import decode, encode
+from primitives.verification_context import EarlyRejection, VerificationContext, verify_in_order
+from zero_knowledge_proofs.ff_based.linear_algebra.modular_multiplication import ModularMultiplicationZKP, \
+    wire_range_checks
 from zero_knowledge_proofs.ff_based.proof_range_ff import ProofRange
 from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSameLog
+from zero_knowledge_proofs.ff_based.security_profile import security_profile
 
+from copy import copy
 from time import time
 from petlib.bn import Bn
 
@@ -12,10 +18,40 @@ class ModularExponantiation:
     This will generate a proof that a hidden signature to the power a public exponent equals a public message modulo
     a private modulo.
     """
+    # Attributes of the compact form of the proof (see primitives.transcript). The steps follow from the exponent, and
+    # the bounds of the range proofs from the upper_bound_moduli, both given to the verifier.
+    TRANSCRIPT = ('commitments', 'range_proofs', 'range_modulo',
+                  'proofs_exponantiations', 'randomiser_result')
+
+    # Widths tried for the sliding window decomposition of the exponent
+    WINDOW_WIDTHS = range(1, 7)
 
     def __init__(self, com_pk, signature, message, modulus,
-                 commitment_modulo, random_committed_modulo, exponent=65537, upper_bound_moduli=2048):
+                 commitment_modulo, random_committed_modulo, exponent=65537, upper_bound_moduli=2048, profile=None,
+                 workers=None):
+        """
+        The exponent is decomposed in a chain of squarings and multiplications (see chain), each proven with a
+        ModularSquaringZKP or a ModularMultiplicationZKP. commitments holds the commitment to the signature followed
+        by the commitments to the result of each step.
+
+        As the result of a step is the input of later ones, the range of each committed value is proven once, in
+        range_proofs (the range proof of commitments[i] is range_proofs[i]), and the range of the modulus in
+        range_modulo. The step proofs are made without them (see ModularMultiplicationZKP, wire_ranges). These are
+        separate ProofRanges rather than one aggregated proof: a Peng-Bao range proof shows the sign of each value
+        through its own decomposition, which a combination over several values would not keep. Their group equations
+        are still checked together, in the VerificationContext of the verifier.
+
+        The prover works in two phases: it first computes and commits to the result of every step, after which the
+        range proofs and the step proofs are independent of each other and are generated, in parallel if workers are
+        given.
+
+        :param exponent: Any positive integer
+        :param profile: SecurityProfile, or its name, of all step proofs. The default one if not given.
+        :param workers: Number of processes (or an Executor) generating the range and step proofs. They are sent
+        back in compact form (see primitives.transcript).
+        """
         self.com_pk = com_pk
+        profile = security_profile(profile)
         self.message = message
 
         self.exponent = exponent
@@ -24,125 +60,272 @@ class ModularExponantiation:
         self.group = com_pk.group
         self.order = self.group.order()
 
+        self.upper_bound_moduli = upper_bound_moduli
         self.upper_bound_calculations = Bn.from_num(2) ** (upper_bound_moduli)
         self.lower_bound_calculations = - (Bn.from_num(2) ** (upper_bound_moduli))
 
         # random_committed_modulo = self.order.random()
         # self.commitment_modulo = com_pk.commit([modulo], random_committed_modulo)
 
-        squared_steps = []
-        multiplication_steps = []
-        self.commitments_squares = []
-        commitment_squares_randomizers = []
-        self.commitments_multiplication = []
-        commitment_multiplication_randomizers = []
-        self.proofs_exponantiations = []
-
-        random_committed_signature = self.order.random()
-        committed_signature = com_pk.commit([signature], random_committed_signature)
-        self.commitments_squares.append(committed_signature)
-        commitment_squares_randomizers.append(random_committed_signature)
-
-        exponantiated_value = Bn.from_num(1)
-        random_commitment_exponantiated_value = self.order.random()
-        commitment_exponantiated_value = com_pk.commit([exponantiated_value], random_commitment_exponantiated_value)
-        self.commitments_multiplication.append(commitment_exponantiated_value)
-        commitment_multiplication_randomizers.append(random_commitment_exponantiated_value)
-
-        X = signature
-        squared_steps.append(X)
-        multiplication_steps.append(exponantiated_value)
-
-        temp_exp = exponent
-        while temp_exp > 0:
-            if temp_exp % 2 == 0:
-                temp_value = (X * X).mod(modulus)
-
-                random_committed_result = self.order.random()
-                committed_result = com_pk.commit([temp_value], random_committed_result)
-                self.commitments_squares.append(committed_result)
-                commitment_squares_randomizers.append(random_committed_result)
-
-                proof = ModularSquaringZKP(com_pk, X, temp_value, modulus,
-                                           self.commitments_squares[-2], self.commitments_squares[-1], commitment_modulo,
-                                           commitment_squares_randomizers[-2], commitment_squares_randomizers[-1], random_committed_modulo)
-                self.proofs_exponantiations.append(proof)
-
-                X = temp_value
-                squared_steps.append(X)
-                temp_exp = temp_exp / 2
-
-            else:
-                temp_value = (X * exponantiated_value).mod(modulus)
+        chain = self.chain(exponent)
+        values = [signature]
+        randomizers = [self.order.random()]
+        self.commitments = [com_pk.commit([signature], randomizers[0])]
+        for index_1, index_2 in chain:
+            values.append((values[index_1] * values[index_2]).mod(modulus))
+            randomizers.append(self.order.random())
+            self.commitments.append(com_pk.commit([values[-1]], randomizers[-1]))
+
+        # Operands of each step: the values, commitments and randoms of its inputs and of its result
+        steps = [(index_1 == index_2, [values[index_1], values[index_2], values[result_index],
+                                       self.commitments[index_1], self.commitments[index_2],
+                                       self.commitments[result_index],
+                                       randomizers[index_1], randomizers[index_2], randomizers[result_index]])
+                 for result_index, (index_1, index_2) in enumerate(chain, 1)]
+        statement = [modulus, commitment_modulo, random_committed_modulo]
+        # Range proofs of the committed values followed by the one of the modulus, then the step proofs
+        proofs = [(wire_range_proof, [value, commitment, random, upper_bound_moduli])
+                  for value, commitment, random in zip(values + [modulus], self.commitments + [commitment_modulo],
+                                                       randomizers + [random_committed_modulo])] + \
+                 [(step_proof, [square, operands] + statement) for square, operands in steps]
+        if workers:
+            generators = encode(list(com_pk.generators))
+            tasks = [(generators, prover, encode(arguments), profile) for prover, arguments in proofs]
+            proofs = [decode(proof, self.group) for proof in map_in_pool(_proof_task, tasks, workers)]
+        else:
+            proofs = [prover(com_pk, *arguments, profile=profile) for prover, arguments in proofs]
+        self.range_proofs = proofs[:len(self.commitments)]
+        self.range_modulo = proofs[len(self.commitments)]
+        self.proofs_exponantiations = proofs[len(self.commitments) + 1:]
+
+        self.randomiser_result = randomizers[-1]
+
+    def verify(self, com_pk, message, commitment_modulo, exponent=65537, context=None, fail_fast=False, workers=None,
+               profile=None, upper_bound_moduli=2048):
+        """
+        Verify the exponantiation proof. The group equations of all step proofs are collected in a VerificationContext
+        and checked together at the end, unless a context is given, in which case deciding them is left to the caller.
 
-                random_committed_result = self.order.random()
-                committed_result = com_pk.commit([temp_value], random_committed_result)
-                self.commitments_multiplication.append(committed_result)
-                commitment_multiplication_randomizers.append(random_committed_result)
+        The exponent is part of the statement and is given by the verifier, who derives the steps from it. The proof
+        only verifies for the exponent it was made for.
 
-                proof = ModularMultiplicationZKP(com_pk, X, exponantiated_value, temp_value, modulus,
-                                                 self.commitments_squares[-1], self.commitments_multiplication[-2], self.commitments_multiplication[-1], commitment_modulo,
-                                                 commitment_squares_randomizers[-1], commitment_multiplication_randomizers[-2],
-                                                 commitment_multiplication_randomizers[-1], random_committed_modulo)
+        The shape of the proof is checked first, then the checks of the range and step proofs that are decided right
+        away (the signs of the responses), and the group equations last. The range of each committed value is checked
+        once. With fail_fast, the verification stops at the first
+        failing check. workers splits the check of the group equations between processes.
 
-                self.proofs_exponantiations.append(proof)
+        The step proofs are verified under the SecurityProfile (or its name) profile given by the verifier, the default
+        one if not given, which also sets the size of the random weights of the group equations. The committed values
+        and the modulus must be in [-2^upper_bound_moduli, 2^upper_bound_moduli], as for the prover.
 
-                exponantiated_value = temp_value
-                multiplication_steps.append(exponantiated_value)
-                temp_exp -= 1
+        Example:
+            >>> G = FFGroup()
+            >>> order = G.order()
+            >>> com_pk = PublicKey(G, 1)
+            >>> random_committed_modulo = order.random()
+            >>> commitment_modulo = com_pk.commit([modulo], random_committed_modulo)
+            >>> cube = signed_message.mod_pow(3, modulo)
+            >>> proof = ModularExponantiation(com_pk, signed_message, cube, modulo, commitment_modulo,
+            ...                               random_committed_modulo, exponent=3)
+            >>> proof.verify(com_pk, cube, commitment_modulo, exponent=3)
+            True
+
+            A proof for exponent 1, where the signature is the message itself, is not a proof for 65537
+            >>> forged = ModularExponantiation(com_pk, message, message, modulo, commitment_modulo,
+            ...                                random_committed_modulo, exponent=1)
+            >>> forged.verify(com_pk, message, commitment_modulo), forged.verify(com_pk, message, commitment_modulo, exponent=1)
+            (False, True)
+
+            The step proofs made by worker processes come back in compact form and verify the same way
+            >>> proof = ModularExponantiation(com_pk, signed_message, cube, modulo, commitment_modulo,
+            ...                               random_committed_modulo, exponent=3, workers=2)
+            >>> proof.verify(com_pk, cube, commitment_modulo, exponent=3, workers=2)
+            True
+            >>> proof.verify(com_pk, cube + 1, commitment_modulo, exponent=3, workers=2)
+            False
+        """
+        profile = security_profile(profile)
+        if context is not None:
+            return self.verify_steps(com_pk, message, commitment_modulo, exponent, context, profile, upper_bound_moduli)
+
+        context = VerificationContext(com_pk.group, profile.weight_bits, fail_fast, workers)
+        try:
+            verified = self.verify_steps(com_pk, message, commitment_modulo, exponent, context, profile,
+                                         upper_bound_moduli)
+            return context.verify() and verified
+        except EarlyRejection:
+            return False
+
+    def verify_steps(self, com_pk, message, commitment_modulo, exponent, context, profile=None,
+                     upper_bound_moduli=2048):
+        """
+        Push the checks of the proof to context. Returns the result of the checks decided right away. The steps are
+        derived from the exponent, as the prover does.
+        """
+        try:
+            chain = self.chain(exponent)
+        except ValueError:
+            chain = None
+        if not context.require('structure', chain is not None and
+                               len(self.proofs_exponantiations) == len(chain) and
+                               len(self.commitments) == len(chain) + 1 and
+                               len(self.range_proofs) == len(self.commitments) and
+                               all(type(proof) == ProofRange for proof in self.range_proofs + [self.range_modulo]) and
+                               all(type(proof) == (ModularSquaringZKP if index_1 == index_2 else
+                                                   ModularMultiplicationZKP)
+                                   for proof, (index_1, index_2) in zip(self.proofs_exponantiations, chain))):
+            return False
+
+        upper_bound = Bn.from_num(2) ** upper_bound_moduli
+        lower_bound = - upper_bound
+        verifications = [
+            proof.verify(com_pk, commitment, lower_bound, upper_bound, context.child('range_{0}'.format(index)),
+                         profile)
+            for index, (proof, commitment) in enumerate(zip(self.range_proofs, self.commitments))
+        ]
+        verifications.append(self.range_modulo.verify(com_pk, commitment_modulo, lower_bound, upper_bound,
+                                                      context.child('range_modulo'), profile))
+        for nr_proofs, (index_1, index_2) in enumerate(chain):
+            sub_context = context.child('step_{0}'.format(nr_proofs))
+            committed_result = self.commitments[nr_proofs + 1]
+            if index_1 == index_2:
+                verifications.append(self.proofs_exponantiations[nr_proofs].verify(
+                    com_pk, self.commitments[index_1], committed_result, commitment_modulo, sub_context,
+                    wire_ranges=False, profile=profile))
+            else:
+                verifications.append(self.proofs_exponantiations[nr_proofs].verify(
+                    com_pk, self.commitments[index_1], self.commitments[index_2], committed_result, commitment_modulo,
+                    sub_context, wire_ranges=False, profile=profile))
 
-        # self.result = multiplication_steps[-1]
-        # self.commitment_result = self.commitments_multiplication[-1]
-        self.randomiser_result = commitment_multiplication_randomizers[-1]
+        context.check('result', [self.commitments[-1], com_pk.generators[0], com_pk.generators[1]],
+                      [-1, message, self.randomiser_result])
+        return all(verifications)
 
-    def verify(self, com_pk, message, commitment_modulo):
+    @staticmethod
+    def chain(exponent):
         """
-        Verify the exponantiation proof.
+        Addition chain for exponent, as the pairs of indices (index_1, index_2) of the steps: step k computes value
+        k + 1 as value index_1 times value index_2, value 0 being the base. Equal indices are a squaring. It is the
+        shortest of the sliding window decompositions with the widths in WINDOW_WIDTHS, so prover and verifier derive
+        the same chain from the exponent.
 
         Example:
-            # >>> G = FFGroup()
-            # >>> order = G.order()
-            # >>> com_pk = PublicKey(G, 1)
-            # >>> ModularExponantiation(com_pk, signed_message, message, modulo)
+            >>> ModularExponantiation.chain(5)
+            [(0, 0), (1, 1), (2, 0)]
+            >>> [len(ModularExponantiation.chain(exponent)) for exponent in [1, 3, 17, 65537]]
+            [0, 2, 5, 17]
+
+            Large exponents use wider windows
+            >>> exponent = 2 ** 255 - 19
+            >>> len(ModularExponantiation.sliding_window_chain(exponent, 1)), len(ModularExponantiation.chain(exponent))
+            (506, 316)
         """
-        temp_exponent = self.exponent
-        verifications = []
-
-        nr_squares = 0
-        nr_multiplications = 0
-        nr_proofs = 0
-        while temp_exponent > 0:
-            if temp_exponent % 2 == 0:
-                committed_value = self.commitments_squares[nr_squares]
-                committed_result = self.commitments_squares[nr_squares + 1]
-                verifications.append(self.proofs_exponantiations[nr_proofs].verify(com_pk, committed_value, committed_result, commitment_modulo))
-                nr_squares += 1
-                nr_proofs += 1
-                temp_exponent /= 2
-            else:
-                committed_value_1 = self.commitments_squares[nr_squares]
-                committed_value_2 = self.commitments_multiplication[nr_multiplications]
-                committed_result = self.commitments_multiplication[nr_multiplications + 1]
-                verifications.append(self.proofs_exponantiations[nr_proofs].verify(com_pk, committed_value_1, committed_value_2, committed_result, commitment_modulo))
-                nr_multiplications += 1
-                nr_proofs += 1
-                temp_exponent -= 1
+        exponent = int(exponent)
+        if exponent < 1:
+            raise ValueError("The exponent must be a positive integer")
+        return min((ModularExponantiation.sliding_window_chain(exponent, width)
+                    for width in ModularExponantiation.WINDOW_WIDTHS), key=len)
+
+    @staticmethod
+    def sliding_window_chain(exponent, width):
+        """
+        Chain (see chain) of the left to right sliding window exponentiation with windows of up to width bits. The
+        odd powers needed by the windows are computed first, from the square of the base.
+        """
+        bits = bin(exponent)[2:]
+        windows = []
+        position = 0
+        while position < len(bits):
+            if bits[position] == '0':
+                windows.append((0, 1))
+                position += 1
+                continue
+            end = min(position + width, len(bits))
+            while bits[end - 1] == '0':
+                end -= 1
+            windows.append((int(bits[position:end], 2), end - position))
+            position = end
+
+        steps = []
+
+        def step(index_1, index_2):
+            steps.append((index_1, index_2))
+            return len(steps)
+
+        odd_powers = {1: 0}
+        largest = max(value for value, _ in windows)
+        if largest > 1:
+            square = step(0, 0)
+            for value in range(3, largest + 1, 2):
+                odd_powers[value] = step(odd_powers[value - 2], square)
+
+        result = odd_powers[windows[0][0]]
+        for value, length in windows[1:]:
+            for _ in range(length):
+                result = step(result, result)
+            if value:
+                result = step(result, odd_powers[value])
+        return steps
+
+
+def step_proof(com_pk, square, operands, modulus, commitment_modulo, random_committed_modulo, profile=None):
+    """
+    Proof of a step of the chain of a ModularExponantiation, a squaring or a multiplication, from its operands: the
+    values, commitments and randoms of its two inputs and of its result. The ranges of the operands and of the
+    modulus are proven apart (see wire_range_proof).
+    """
+    value_1, value_2, result, commitment_1, commitment_2, commitment_result, random_1, random_2, random_result = \
+        operands
+    if square:
+        return ModularSquaringZKP(com_pk, value_1, result, modulus, commitment_1, commitment_result, commitment_modulo,
+                                  random_1, random_result, random_committed_modulo, profile=profile,
+                                  wire_ranges=False)
+    return ModularMultiplicationZKP(com_pk, value_1, value_2, result, modulus, commitment_1, commitment_2,
+                                    commitment_result, commitment_modulo, random_1, random_2, random_result,
+                                    random_committed_modulo, profile=profile, wire_ranges=False)
+
+
+def wire_range_proof(com_pk, value, commitment, random, upper_bound_moduli, profile=None):
+    """ Proof that a value committed in a ModularExponantiation is in [-2^upper_bound_moduli, 2^upper_bound_moduli] """
+    upper_bound = Bn.from_num(2) ** upper_bound_moduli
+    return ProofRange(com_pk, value, commitment, random, - upper_bound, upper_bound, profile=profile)
 
-        check_1 = self.commitments_multiplication[-1] == com_pk.commit([message], self.randomiser_result)
 
-        return check_1 and all(verifications)
+# Keys of the worker processes by generators, so that each worker sets up its group, and fills its cache of the
+# powers of the bounds, once
+_worker_keys = {}
+
+
+def _proof_task(task):
+    generators, prover, arguments, profile = task
+    key = repr(generators)
+    if key not in _worker_keys:
+        com_pk = PublicKey(FFGroup(), 1)
+        com_pk.generators = decode(generators, com_pk.group)
+        _worker_keys[key] = com_pk
+    com_pk = _worker_keys[key]
+    return encode(prover(com_pk, *decode(arguments, com_pk.group), profile=profile))
 
 
 class ModularSquaringZKP:
+    # Attributes of the compact form of the proof (see primitives.transcript). The bounds of the range proofs follow
+    # from the upper_bound_moduli given to the verifier, and the key of the secret exponent from commitment_modulo and
+    # h_base_verification.
+    TRANSCRIPT = ('range_added_value_1', 'range_result', 'range_modulo', 'h_base_verification',
+                  'range_secret_exponent')
+
     def __init__(self, com_pk, value, result, modulo,
                  commitment_value, commitment_result, commitment_modulo,
                  random_comm_value, random_comm_result, random_comm_modulo,
-                 upper_bound_moduli=2049):
+                 upper_bound_moduli=2049, profile=None, wire_ranges=True):
         """
         Prove that value ^ 2 = result mod modulo in zero knowledge.
 
         :param security_parameter: We should prepare it in such a way that we do not use the hardcoded values. For
         the moment we stick to that for evaluation
+        :param profile: SecurityProfile, or its name, of the range and same log proofs
+        :param wire_ranges: Whether to prove the ranges of the committed value, the result and the modulus (see
+        ModularMultiplicationZKP)
         """
 
         self.group = com_pk.group
@@ -150,20 +333,23 @@ class ModularSquaringZKP:
 
         order_bits = self.order.num_bits()
         modulo_bits = modulo.num_bits()
+        self.upper_bound_moduli = upper_bound_moduli
         self.upper_bound_calculations = Bn.from_num(2) ** (upper_bound_moduli)
         self.lower_bound_calculations = - (Bn.from_num(2) ** (upper_bound_moduli))
 
 
         # Range proofs
         self.time_range_proofs = time()
-        self.range_added_value_1 = ProofRange(com_pk, value, commitment_value, random_comm_value,
-                                              self.lower_bound_calculations, self.upper_bound_calculations)
+        self.range_added_value_1 = self.range_result = self.range_modulo = None
+        if wire_ranges:
+            self.range_added_value_1 = ProofRange(com_pk, value, commitment_value, random_comm_value,
+                                                  self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
-        self.range_result = ProofRange(com_pk, result, commitment_result, random_comm_result,
-                                  self.lower_bound_calculations, self.upper_bound_calculations)
+            self.range_result = ProofRange(com_pk, result, commitment_result, random_comm_result,
+                                           self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
-        self.range_modulo = ProofRange(com_pk, modulo, commitment_modulo, random_comm_modulo,
-                                  self.lower_bound_calculations, self.upper_bound_calculations)
+            self.range_modulo = ProofRange(com_pk, modulo, commitment_modulo, random_comm_modulo,
+                                           self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
         self.time_secret_exponent = time()
         secret_exponent = (result - value * value) / modulo
@@ -178,12 +364,16 @@ class ModularSquaringZKP:
 
 
         self.range_secret_exponent = ProofRange(self.com_pk_exponent, secret_exponent, self.commitment_secret_exponent, Bn.from_num(1),
-                                   self.lower_bound_calculations, self.upper_bound_calculations)
+                                   self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
         self.time_end = time()
 
-    def verify(self, com_pk, commitment_value, commitment_result, commitment_modulo):
+    def verify(self, com_pk, commitment_value, commitment_result, commitment_modulo, context=None, wire_ranges=True,
+               profile=None, upper_bound_moduli=2049):
         """
-        Verify modular addition
+        Verify modular squaring, optionally deferring the group equations of the sub-proofs to a VerificationContext.
+        With wire_ranges False, the ranges of the committed value, the result and the modulus are left to the caller.
+        The range proofs are verified under the SecurityProfile (or its name) profile, the default one if not given,
+        for the range [-2^upper_bound_moduli, 2^upper_bound_moduli].
 
         Example:
             # >>> value, result, modulo = generate_dummy_data()
@@ -202,15 +392,20 @@ class ModularSquaringZKP:
             # True
 
         """
-        check1 = self.range_added_value_1.verify(com_pk, commitment_value, self.lower_bound_calculations, self.upper_bound_calculations)
-
-        check3 = self.range_result.verify(com_pk, commitment_result, self.lower_bound_calculations, self.upper_bound_calculations)
-        check4 = self.range_modulo.verify(com_pk, commitment_modulo, self.lower_bound_calculations, self.upper_bound_calculations)
-
-        check5 = self.range_secret_exponent.verify(self.com_pk_exponent, commitment_result,
-                                                   self.lower_bound_calculations, self.upper_bound_calculations)
-
-        return check1 and check3 and check4 and check5
+        upper_bound = Bn.from_num(2) ** upper_bound_moduli
+        lower_bound = - upper_bound
+        com_pk_exponent = copy(com_pk)
+        com_pk_exponent.generators = [commitment_modulo.commitment, self.h_base_verification]
+        checks = []
+        if wire_ranges:
+            checks += wire_range_checks(com_pk, lower_bound, upper_bound, profile, [
+                ('range_value', self.range_added_value_1, commitment_value),
+                ('range_result', self.range_result, commitment_result),
+                ('range_modulo', self.range_modulo, commitment_modulo)
+            ])
+        checks.append(('range_secret_exponent', lambda sub_context: self.range_secret_exponent.verify(
+            com_pk_exponent, commitment_result, lower_bound, upper_bound, sub_context, profile)))
+        return verify_in_order(context, checks)
 
 
 def exponantiation(message, exponent, modulo):
@@ -259,3 +454,5 @@ if __name__ == '__main__':
     time_end = time()
     print("time generating full proof: ", time_full_verif - time_full_proof)
     print("time verifying full proof: ", time_end - time_full_verif)
+    print("bound cache hit rate: ", G.power_cache_hit_rate(), " (", G.power_cache_hits, " hits, ",
+          G.power_cache_misses, " misses)")
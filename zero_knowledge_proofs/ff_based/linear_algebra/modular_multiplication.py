@@ -1,5 +1,6 @@
 from primitives.pedersen import PublicKey, Commitment
 from primitives.algebra_lib import FFGroup
+from primitives.verification_context import VerificationContext, verify_in_order
 from zero_knowledge_proofs.ff_based.proof_range_ff import ProofRange
 from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSameLog
 
@@ -8,15 +9,25 @@ from time import time
 
 
 class ModularMultiplicationZKP:
+    # Attributes of the compact form of the proof (see primitives.transcript). The bounds of the range proofs follow
+    # from the upper_bound_moduli given to the verifier, and the key of the secret exponent from commitment_modulo and
+    # h_base_verification.
+    TRANSCRIPT = ('range_added_value_1', 'range_added_value_2', 'range_result', 'range_modulo',
+                  'h_base_verification', 'normal_commitment_secret_exponent', 'lets_try_this_proof',
+                  'range_secret_exponent')
+
     def __init__(self, com_pk, multiplied_value_1, multiplied_value_2, result, modulo,
                  commitment_multiplied_1, commitment_multiplied_2, commitment_result, commitment_modulo,
                  random_comm_value1, random_comm_value2, random_comm_result, random_comm_modulo,
-                 upper_bound_moduli=2048):
+                 upper_bound_moduli=2048, profile=None, wire_ranges=True):
         """
         Prove that multiplied_value_1 * multiplied_value_2 = result mod modulo in zero knowledge.
 
         :param security_parameter: We should prepare it in such a way that we do not use the hardcoded values. For
         the moment we stick to that for evaluation
+        :param profile: SecurityProfile, or its name, of the range and same log proofs
+        :param wire_ranges: Whether to prove the ranges of the committed values, the result and the modulus. A caller
+        proving them elsewhere, such as ModularExponantiation, which proves each committed value once, leaves them out.
         """
 
         self.group = com_pk.group
@@ -24,23 +35,26 @@ class ModularMultiplicationZKP:
 
         order_bits = self.order.num_bits()
         modulo_bits = modulo.num_bits()
+        self.upper_bound_moduli = upper_bound_moduli
         self.upper_bound_calculations = Bn.from_num(2) ** (upper_bound_moduli)
         self.lower_bound_calculations = - (Bn.from_num(2) ** (upper_bound_moduli))
 
 
         # Range proofs
         self.time_range_proofs = time()
-        self.range_added_value_1 = ProofRange(com_pk, multiplied_value_1, commitment_multiplied_1, random_comm_value1,
-                                              self.lower_bound_calculations, self.upper_bound_calculations)
+        self.range_added_value_1 = self.range_added_value_2 = self.range_result = self.range_modulo = None
+        if wire_ranges:
+            self.range_added_value_1 = ProofRange(com_pk, multiplied_value_1, commitment_multiplied_1, random_comm_value1,
+                                                  self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
-        self.range_added_value_2 = ProofRange(com_pk, multiplied_value_2, commitment_multiplied_2, random_comm_value2,
-                                              self.lower_bound_calculations, self.upper_bound_calculations)
+            self.range_added_value_2 = ProofRange(com_pk, multiplied_value_2, commitment_multiplied_2, random_comm_value2,
+                                                  self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
-        self.range_result = ProofRange(com_pk, result, commitment_result, random_comm_result,
-                                  self.lower_bound_calculations, self.upper_bound_calculations)
+            self.range_result = ProofRange(com_pk, result, commitment_result, random_comm_result,
+                                           self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
-        self.range_modulo = ProofRange(com_pk, modulo, commitment_modulo, random_comm_modulo,
-                                  self.lower_bound_calculations, self.upper_bound_calculations)
+            self.range_modulo = ProofRange(com_pk, modulo, commitment_modulo, random_comm_modulo,
+                                           self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
 
         self.time_secret_exponent = time()
         secret_exponent = (result - multiplied_value_1 * multiplied_value_2) / modulo
@@ -58,17 +72,21 @@ class ModularMultiplicationZKP:
         random_normal_comm_secret_exp = self.order.random()
         self.normal_commitment_secret_exponent = com_pk.commit([secret_exponent], random_normal_comm_secret_exp)
         self.lets_try_this_proof = ProofSameLog(secret_exponent, random_normal_comm_secret_exp, Bn.from_num(1), com_pk.generators[0], com_pk.generators[1],
-                                                self.com_pk_exponent.generators[0], self.com_pk_exponent.generators[1], self.order)
+                                                self.com_pk_exponent.generators[0], self.com_pk_exponent.generators[1], self.order, profile=profile)
 
         ''' to here, I AM GOING AROUND THE PROBLEM, NOT SOLVING IT! THIS SOLUTION IS WORSE IN PERFORMANCE! '''
 
         self.range_secret_exponent = ProofRange(com_pk, secret_exponent, self.normal_commitment_secret_exponent, random_normal_comm_secret_exp,
-                                   self.lower_bound_calculations, self.upper_bound_calculations)
+                                   self.lower_bound_calculations, self.upper_bound_calculations, profile=profile)
         self.time_end = time()
 
-    def verify(self, com_pk, commitment_multiplied_1, commitment_multiplied_2, commitment_result, commitment_modulo):
+    def verify(self, com_pk, commitment_multiplied_1, commitment_multiplied_2, commitment_result, commitment_modulo,
+               context=None, wire_ranges=True, profile=None, upper_bound_moduli=2048):
         """
-        Verify modular addition
+        Verify modular addition, optionally deferring the group equations of the sub-proofs to a VerificationContext.
+        With wire_ranges False, the ranges of the committed values, the result and the modulus are left to the caller.
+        The sub-proofs are verified under the SecurityProfile (or its name) profile, the default one if not given, and
+        the ranges are [-2^upper_bound_moduli, 2^upper_bound_moduli].
 
         Example:
             >>> added_value1, added_value2, result, modulo = generate_dummy_data()
@@ -88,25 +106,68 @@ class ModularMultiplicationZKP:
             >>> proof.verify(com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo)
             True
 
+            >>> context = VerificationContext(G)
+            >>> proof.verify(com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo, context)
+            True
+            >>> context.verify()
+            True
+
+            The compact form of the proof verifies the same way
+            >>> from primitives.transcript import compact
+            >>> compact(proof).verify(com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo)
+            True
+
+            The bounds of the ranges are given by the verifier
+            >>> proof.verify(com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo, upper_bound_moduli=1024)
+            False
+
+            A proof without the ranges of the committed values only verifies if they are proven elsewhere
+            >>> proof = ModularMultiplicationZKP(com_pk, added_value1, added_value2, result, modulo, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo, random_comm_add1, random_comm_add2, random_comm_res, random_comm_modulo, wire_ranges=False)
+            >>> proof.verify(com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo, wire_ranges=False)
+            True
+            >>> proof.verify(com_pk, commitment_added_1, commitment_added_2, commitment_result, commitment_modulo)
+            False
+
         """
-        check1 = self.range_added_value_1.verify(com_pk, commitment_multiplied_1, self.lower_bound_calculations, self.upper_bound_calculations)
-        check2 = self.range_added_value_2.verify(com_pk, commitment_multiplied_2, self.lower_bound_calculations, self.upper_bound_calculations)
-        check3 = self.range_result.verify(com_pk, commitment_result, self.lower_bound_calculations, self.upper_bound_calculations)
-        check4 = self.range_modulo.verify(com_pk, commitment_modulo, self.lower_bound_calculations, self.upper_bound_calculations)
+        upper_bound = Bn.from_num(2) ** upper_bound_moduli
+        lower_bound = - upper_bound
 
         # todo: Read the following comment
         ''' Now doing the same log verification. If this is ever taken to deployment, this must be thoroughtly studied. 
         This has been done as a avoidement of a problem, and was not defined as is in the original paper. '''
 
-        check_same_log = self.lets_try_this_proof.verify(self.normal_commitment_secret_exponent, commitment_result,
-                                                         com_pk.generators[0], com_pk.generators[1],
-                                                         self.com_pk_exponent.generators[0],
-                                                         self.com_pk_exponent.generators[1]
-                                                         )
-        check5 = self.range_secret_exponent.verify(com_pk, self.normal_commitment_secret_exponent,
-                                                   self.lower_bound_calculations, self.upper_bound_calculations)
-
-        return check1 and check2 and check3 and check4 and check_same_log and check5
+        # The same log proof is the cheapest of the sub-proofs, so it goes first
+        checks = [
+            ('same_log', lambda sub_context: self.lets_try_this_proof.verify(
+                self.normal_commitment_secret_exponent, commitment_result, com_pk.generators[0], com_pk.generators[1],
+                commitment_modulo.commitment, self.h_base_verification, sub_context, profile))
+        ]
+        if wire_ranges:
+            checks += wire_range_checks(com_pk, lower_bound, upper_bound, profile, [
+                ('range_value_1', self.range_added_value_1, commitment_multiplied_1),
+                ('range_value_2', self.range_added_value_2, commitment_multiplied_2),
+                ('range_result', self.range_result, commitment_result),
+                ('range_modulo', self.range_modulo, commitment_modulo)
+            ])
+        checks.append(('range_secret_exponent', lambda sub_context: self.range_secret_exponent.verify(
+            com_pk, self.normal_commitment_secret_exponent, lower_bound, upper_bound, sub_context, profile)))
+        return verify_in_order(context, checks)
+
+
+def wire_range_checks(com_pk, lower_bound, upper_bound, profile, wires):
+    """
+    Checks, for verify_in_order, of the range proofs of the (label, proof, commitment) wires of a modular step proof,
+    under the SecurityProfile profile. A step proven without them (wire_ranges=False) fails these checks.
+    """
+    def missing(sub_context):
+        return sub_context is not None and sub_context.require('present', False)
+
+    def check(proof, commitment):
+        if proof is None:
+            return missing
+        return lambda sub_context: proof.verify(com_pk, commitment, lower_bound, upper_bound, sub_context, profile)
+
+    return [(label, check(proof, commitment)) for label, proof, commitment in wires]
 
 
 def generate_dummy_data():
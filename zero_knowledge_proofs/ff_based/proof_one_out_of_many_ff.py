@@ -0,0 +1,213 @@
+from petlib.bn import Bn
+
+from primitives.algebra_lib import FFGroup
+from primitives.hash_function import compute_challenge
+from primitives.pedersen import PublicKey, Commitment
+from primitives.polynomial import Polynomial
+from primitives.ring import KeyRing, ring_digest
+
+
+class OneOutOfManyProof:
+    """
+    Set membership engine alternative to PolynomialProof. It works directly with the moduli of the ring, so there is
+    no ring polynomial to build or to update when keys are added or revoked.
+    """
+    # Size of the random weights used to combine the verification equations
+    WEIGHT_BITS = 128
+    # Attributes of the compact form of the proof (see primitives.transcript). The challenge follows from the
+    # commitments and the ring.
+    TRANSCRIPT = ('bit_length', 'commitments_bits', 'commitments_hidden', 'commitments_products', 'commitments_deltas',
+                  'response_bits', 'response_hidden', 'response_products', 'response_deltas')
+
+    def __init__(self, com_pk, moduli, commitment, value, random):
+        """
+        Generate proof that commitment opens to one of the moduli of the ring, without disclosing which. We follow the
+        construction by Groth and Kohlweiss in 'One-out-of-Many Proofs: Or How to Leak a Secret and Spend a Coin'.
+        Given C = g^value h^random, every c_i = C / g^moduli[i] is a commitment, and the one at the index of value is
+        a commitment to zero. The prover commits to the n bits of that index and shows that the product of the c_i,
+        each raised to a polynomial in the challenge selecting the index, opens to zero. The proof holds O(n) group
+        elements, with n the number of bits of the ring size.
+
+        Rings whose size is not a power of two are padded by repeating the last modulus, which is implicit here: with
+        the differences moduli[i] - moduli[-1], the padded entries are zero and the folds skip them.
+
+        :param moduli: Moduli of the ring, as a list or a KeyRing
+        :param commitment: Commitment to value
+        :param value: Committed modulus
+        :param random: Random used for the commitment of value
+        """
+        self.order = com_pk.order
+        moduli = self.ring_moduli(moduli)
+        if value not in moduli:
+            raise ValueError("The committed value is not in the ring")
+        index = moduli.index(value)
+        self.bit_length = self.index_bit_length(len(moduli))
+
+        bits = [(index >> j) & 1 for j in range(self.bit_length)]
+        random_bits = [self.order.random() for _ in range(self.bit_length)]
+        hidden = [self.order.random() for _ in range(self.bit_length)]
+        random_hidden = [self.order.random() for _ in range(self.bit_length)]
+        random_products = [self.order.random() for _ in range(self.bit_length)]
+        random_deltas = [self.order.random() for _ in range(self.bit_length)]
+
+        self.commitments_bits = [com_pk.commit([Bn.from_num(bit)], r) for bit, r in zip(bits, random_bits)]
+        self.commitments_hidden = [com_pk.commit([a], s) for a, s in zip(hidden, random_hidden)]
+        self.commitments_products = [com_pk.commit([a if bit else Bn.from_num(0)], t)
+                                     for bit, a, t in zip(bits, hidden, random_products)]
+
+        # Index i contributes prod_j ((1 - bit_j) X - hidden_j) if bit j of i is 0, else (bit_j X + hidden_j)
+        factors = [([a.int_neg().mod(self.order), Bn.from_num(1 - bit)], [a, Bn.from_num(bit)])
+                   for bit, a in zip(bits, hidden)]
+        coefficients = Polynomial.fold_linear_factors(self.differences(moduli, self.order), factors, self.order)
+        self.commitments_deltas = [com_pk.commit([coefficients[k].int_neg().mod(self.order)], random_deltas[k])
+                                   for k in range(self.bit_length)]
+
+        self.challenge = compute_challenge([commitment] + self.commitments_bits + self.commitments_hidden +
+                                           self.commitments_products + self.commitments_deltas +
+                                           [Bn.from_hex(ring_digest(moduli, self.order))], self.order)
+
+        self.response_bits = [Bn.from_num(bit).mod_mul(self.challenge, self.order).mod_add(a, self.order)
+                              for bit, a in zip(bits, hidden)]
+        self.response_hidden = [r.mod_mul(self.challenge, self.order).mod_add(s, self.order)
+                                for r, s in zip(random_bits, random_hidden)]
+        self.response_products = [r.mod_mul(self.challenge.mod_sub(f, self.order), self.order).mod_add(t, self.order)
+                                  for r, f, t in zip(random_bits, self.response_bits, random_products)]
+
+        power = Bn.from_num(1)
+        response_deltas = Bn.from_num(0)
+        for k in range(self.bit_length):
+            response_deltas = response_deltas.mod_sub(random_deltas[k].mod_mul(power, self.order), self.order)
+            power = power.mod_mul(self.challenge, self.order)
+        self.response_deltas = response_deltas.mod_add(random.mod_mul(power, self.order), self.order)
+
+    def verify(self, com_pk, moduli, commitment):
+        """
+        Verify proof. The verification equations are raised to random weights and checked together with a single
+        multi-exponentiation, whose size only depends on the number of bits of the ring size. The work linear in the
+        ring size is a fold of the moduli over the bits of their index, with modular multiplications only.
+
+        The weights only bind equations between elements of the group of prime order, so proofs with commitments out
+        of it (see in_group) are rejected before any combination.
+
+        Example:
+            >>> G = FFGroup()
+            >>> com_pk = PublicKey(G, 1)
+            >>> order = com_pk.order
+            >>> moduli = [order.random() for _ in range(11)]
+            >>> random = order.random()
+            >>> commitment = com_pk.commit([moduli[6]], random)
+            >>> proof = OneOutOfManyProof(com_pk, moduli, commitment, moduli[6], random)
+            >>> proof.bit_length
+            4
+            >>> proof.verify(com_pk, moduli, commitment)
+            True
+
+            The moduli can also be given as integers
+            >>> proof.verify(com_pk, [int(modulus) for modulus in moduli], commitment)
+            True
+            >>> proof.verify(com_pk, moduli[:10], commitment)
+            False
+            >>> proof.verify(com_pk, moduli, com_pk.commit([moduli[6]], order.random()))
+            False
+
+            Works with a KeyRing, also for the last modulus, which covers the padded indices
+            >>> key_ring = KeyRing(moduli, order)
+            >>> commitment = com_pk.commit([key_ring.moduli[-1]], random)
+            >>> proof = OneOutOfManyProof(com_pk, key_ring, commitment, key_ring.moduli[-1], random)
+            >>> proof.verify(com_pk, key_ring, commitment)
+            True
+
+            A commitment multiplied by the element of order two is not missed by an even weight
+            >>> from primitives.algebra_lib import FFElement
+            >>> minus_one = FFElement(G.modulo - 1, G.modulo, order)
+            >>> proof.verify(com_pk, key_ring, Commitment(commitment.commitment * minus_one))
+            False
+            >>> proof.commitments_deltas[0] = Commitment(proof.commitments_deltas[0].commitment * minus_one)
+            >>> proof.verify(com_pk, key_ring, commitment)
+            False
+
+            A value outside the ring cannot be proven
+            >>> OneOutOfManyProof(com_pk, moduli, commitment, order.random(), random)
+            Traceback (most recent call last):
+            ...
+            ValueError: The committed value is not in the ring
+        """
+        order = com_pk.order
+        moduli = self.ring_moduli(moduli)
+        if self.bit_length != self.index_bit_length(len(moduli)):
+            return False
+        lengths = [len(self.commitments_bits), len(self.commitments_hidden), len(self.commitments_products),
+                   len(self.commitments_deltas), len(self.response_bits), len(self.response_hidden),
+                   len(self.response_products)]
+        if any(length != self.bit_length for length in lengths) or not self.in_group(com_pk.group, commitment):
+            return False
+
+        challenge = compute_challenge([commitment] + self.commitments_bits + self.commitments_hidden +
+                                      self.commitments_products + self.commitments_deltas +
+                                      [Bn.from_hex(ring_digest(moduli, order))], order)
+
+        # Exponent of g in prod_i c_i^(prod_j f_j,bit_j(i)): the moduli weighted by the same products, as a fold over
+        # the differences plus the padding modulus times challenge^n (the products add up to challenge^n)
+        points = [(challenge.mod_sub(f, order), f) for f in self.response_bits]
+        power = challenge.mod_pow(self.bit_length, order)
+        moduli_sum = Polynomial.fold_multilinear(self.differences(moduli, order), points, order).mod_add(
+            moduli[-1].mod_mul(power, order), order)
+
+        weight_bound = Bn.from_num(2).pow(self.WEIGHT_BITS)
+        bases = [commitment]
+        exponents = [power]
+        exponent_g = moduli_sum.int_neg()
+        exponent_h = self.response_deltas.int_neg()
+        power = Bn.from_num(1)
+        for j in range(self.bit_length):
+            weight_hidden, weight_products = weight_bound.random(), weight_bound.random()
+            # c_bits^challenge c_hidden == Com(f; z_hidden) and c_bits^(challenge - f) c_products == Com(0; z_products)
+            bases += [self.commitments_bits[j], self.commitments_hidden[j], self.commitments_products[j]]
+            exponents += [weight_hidden.mod_mul(challenge, order).mod_add(
+                weight_products.mod_mul(points[j][0], order), order), weight_hidden, weight_products]
+            exponent_g = exponent_g.mod_sub(weight_hidden.mod_mul(self.response_bits[j], order), order)
+            exponent_h = exponent_h.mod_sub(weight_hidden.mod_mul(self.response_hidden[j], order), order).mod_sub(
+                weight_products.mod_mul(self.response_products[j], order), order)
+
+            bases.append(self.commitments_deltas[j])
+            exponents.append(power.int_neg())
+            power = power.mod_mul(challenge, order)
+
+        bases += [Commitment(generator) for generator in com_pk.generators]
+        exponents += [exponent_g, exponent_h]
+
+        return com_pk.multi_exponentiation(bases, exponents) == com_pk.commit([Bn.from_num(0)], Bn.from_num(0))
+
+    def in_group(self, group, commitment):
+        """ Whether the commitments of the proof and commitment are elements of the group of prime order """
+        commitments = self.commitments_bits + self.commitments_hidden + self.commitments_products + \
+            self.commitments_deltas + [commitment]
+        return all(group.is_member(commitment.commitment) for commitment in commitments)
+
+    @staticmethod
+    def differences(moduli, order):
+        """ moduli[i] - moduli[-1] for all but the last modulus, so that padded indices are implicit zeros """
+        return [modulus.mod_sub(moduli[-1], order) for modulus in moduli[:-1]]
+
+    @staticmethod
+    def ring_moduli(moduli):
+        """ Moduli of the ring as Bn, whether they are given as a KeyRing, Bn or integers """
+        if isinstance(moduli, KeyRing):
+            moduli = moduli.moduli
+        return [modulus if isinstance(modulus, Bn) else Bn.from_decimal(str(modulus)) for modulus in moduli]
+
+    @staticmethod
+    def index_bit_length(size):
+        """
+        Number of bits of the indices of a ring of the given size.
+
+        Example:
+            >>> [OneOutOfManyProof.index_bit_length(size) for size in [1, 2, 3, 512, 513]]
+            [1, 1, 2, 9, 10]
+        """
+        return max(1, (size - 1).bit_length())
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -4,61 +4,80 @@ from petlib.ec import EcGroup, Bn
 from functools import reduce
 
 from primitives.algebra_lib import FFGroup
+from primitives.coefficient_array import CoefficientArray
 from primitives.hash_function import compute_challenge
-from primitives.pedersen import PublicKey
+from primitives.pedersen import PublicKey, Commitment
 from primitives.polynomial import Polynomial
-import math
+from primitives.ring import KeyRing
+from zero_knowledge_proofs.proof_poly_eval import PolynomialProofBase
 
 
-class PolynomialProof:
+class PolynomialProof(PolynomialProofBase):
+    # Attributes of the compact form of the proof (see primitives.transcript). The polynomial and the group are known
+    # to the verifier.
+    TRANSCRIPT = ('bit_length', 'commitments', 'commitments_hidden', 'commitments_deltas', 'commitments_exponantiations',
+                  'challenge', 'response_random_hidden', 'response_random_commitments', 'response_random_deltas',
+                  'response_random_exponantiations')
+
     def __init__(self, com_pk, polynomial_list, commitment_to_eval, commitment_eval,
-                 value_to_eval, value_eval, random_to_eval, random_eval):
+                 value_to_eval, value_eval, random_to_eval, random_eval, workers=None, random_source=None):
         """
         Generate proof of correct polynomial evaluation. We follow the construction by Bayer and Groth in
         'Zero-knowledge Argument for Polynomial Evaluation with Application to Blacklists'. The first step is to
         transform the polynomial to binary representation. See paper for a further explanation. Note that here we are
         working with cyclic groups over finite fields. Refer to proof_poly_eval_ec for the proof over elliptic curves.
 
-        :param polynomial_list: Polynomial to evaluate
+        :param polynomial_list: Polynomial to evaluate, as a list of coefficients or a KeyRing
         :param commitment_to_eval: Commitment of the value where we evaluate the polynomial
         :param commitment_eval: Commitment of the result of evaluating polynomial
         :param value_to_eval: Value where we evaluate the polynomial
         :param value_eval: Result of evaluating the polynomial
         :param random_to_eval: Random used for the commitment of value_to_eval
         :param random_eval: Random used for the commitment of value_eval
+        :param workers: For large polynomials, number of processes (or an Executor) to compute the deltas in parallel.
+            The commitments are then also computed in a pool of as many threads.
+        :param random_source: Function returning a random number below a given bound, order.random() by default. All
+            randomness is drawn before any parallel work, so the proof only depends on what it returns.
         """
 
         self.proof_generation_time = time()
         self.group = com_pk.group
         self.order = com_pk.order
 
-        self.degree = int(math.pow(2, math.ceil(math.log(len(polynomial_list) - 1, 2))))
-        self.bit_length = int(math.log(self.degree, 2))
+        if isinstance(polynomial_list, KeyRing):
+            polynomial_list = polynomial_list.coefficients
+
+        self.degree = len(polynomial_list) - 1
+        self.bit_length = self.index_bit_length(len(polynomial_list))
 
-        # Pad with zeros the polynomial to size a power of two
-        padded_zeros = [0] * (self.degree - len(polynomial_list))
-        polynomial_list.extend(padded_zeros)
+        # Coefficients beyond len(polynomial_list) are implicitly zero, so there is no need to pad the polynomial
         self.polynomial = polynomial_list
 
-        random_commitments = [self.order.random() for _ in range(self.bit_length)]
-        self.commitments = [com_pk.commit([value_to_eval.mod_pow(int(math.pow(2, i + 1)), self.order)], random_commitments[i])
-                                          for i in range(self.bit_length)]
+        # value_to_eval^(2^i) mod order for i = 0 ... bit_length, shared by the commitments, deltas and responses
+        powers = self.square_ladder(value_to_eval, self.bit_length + 1, self.order)
+
+        if random_source is None:
+            random_source = lambda bound: bound.random()
+        random_commitments = [random_source(self.order) for _ in range(self.bit_length)]
+        random_commitments_hidden = [random_source(self.order) for _ in range(self.bit_length + 1)]
+        random_hidden = [random_source(self.order) for _ in range(self.bit_length + 1)]
+        random_commitments_deltas = [random_source(self.order) for _ in range(self.bit_length + 1)]
+        random_commitments_exponantiations = [random_source(self.order) for _ in range(self.bit_length)]
+
+        deltas = self.hidden_polynomial_computation(powers, random_hidden, workers=workers)
+
+        openings = [(powers[i + 1], random_commitments[i]) for i in range(self.bit_length)] + \
+                   list(zip(random_hidden, random_commitments_hidden)) + \
+                   list(zip(deltas, random_commitments_deltas)) + \
+                   [(random_hidden[i].mod_mul(powers[i], self.order), random_commitments_exponantiations[i])
+                    for i in range(self.bit_length)]
+        commitments = self.commit_all(com_pk, openings, workers=workers)
+        self.commitments = [commitment_to_eval] + commitments[:self.bit_length]
+        self.commitments_hidden = commitments[self.bit_length:2 * self.bit_length + 1]
+        self.commitments_deltas = commitments[2 * self.bit_length + 1:3 * self.bit_length + 2]
+        self.commitments_exponantiations = commitments[3 * self.bit_length + 2:]
 
         random_commitments.insert(0, random_to_eval)
-        self.commitments.insert(0, commitment_to_eval)
-
-        random_commitments_hidden = [self.order.random() for _ in range(self.bit_length + 1)]
-        random_hidden = [self.order.random() for _ in range(self.bit_length + 1)]
-        self.commitments_hidden = [com_pk.commit([a], b) for a, b in zip(random_hidden, random_commitments_hidden)]
-
-        deltas = self.hidden_polynomial_computation(value_to_eval, random_hidden)
-        random_commitments_deltas = [self.order.random() for _ in range(self.bit_length + 1)]
-        self.commitments_deltas = [com_pk.commit([a], b) for a, b in zip(deltas, random_commitments_deltas)]
-
-        random_commitments_exponantiations = [self.order.random() for _ in range(self.bit_length)]
-        self.commitments_exponantiations = [com_pk.commit([random_hidden[i] * (value_to_eval ** (2 ** i))],
-                                            random_commitments_exponantiations[i])
-                                            for i in range(self.bit_length)]
 
         # Compute challenge
         self.challenge = compute_challenge(self.commitments +
@@ -67,7 +86,8 @@ class PolynomialProof:
                                       self.commitments_hidden, self.order)
 
         # Response
-        self.response_random_hidden = [self.challenge * value_to_eval ** (2 ** i) + random_hidden[i] for i in range(self.bit_length + 1)]
+        self.response_random_hidden = [self.challenge.mod_mul(powers[i], self.order).mod_add(random_hidden[i], self.order)
+                                       for i in range(self.bit_length + 1)]
         self.response_random_commitments = [self.challenge * random_commitments[i] + random_commitments_hidden[i] for i in range(self.bit_length + 1)]
 
         self.response_random_deltas = self.challenge.mod_pow(self.bit_length + 1, self.order) * random_eval + \
@@ -80,9 +100,9 @@ class PolynomialProof:
 
         self.proof_generation_end_time = time()
 
-    def verify(self, com_pk, polynomial_list, commitment_to_eval, commitment_eval):
+    def verify(self, com_pk, polynomial_list, commitment_to_eval, commitment_eval, workers=None):
         """
-        Verify proof
+        Verify proof. For very large rings, `workers` folds the coefficients in a process pool.
 
         Example:
             >>> G = FFGroup()
@@ -101,6 +121,10 @@ class PolynomialProof:
             >>> proof.verify(com_pk, polynomial_list, commitment_to_eval, commitment_eval)
             True
 
+            A polynomial with more coefficients than the indices of the proof cover is rejected, not an error
+            >>> proof.product_rhs_calculation(polynomial_list * 4, order) is None
+            True
+
             >>> G = FFGroup()
             >>> com_pk = PublicKey(G, 1)
             >>> order = com_pk.order
@@ -118,10 +142,49 @@ class PolynomialProof:
             >>> commitment_eval = com_pk.commit([value_eval], random_eval)
 
             >>> proof = PolynomialProof(com_pk, polynomial_list, commitment_to_eval, commitment_eval, value_to_eval, value_eval, random_to_eval, random_eval)
-            >>> proof.proof_generation_end_time - proof.proof_generation_time
+            >>> proof.proof_generation_end_time - proof.proof_generation_time > 0
+            True
             >>> proof.verify(com_pk, polynomial_list, commitment_to_eval, commitment_eval)
             True
 
+            The verifier can also read the coefficients lazily from a memory-mapped ring store
+            >>> import tempfile
+            >>> from primitives.ring_store import RingStore
+            >>> store = RingStore(tempfile.mkdtemp())
+            >>> digest = store.save(roots, order, polynomial_list)
+            >>> proof.verify(com_pk, store.load(roots, order), commitment_to_eval, commitment_eval)
+            True
+
+            Or from a compact coefficient array, on the prover side as well
+            >>> compact = CoefficientArray.from_values(polynomial_list, order)
+            >>> proof = PolynomialProof(com_pk, compact, commitment_to_eval, commitment_eval, value_to_eval, value_eval, random_to_eval, random_eval)
+            >>> proof.verify(com_pk, compact, commitment_to_eval, commitment_eval)
+            True
+
+            With a fixed random source, the parallel prover gives the same proof as the sequential one
+            >>> from random import Random
+            >>> def seeded_source(seed):
+            ...     generator = Random(seed)
+            ...     return lambda bound: Bn.from_decimal(str(generator.randrange(int(bound))))
+            >>> sequential = PolynomialProof(com_pk, polynomial_list, commitment_to_eval, commitment_eval, value_to_eval, value_eval, random_to_eval, random_eval, random_source=seeded_source(7))
+            >>> parallel = PolynomialProof(com_pk, polynomial_list, commitment_to_eval, commitment_eval, value_to_eval, value_eval, random_to_eval, random_eval, workers=2, random_source=seeded_source(7))
+            >>> parallel.challenge == sequential.challenge and parallel.response_random_deltas == sequential.response_random_deltas
+            True
+            >>> parallel.verify(com_pk, polynomial_list, commitment_to_eval, commitment_eval)
+            True
+
+            That polynomial is too small for the process pool, which only folds chunks of 2^CHUNK_BITS coefficients. With
+            smaller chunks, the proof and its verification run in the pool
+            >>> class SmallChunks(PolynomialProof):
+            ...     CHUNK_BITS = 2
+            >>> parallel = SmallChunks(com_pk, polynomial_list, commitment_to_eval, commitment_eval, value_to_eval, value_eval, random_to_eval, random_eval, workers=2, random_source=seeded_source(7))
+            >>> parallel.response_random_deltas == sequential.response_random_deltas
+            True
+            >>> parallel.verify(com_pk, polynomial_list, commitment_to_eval, commitment_eval, workers=2)
+            True
+            >>> parallel.product_rhs_calculation(polynomial_list, order, workers=2) == sequential.product_rhs_calculation(polynomial_list, order)
+            True
+
             Now, it should not validate as value_eval is not P(value_to_eval)
             >>> value_eval = Bn.from_num(3333)
             >>> random_eval = order.random()
@@ -148,9 +211,11 @@ class PolynomialProof:
             >>> proof.verify(com_pk, polynomial_list, commitment_to_eval, commitment_eval)
             False
         """
-        # Pad with zeros the polynomial to size a power of two
-        padded_zeros = [0] * (self.degree - len(polynomial_list))
-        polynomial_list.extend(padded_zeros)
+        if isinstance(polynomial_list, KeyRing):
+            polynomial_list = polynomial_list.coefficients
+        if not self.well_formed(self.index_bit_length(len(polynomial_list)), commitment_to_eval):
+            return False
+        order = com_pk.order
 
         check1 = [(self.commitments[i] ** self.challenge) * self.commitments_hidden[i] ==
          com_pk.commit([self.response_random_hidden[i]], self.response_random_commitments[i]) for i in range(self.bit_length + 1)]
@@ -159,62 +224,21 @@ class PolynomialProof:
                   self.commitments_exponantiations[i] == com_pk.commit([Bn.from_num(0)], self.response_random_exponantiations[i])
                   for i in range(self.bit_length)]
 
-        product_lhs = reduce(lambda a, b: a * b, [self.commitments_deltas[i] ** (self.challenge.mod_pow(i, self.order))
+        product_lhs = reduce(lambda a, b: a * b, [self.commitments_deltas[i] ** (self.challenge.mod_pow(i, order))
                                                   for i in range(self.bit_length + 1)])
-        product_rhs = self.product_rhs_calculation(polynomial_list)
-        check3 = commitment_eval ** (self.challenge.mod_pow(self.bit_length + 1, self.order)) * product_lhs == \
+        product_rhs = self.product_rhs_calculation(polynomial_list, order, workers=workers)
+        if product_rhs is None:
+            return False
+        check3 = commitment_eval ** (self.challenge.mod_pow(self.bit_length + 1, order)) * product_lhs == \
                  com_pk.commit([product_rhs], self.response_random_deltas)
 
         return all(check1) and all(check2) and check3
 
-    def hidden_polynomial_computation(self, value_to_eval, random_hidden):
-        """
-        Evaluate polynomial of step 3 in the algorithm description
-        """
-        final_poly = Polynomial([0], modulo=self.order)
-        for i in range(len(self.polynomial)):
-            bin_repr_i = PolynomialProof.binary_repr_int(i, self.bit_length + 1)
-            temp_poly = []
-            for j in range(self.bit_length + 1):
-                temp_poly.append(
-                    (Polynomial([random_hidden[j], value_to_eval.mod_pow(int(math.pow(2, j)), self.order)], modulo=self.order) **
-                    bin_repr_i[j]) * Polynomial([bin_repr_i[j], (1-bin_repr_i[j])], modulo=self.order))
-
-            final_poly += reduce(lambda a, b: a * b, temp_poly) * self.polynomial[i]
-
-        coeff = final_poly.coefficients
-        if len(coeff) < self.bit_length + 2:
-            return final_poly.coefficients
-        else:
-            return final_poly.coefficients[:-1]
-
-    def product_rhs_calculation(self, polynomial_list):
-        final_poly = 0
-        for i in range(len(polynomial_list)):
-            bin_repr_i = PolynomialProof.binary_repr_int(i, self.bit_length + 1)
-            temp_poly = [self.response_random_hidden[j] ** bin_repr_i[j] * self.challenge ** (1 - bin_repr_i[j])
-                         for j in range(self.bit_length + 1)]
-
-            final_poly += reduce(lambda a, b: (a * b).mod(self.order), temp_poly) * polynomial_list[i]
-
-        return final_poly
-
-    @staticmethod
-    def binary_repr_int(a, length):
-        """
-        Get the binary representation of a number
-        :param a: Value to converto to binary
-        :param length: desired length of the binary string (padded with zeros)
-
-        Order is with lsb in position 0
-        Example:
-            >>> PolynomialProof.binary_repr_int(3, 4)
-            [1, 1, 0, 0]
-        """
-        bin_number = [int(x) for x in bin(a)[2:]]
-        to_extend = [0] * (length - len(bin_number))
-        to_extend.extend(bin_number)
-        return to_extend[::-1]
+    def in_group(self, group, commitment_eval):
+        """ Whether the commitments of the proof and commitment_eval are elements of the group of prime order """
+        commitments = self.commitments + self.commitments_hidden + self.commitments_deltas + \
+            self.commitments_exponantiations + [commitment_eval]
+        return all(group.is_member(commitment.commitment) for commitment in commitments)
 
 
 def calculate_roots(size):
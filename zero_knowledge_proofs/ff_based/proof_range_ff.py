@@ -2,9 +2,14 @@ from petlib.ec import Bn
 from primitives.algebra_lib import FFGroup
 from primitives.pedersen import PublicKey, Commitment
 from primitives.hash_function import compute_challenge
-from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSameLog, ProofSquare
+from primitives.verification_context import VerificationContext
+from zero_knowledge_proofs.ff_based.proof_square_ff import ProofSameLog, ProofSquare, SameLogBlinding, SquareBlinding
+from zero_knowledge_proofs.ff_based.security_profile import security_profile
 
+from copy import copy
 from time import time
+import queue
+import threading
 
 
 class ProofRange:
@@ -13,77 +18,105 @@ class ProofRange:
     working with cyclic groups over elliptic curves. This code should be changed if we want to use it over finite
     fields.
     """
-    def __init__(self, com_pk, number, commitment_number, random_commitment, lower_bound, upper_bound, security_parameter_1=120, security_parameter_2=2050):
+    # Attributes of the compact form of the proof (see primitives.transcript). The commitments shifted by the bounds,
+    # the key of the square proof, the commitment to m_1 and the challenges follow from the statement and the rest of
+    # the transcript. The size of the challenges is set by the verifier.
+    TRANSCRIPT = ('commitment_difference_bound_number', 'proof_same_log', 'commitment_square',
+                  'proof_square', 'commitment_m_2', 'commitment_m_3', 'proof_square_2', 'response_ms_1',
+                  'response_ms_2', 'response_rs_1', 'response_rs_2')
+
+    def __init__(self, com_pk, number, commitment_number, random_commitment, lower_bound, upper_bound, security_parameter_1=None, security_parameter_2=None, bundle=None, profile=None):
         """
         Genearte the proof that number 'number' is between 'lower_bound' and 'upper_bound'
 
         Attention with the choices of these parameters
-        :param security_parameter_1: small (but sufficiently large number) 160
+        :param security_parameter_1: small (but sufficiently large number) 160. Defaults to the range_challenge_bits
+        of the profile.
         :param security_parameter_2: Number bigger than the order of the group we are working on (in this case 224, so
-        we are safe to go with 250, If we work with RSA, it should be bigger.
+        we are safe to go with 250, If we work with RSA, it should be bigger. Defaults to the mask_bits of the profile.
+        :param bundle: RangeProofBundle with the part of the proof that does not depend on number, prepared ahead of
+        time for com_pk (e.g. by a RangeProofPrecomputation). If not given, it is computed here. A bundle can only be
+        used by one proof, as two proofs sharing its randoms would disclose the difference of their numbers.
+        :param profile: SecurityProfile, or its name, of the proof and its sub-proofs. The default one if not given.
         """
         self.time_init = time()
         self.com_pk = com_pk
+        profile = security_profile(profile)
+        if security_parameter_1 is None:
+            security_parameter_1 = profile.range_challenge_bits
+        if security_parameter_2 is None:
+            security_parameter_2 = profile.mask_bits
         self.security_parameter_1 = Bn.from_num(2).pow(security_parameter_1)
         self.security_parameter_2 = Bn.from_num(2).pow(security_parameter_2)
 
         self.order = self.com_pk.order
 
+        if bundle is None:
+            bundle = RangeProofBundle(com_pk, security_parameter_2, profile)
+        elif bundle.consumed:
+            raise ValueError("The bundle was already used by another proof")
+        elif bundle.security_parameter_2 != security_parameter_2:
+            raise ValueError("The bundle was prepared for another security parameter")
+        elif bundle.profile != profile:
+            raise ValueError("The bundle was prepared for another security profile")
+        bundle.consumed = True
+
         # todo: check
-        self.commitment_one = commitment_number.commitment / (self.com_pk.generators[0] ** (lower_bound - 1).mod(self.order))
-        self.commitment_two = (self.com_pk.generators[0] ** (upper_bound + 1)) / commitment_number.commitment
+        # The bounds are often the same for many proofs, so their powers are cached by the group
+        self.commitment_one = commitment_number.commitment / self.com_pk.group.cached_power(self.com_pk.generators[0],
+                                                                                           lower_bound - 1)
+        self.commitment_two = self.com_pk.group.cached_power(self.com_pk.generators[0], upper_bound + 1) / \
+            commitment_number.commitment
 
-        random_commitment_difference = self.security_parameter_2.random()
+        random_commitment_difference = bundle.random_commitment_difference
         self.commitment_difference_bound_number = Commitment(
-            self.commitment_one ** (upper_bound - number + 1) *
-            self.com_pk.generators[1] ** random_commitment_difference
+            self.commitment_one ** (upper_bound - number + 1) * bundle.power_h_difference
         )
         self.time_setting = time()
         # Proof that commitment_difference_bound_number and commitment_two have the same log
         self.proof_same_log = ProofSameLog(
             upper_bound - number + 1, (- random_commitment).mod(self.order), random_commitment_difference,
             self.com_pk.generators[0], self.com_pk.generators[1], self.commitment_one, self.com_pk.generators[1],
-            self.order
+            self.order, blinding=bundle.same_log, profile=profile
         )
         self.time_proof_same_log = time()
-        root_to_square = self.security_parameter_2.random()
-        random_commitment_square = self.security_parameter_2.random()
+        root_to_square = bundle.root_to_square
+        random_commitment_square = bundle.random_commitment_square
         # todo: this commitment is not consistent with the self.com_pk_commitment_square in the multiplication proof...
         self.commitment_square = Commitment(
             self.commitment_difference_bound_number.commitment ** root_to_square.mod_pow(2, self.order) *
-            self.com_pk.generators[1] ** random_commitment_square
+            bundle.power_h_square
         )
 
-        self.com_pk_commitment_square = PublicKey(com_pk.group, 1)
-        self.com_pk_commitment_square.generators[0] = self.commitment_difference_bound_number.commitment
-        self.com_pk_commitment_square.generators[1] = self.com_pk.generators[1]
+        self.com_pk_commitment_square = self.com_pk_square(com_pk, self.commitment_difference_bound_number)
         # proof that it is a square
         self.proof_square = ProofSquare(
-            self.com_pk_commitment_square, root_to_square, self.commitment_square, random_commitment_square
+            self.com_pk_commitment_square, root_to_square, self.commitment_square, random_commitment_square,
+            blinding=bundle.square, profile=profile
         )
         self.time_proof_square = time()
         value_to_find_sum = root_to_square ** 2 * (number - lower_bound + 1) * (upper_bound - number + 1)
 
-        m_4 = self.security_parameter_2.random()
-        m_3 = m_4.pow(2)
-        m_2 = self.security_parameter_2.random()
+        m_3 = bundle.m_3
+        m_2 = bundle.m_2
         m_1 = value_to_find_sum - m_3 - m_2
 
         commitment_of_summed = root_to_square ** 2 * \
                                ((upper_bound - number + 1) * random_commitment + random_commitment_difference) + \
                                random_commitment_square
 
-        r_3 = self.security_parameter_2.random()
-        r_2 = self.security_parameter_2.random()
+        r_3 = bundle.random_m_3
+        r_2 = bundle.random_m_2
         r_1 = commitment_of_summed - r_3 - r_2
 
-        self.commitment_m_1 = self.com_pk.commit([m_1], r_1)
-        self.commitment_m_2 = self.com_pk.commit([m_2], r_2)
-        self.commitment_m_3 = self.commitment_square.commitment / self.commitment_m_1.commitment / self.commitment_m_2.commitment
+        # The commitments to m_2 and m_3 come with the bundle, and commitment_square opens to the sums of the
+        # values and randoms, so the commitment to m_1 follows without exponentiations
+        self.commitment_m_2 = bundle.commitment_m_2
+        self.commitment_m_3 = bundle.commitment_m_3
+        self.commitment_m_1 = Commitment(self.commitment_square.commitment / self.commitment_m_2.commitment /
+                                         self.commitment_m_3)
 
-        self.proof_square_2 = ProofSquare(
-            self.com_pk, m_4, self.commitment_m_3, r_3
-        )
+        self.proof_square_2 = bundle.proof_square_2
         self.time_proof_second_square = time()
         # todo: challenge not properly computed. Check the security considerations
         self.challenge_1 = compute_challenge([self.commitment_m_1, self.commitment_m_2, self.commitment_m_3], self.security_parameter_1)
@@ -96,9 +129,13 @@ class ProofRange:
 
         self.time_response_calc = time()
 
-    def verify(self, com_pk, commitment_number, lower_bound, upper_bound):
+    def verify(self, com_pk, commitment_number, lower_bound, upper_bound, context=None, profile=None,
+               security_parameter_1=None):
         """
-        Verify the proof
+        Verify the proof. Given a VerificationContext, the group equations of the proof and of its sub-proofs are
+        deferred to the context, and only the checks decided right away are reflected in the returned value. The
+        sub-proofs are verified under the SecurityProfile (or its name) profile, the default one if not given, and the
+        challenges have security_parameter_1 bits, the range_challenge_bits of the profile if not given.
 
         Example:
             # >>> G = FFGroup()
@@ -158,37 +195,215 @@ class ProofRange:
             >>> proof.verify(com_pk, commitment, lower_bound, upper_bound)
             True
 
-        """
-        check1 = self.proof_same_log.verify(
-            self.commitment_two, self.commitment_difference_bound_number,
-            com_pk.generators[0], com_pk.generators[1], self.commitment_one, com_pk.generators[1]
-        )
-        check2 = self.proof_square.verify(self.com_pk_commitment_square, self.commitment_square)
+            The powers of the bounds computed for the first proof were reused
+            >>> G.power_cache_hits > 0
+            True
 
-        check3 = self.proof_square_2.verify(com_pk, self.commitment_m_3)
+            >>> context = VerificationContext(G)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound, context.child('range'))
+            True
+            >>> proof.verify(com_pk, commitment, lower_bound, number - 1, context.child('wrong_range'))
+            True
+            >>> context.verify(), context.failures
+            (False, ['wrong_range/same_log/announcement_one'])
 
-        check4 = self.commitment_one == commitment_number.commitment / com_pk.generators[0] ** (lower_bound - 1).mod(self.order)
-        check5 = self.commitment_two == com_pk.generators[0] ** (upper_bound + 1) / commitment_number.commitment
-        check6 = self.commitment_square.commitment == self.commitment_m_1.commitment * self.commitment_m_2.commitment * \
-                 self.commitment_m_3
+            The compact form of the proof verifies the same way
+            >>> from primitives.transcript import compact
+            >>> compact(proof).verify(com_pk, commitment, lower_bound, upper_bound)
+            True
 
-        self.challenge_1 = compute_challenge([self.commitment_m_1, self.commitment_m_2, self.commitment_m_3],
-                                             self.security_parameter_1)
-        self.challenge_2 = compute_challenge([self.commitment_m_1, self.commitment_m_2, self.commitment_m_3],
-                                             self.security_parameter_1)
+            A proof made with a lighter profile only verifies under that profile
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound, profile='eval-80')
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound, profile='eval-80'), proof.verify(com_pk, commitment, lower_bound, upper_bound)
+            (True, False)
 
+            The size of the challenges is also set by the verifier, as for the prover
+            >>> proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound, security_parameter_1=160)
+            >>> proof.verify(com_pk, commitment, lower_bound, upper_bound, security_parameter_1=160), proof.verify(com_pk, commitment, lower_bound, upper_bound)
+            (True, False)
+        """
+        # Checks are run in order of cost: the signs of the responses first, then the sub-proofs and the group
+        # equations. The commitments shifted by the bounds are derived here rather than read from the proof, so a
+        # proof for other bounds fails in the same log proof.
+        g, h = com_pk.generators[0], com_pk.generators[1]
+        commitment_one = commitment_number.commitment / com_pk.group.cached_power(g, lower_bound - 1)
+        commitment_two = com_pk.group.cached_power(g, upper_bound + 1) / commitment_number.commitment
+        com_pk_commitment_square = self.com_pk_square(com_pk, self.commitment_difference_bound_number)
+        commitments_m = [Commitment(self.commitment_square.commitment / self.commitment_m_2.commitment /
+                                    self.commitment_m_3), self.commitment_m_2, self.commitment_m_3]
+        if security_parameter_1 is None:
+            security_parameter_1 = security_profile(profile).range_challenge_bits
+        challenge_space = Bn.from_num(2).pow(security_parameter_1)
+        challenge_1 = compute_challenge(commitments_m, challenge_space)
+        challenge_2 = compute_challenge(commitments_m, challenge_space)
 
-        check7 = self.commitment_m_1.commitment ** self.challenge_1 * self.commitment_m_2.commitment * \
-                 self.commitment_m_3 == com_pk.generators[0] ** self.response_ms_1 * com_pk.generators[1] ** self.response_rs_1
-        check8 = self.commitment_m_1.commitment * self.commitment_m_2.commitment ** self.challenge_2 * \
-                 self.commitment_m_3 == com_pk.generators[0] ** self.response_ms_2 * com_pk.generators[1] ** self.response_rs_2
+        if context is not None:
+            decided = [
+                context.require('positive_1', self.response_ms_1.repr()[0] != '-'),
+                context.require('positive_2', self.response_ms_2.repr()[0] != '-'),
+                self.proof_same_log.verify(commitment_two, self.commitment_difference_bound_number, g, h,
+                                           commitment_one, h, context.child('same_log'), profile),
+                self.proof_square.verify(com_pk_commitment_square, self.commitment_square, context.child('square'),
+                                         profile),
+                self.proof_square_2.verify(com_pk, self.commitment_m_3, context.child('square_2'), profile)
+            ]
+            context.check('response_1', commitments_m + [g, h], [challenge_1, 1, 1, -self.response_ms_1,
+                                                                -self.response_rs_1])
+            context.check('response_2', commitments_m + [g, h], [1, challenge_2, 1, -self.response_ms_2,
+                                                                -self.response_rs_2])
+            return all(decided)
 
         # x > 0
         # y > 0
         check9 = self.response_ms_1.repr()[0] != '-'
         check10 = self.response_ms_2.repr()[0] != '-'
+        if not (check9 and check10):
+            return False
+
+        check1 = self.proof_same_log.verify(commitment_two, self.commitment_difference_bound_number, g, h,
+                                            commitment_one, h, profile=profile)
+        if not check1:
+            return False
+        check2 = self.proof_square.verify(com_pk_commitment_square, self.commitment_square, profile=profile)
+        if not check2:
+            return False
+        check3 = self.proof_square_2.verify(com_pk, self.commitment_m_3, profile=profile)
+        if not check3:
+            return False
+
+        commitment_m_1, commitment_m_2, commitment_m_3 = commitments_m
+        check7 = commitment_m_1.commitment ** challenge_1 * commitment_m_2.commitment * commitment_m_3 == \
+            g ** self.response_ms_1 * h ** self.response_rs_1
+        if not check7:
+            return False
+        check8 = commitment_m_1.commitment * commitment_m_2.commitment ** challenge_2 * commitment_m_3 == \
+            g ** self.response_ms_2 * h ** self.response_rs_2
+
+        return check8
+
+    @staticmethod
+    def com_pk_square(com_pk, commitment_difference):
+        """ com_pk with the commitment to the difference to the upper bound as first generator, without hashing new
+        generators """
+        com_pk_square = copy(com_pk)
+        com_pk_square.generators = [commitment_difference.commitment, com_pk.generators[1]]
+        return com_pk_square
+
+
+class RangeProofBundle:
+    """
+    The part of a ProofRange that does not depend on the committed number: the random root of the square and the
+    decomposition m_2, m_3 = m_4 ** 2 with their randoms, the blinding of the sub-proofs, the powers of the second
+    generator they are raised to, the commitments to m_2 and m_3 and the proof that m_3 is a square. With a bundle
+    at hand, ProofRange is left with six exponentiations instead of about thirty.
+
+    A bundle is single use: ProofRange marks it as consumed and refuses it afterwards.
+    """
+    def __init__(self, com_pk, security_parameter_2=None, profile=None):
+        self.profile = security_profile(profile)
+        if security_parameter_2 is None:
+            security_parameter_2 = self.profile.mask_bits
+        self.security_parameter_2 = security_parameter_2
+        self.consumed = False
+        statistical_bits = self.profile.statistical_bits
+        security_space = Bn.from_num(2).pow(security_parameter_2)
+        generator_h = com_pk.generators[1]
+
+        self.random_commitment_difference = security_space.random()
+        self.power_h_difference = generator_h ** self.random_commitment_difference
+        self.same_log = SameLogBlinding(com_pk.order, generator_h, generator_h, base_g_one=com_pk.generators[0],
+                                        security_parameter=statistical_bits)
+
+        self.root_to_square = security_space.random()
+        self.random_commitment_square = security_space.random()
+        self.power_h_square = generator_h ** self.random_commitment_square
+        self.square = SquareBlinding(com_pk, statistical_bits)
+
+        m_4 = security_space.random()
+        self.m_3 = m_4.pow(2)
+        self.m_2 = security_space.random()
+        self.random_m_3 = security_space.random()
+        self.random_m_2 = security_space.random()
+        self.commitment_m_2 = com_pk.commit([self.m_2], self.random_m_2)
+        self.commitment_m_3 = com_pk.commit([self.m_3], self.random_m_3).commitment
+        self.proof_square_2 = ProofSquare(com_pk, m_4, self.commitment_m_3, self.random_m_3, profile=self.profile)
+
+
+class RangeProofPrecomputation:
+    """
+    Offline phase of ProofRange: a background thread keeps a bounded queue of RangeProofBundles filled, so that the
+    latency of a proof once the number is known is only the part that depends on it. We use a thread rather than a
+    process, as bundles hold group elements, which cannot be pickled, and the work is in OpenSSL exponentiations.
+    """
+    def __init__(self, com_pk, size=16, security_parameter_2=None, profile=None):
+        self.com_pk = com_pk
+        self.security_parameter_2 = security_parameter_2
+        self.profile = profile
+        self.bundles = queue.Queue(maxsize=size)
+        self.stopped = threading.Event()
+        self.worker = threading.Thread(target=self.fill, daemon=True)
+        self.worker.start()
+
+    def fill(self):
+        while not self.stopped.is_set():
+            bundle = RangeProofBundle(self.com_pk, self.security_parameter_2, self.profile)
+            while not self.stopped.is_set():
+                try:
+                    self.bundles.put(bundle, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self):
+        """
+        Next precomputed bundle. If the producer fell behind, the bundle is computed here rather than waited for.
+
+        Example:
+            >>> G = FFGroup()
+            >>> com_pk = PublicKey(G, 1)
+            >>> order = com_pk.order
+            >>> precomputation = RangeProofPrecomputation(com_pk, size=2)
+            >>> lower_bound, upper_bound = Bn.from_num(0), Bn.from_num(2) ** 2048
+            >>> proofs = []
+            >>> for number in [Bn.from_num(7), Bn.from_num(2) ** 1024]:
+            ...     random_commitment = order.random()
+            ...     commitment = com_pk.commit([number], random_commitment)
+            ...     proof = ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound,
+            ...                        bundle=precomputation.get())
+            ...     proofs.append(proof.verify(com_pk, commitment, lower_bound, upper_bound))
+            >>> precomputation.stop()
+            >>> proofs
+            [True, True]
+
+            A bundle is only used once
+            >>> bundle = RangeProofBundle(com_pk)
+            >>> ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound, bundle=bundle).verify(com_pk, commitment, lower_bound, upper_bound)
+            True
+            >>> ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound, bundle=bundle)
+            Traceback (most recent call last):
+            ...
+            ValueError: The bundle was already used by another proof
+
+            A bundle only matches the security parameter it was prepared for
+            >>> ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound,
+            ...            security_parameter_2=1024, bundle=RangeProofBundle(com_pk))
+            Traceback (most recent call last):
+            ...
+            ValueError: The bundle was prepared for another security parameter
+            >>> ProofRange(com_pk, number, commitment, random_commitment, lower_bound, upper_bound,
+            ...            profile='standard-128', bundle=RangeProofBundle(com_pk, 2050 + 128))
+            Traceback (most recent call last):
+            ...
+            ValueError: The bundle was prepared for another security profile
+        """
+        try:
+            return self.bundles.get_nowait()
+        except queue.Empty:
+            return RangeProofBundle(self.com_pk, self.security_parameter_2, self.profile)
 
-        return check1 and check2 and check3 and check4 and check5 and check6 and check7 and check8 and check9 and check10
+    def stop(self):
+        self.stopped.set()
+        self.worker.join()
 
 
 if __name__=="__main__":
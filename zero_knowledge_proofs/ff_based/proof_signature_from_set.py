@@ -4,9 +4,13 @@ from time import time
 from primitives.algebra_lib import FFGroup
 from primitives.pedersen import PublicKey
 from primitives.polynomial import Polynomial
+from primitives.ring import KeyRing
+from primitives.verification_context import EarlyRejection, VerificationContext
 
 from zero_knowledge_proofs.ff_based.linear_algebra.modular_exponantiation import ModularExponantiation
+from zero_knowledge_proofs.ff_based.proof_one_out_of_many_ff import OneOutOfManyProof
 from zero_knowledge_proofs.ff_based.proof_poly_eval_ff import PolynomialProof
+from zero_knowledge_proofs.ff_based.security_profile import security_profile
 
 
 class ProofSignatureSet:
@@ -15,34 +19,85 @@ class ProofSignatureSet:
     which is among a set of other keys without disclosing which.
 
     We follow the construction explained in the paper ATLaS from Nappa et al.
-    """
 
-    def __init__(self, com_pk, signature, message, modulus, polynomial_list):
+    Membership of the committed key in the set can be proven with one of two engines: 'polynomial', the evaluation of
+    the ring polynomial at the key (PolynomialProof, the default), or 'one_out_of_many', a proof over commitments to
+    the moduli themselves (OneOutOfManyProof). The first one takes the coefficients of the ring polynomial and the
+    second one the moduli; a KeyRing provides both.
+
+    The security parameters of the range, square and same log proofs under the signature proof are given by a
+    SecurityProfile (see security_profile.PROFILES), 'default' unless another one is chosen. The verifier chooses the
+    profile it verifies under, and a proof made with another one does not verify. The membership proofs have no
+    parameters to trade.
+    """
+    ENGINES = ('polynomial', 'one_out_of_many')
+    # Public exponent of the keys of the ring, and bits of the bound of the ranges of the values committed in the
+    # signature proof
+    EXPONENT = 65537
+    UPPER_BOUND_MODULI = 2049
+    # Attributes of the compact form of the proof (see primitives.transcript)
+    TRANSCRIPT = ('commitment_modulo', 'signature_verification_proof', 'set_membership_proof')
+
+    def __init__(self, com_pk, signature, message, modulus, polynomial_list, engine='polynomial', profile=None,
+                 workers=None):
+        """
+        :param workers: Number of processes (or an Executor) generating the step proofs of the signature proof
+        """
+        if engine not in self.ENGINES:
+            raise ValueError("Unknown membership engine {0}".format(engine))
+        self.engine = engine
         self.order = com_pk.group.order()
         random_commitment_modulo = self.order.random()
         self.commitment_modulo = com_pk.commit([modulus], random_commitment_modulo)
         time_sig_verif = time()
         self.signature_verification_proof = ModularExponantiation(com_pk, signature, message, modulus,
                                                              self.commitment_modulo, random_commitment_modulo,
-                                                             upper_bound_moduli=2049)
+                                                             exponent=self.EXPONENT,
+                                                             upper_bound_moduli=self.UPPER_BOUND_MODULI,
+                                                             profile=profile, workers=workers)
 
         self.time_ful_sig_proof = time() - time_sig_verif
 
         time_membership_proof = time()
-        random_commitment_zero = Bn.from_num(0)
-        commitment_zero = com_pk.commit([Bn.from_num(0)], random_commitment_zero)
-
-        self.set_membership_proof = PolynomialProof(com_pk, polynomial_list, self.commitment_modulo, commitment_zero, modulus,
-                                               Bn.from_num(0), random_commitment_modulo, random_commitment_zero)
+        if self.engine == 'one_out_of_many':
+            self.set_membership_proof = OneOutOfManyProof(com_pk, polynomial_list, self.commitment_modulo, modulus,
+                                                          random_commitment_modulo)
+        else:
+            random_commitment_zero = Bn.from_num(0)
+            commitment_zero = com_pk.commit([Bn.from_num(0)], random_commitment_zero)
+
+            self.set_membership_proof = PolynomialProof(com_pk, polynomial_list, self.commitment_modulo, commitment_zero, modulus,
+                                                   Bn.from_num(0), random_commitment_modulo, random_commitment_zero)
         self.time_ful_membership_proof = time() - time_membership_proof
 
-    def verify(self, com_pk, message, polynomial_list):
+    def verify(self, com_pk, message, polynomial_list, context=None, profile=None, fail_fast=False, workers=None,
+               engine='polynomial'):
         """
         This contains the whole proof. First the prover shows that it owns a signature from an RSA key (without
         disclosing the key), and then it proves that this particular committed key is the root of a given polynomial.
 
+        polynomial_list can be the list of coefficients of the ring polynomial or a KeyRing, which holds them already
+        decoded and checked against the moduli of the ring. With the one-out-of-many engine, it is the list of moduli
+        or a KeyRing.
+
+        The membership engine is chosen by the verifier, as the meaning of polynomial_list depends on it, and a proof
+        made with another engine is rejected.
+
         Note that this proof can only be used for a set where all public keys of the set have the same exponent. In our
-        particular case, for e = 65537.
+        particular case, for e = EXPONENT = 65537, which the verifier checks the signature proof against.
+
+        The group equations of the whole proof tree are collected in a VerificationContext and checked together with a
+        single multi-exponentiation. If that check fails, the labels of the failing checks are kept in
+        verification_failures. Passing a context leaves deciding the deferred equations to the caller.
+
+        The proof is verified under the SecurityProfile (or its name) profile, the default one if not given, and never
+        under the one the prover chose. It sets the challenges of the sub-proofs and the size of the random weights of
+        the group equations, so proofs made with another profile are rejected.
+
+        With fail_fast, the verification stops at the first failing check. As the checks run from the cheapest to the
+        most expensive, a malformed proof is then rejected at a small part of the cost of a full verification.
+
+        workers (a number of processes or an Executor) splits the multi-exponentiation between processes.
 
         Example:
             >>> G = FFGroup()
@@ -56,18 +111,92 @@ class ProofSignatureSet:
             >>> proof = ProofSignatureSet(com_pk, signed_message, message, modulo, polynomial_list)
             >>> proof.verify(com_pk, message, polynomial_list)
             True
+
+            A verifier checking many proofs against the same ring builds a KeyRing once and reuses it
+            >>> key_ring = KeyRing(roots, order, polynomial_list)
+            >>> proof.verify(com_pk, message, key_ring)
+            True
+
+            which also works on the prover side
+            >>> ProofSignatureSet(com_pk, signed_message, message, modulo, key_ring).verify(com_pk, message, key_ring)
+            True
+
+            Or the one-out-of-many membership engine
+            >>> proof = ProofSignatureSet(com_pk, signed_message, message, modulo, key_ring, engine='one_out_of_many')
+            >>> proof.verify(com_pk, message, key_ring, engine='one_out_of_many')
+            True
+
+            A verifier expecting the polynomial engine does not take it as a proof over the coefficients
+            >>> proof.verify(com_pk, message, polynomial_list), proof.verification_failures
+            (False, ['membership'])
+
+            The compact form, without the data the verifier recomputes, is what a prover sends
+            >>> from primitives.transcript import compact, transcript_size
+            >>> compact_proof = compact(proof)
+            >>> compact_proof.verify(com_pk, message, key_ring, engine='one_out_of_many')
+            True
+            >>> transcript_size(compact_proof) == transcript_size(proof)
+            True
+
+            A proof for another message is rejected, and the failing check is reported
+            >>> proof.verify(com_pk, message + 1, key_ring, engine='one_out_of_many'), proof.verification_failures
+            (False, ['signature/result'])
+
+            With a lighter profile for evaluation, which the verifier must use as well
+            >>> proof = ProofSignatureSet(com_pk, signed_message, message, modulo, polynomial_list, profile='eval-80')
+            >>> proof.verify(com_pk, message, key_ring, profile='eval-80')
+            True
+            >>> proof.verify(com_pk, message, key_ring)
+            False
+
+            A proof with a negative response in a range proof is rejected before any exponentiation
+            >>> proof.signature_verification_proof.range_proofs[4].response_ms_1 = Bn.from_num(-1)
+            >>> proof.verify(com_pk, message, key_ring, profile='eval-80', fail_fast=True), proof.verification_failures
+            (False, ['signature/range_4/positive_1'])
         """
+        own_context = context is None
+        if own_context:
+            context = VerificationContext(com_pk.group, security_profile(profile).weight_bits, fail_fast, workers)
+
+        # Checks in order of cost: those decided right away in the whole signature proof (structure and signs) while
+        # its equations are collected, then the membership proof, and last the multi-exponentiation of the collected
+        # equations
         time_verif_sig = time()
-        check1 = self.signature_verification_proof.verify(com_pk, message, self.commitment_modulo)
-        time_membership_proof = time()
+        time_membership = 0
+        try:
+            verified = self.signature_verification_proof.verify(com_pk, message, self.commitment_modulo,
+                                                                exponent=self.EXPONENT,
+                                                                context=context.child('signature'), profile=profile,
+                                                                upper_bound_moduli=self.UPPER_BOUND_MODULI)
+            time_membership_proof = time()
+            verified = context.require('membership', self.verify_membership(com_pk, polynomial_list,
+                                                                                         engine)) and verified
+            time_membership = time() - time_membership_proof
+            if own_context:
+                verified = context.verify() and verified
+        except EarlyRejection:
+            if not own_context:
+                raise
+            verified = False
+        if own_context:
+            self.verification_failures = context.failures
+        self.time_ful_sig_verif = time() - time_verif_sig - time_membership
+        self.time_ful_membership_verif = time_membership
+
+        return verified
+
+    def verify_membership(self, com_pk, polynomial_list, engine='polynomial'):
+        if engine not in self.ENGINES:
+            raise ValueError("Unknown membership engine {0}".format(engine))
+        if engine == 'one_out_of_many':
+            if not isinstance(self.set_membership_proof, OneOutOfManyProof):
+                return False
+            return self.set_membership_proof.verify(com_pk, polynomial_list, self.commitment_modulo)
+        if not isinstance(self.set_membership_proof, PolynomialProof):
+            return False
         random_commitment_zero = Bn.from_num(0)
         commitment_zero = com_pk.commit([Bn.from_num(0)], random_commitment_zero)
-        check2 = self.set_membership_proof.verify(com_pk, polynomial_list, self.commitment_modulo, commitment_zero)
-        time_end = time()
-        self.time_ful_sig_verif = time_membership_proof - time_verif_sig
-        self.time_ful_membership_verif = time_end - time_membership_proof
-
-        return check1 and check2
+        return self.set_membership_proof.verify(com_pk, polynomial_list, self.commitment_modulo, commitment_zero)
 
 def dummy_data():
     signed_message = Bn.from_decimal(
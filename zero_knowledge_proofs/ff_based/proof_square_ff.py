@@ -2,6 +2,8 @@ from primitives.algebra_lib import FFGroup, FFElement
 from petlib.bn import Bn
 from primitives.pedersen import PublicKey, Commitment
 from primitives.hash_function import compute_challenge
+from primitives.verification_context import VerificationContext
+from zero_knowledge_proofs.ff_based.security_profile import security_profile
 
 
 class ProofSquare:
@@ -9,13 +11,27 @@ class ProofSquare:
     Efficient Proofs that a Committed Number Lies in an Interval from Fadrice Boudot. Note that here we are
     working with cyclic groups over elliptic curves. This code should be changed if we want to use it over finite
     fields. """
-    def __init__(self, com_pk, sqr_root, commitment_sqr, random_commitment, security_parameter=128):
+    # Attributes of the compact form of the proof (see primitives.transcript)
+    TRANSCRIPT = ('commitment_sqr_root', 'proof_same_log')
+
+    def __init__(self, com_pk, sqr_root, commitment_sqr, random_commitment, security_parameter=None, blinding=None,
+                 profile=None):
+        """
+        :param security_parameter: Defaults to the statistical_bits of the profile
+        :param blinding: SquareBlinding prepared for com_pk ahead of time. If not given, it is drawn here.
+        :param profile: SecurityProfile, or its name, of the proof. The default one if not given.
+        """
         self.order = com_pk.order
         self.group = com_pk.group
 
+        profile = security_profile(profile)
+        if security_parameter is None:
+            security_parameter = profile.statistical_bits
         self.security_space = self.order * Bn.from_num(2).mod_pow(security_parameter, self.order)
-        random_commitment_sqr_root = self.security_space.random()
-        self.commitment_sqr_root = com_pk.commit([sqr_root], random_commitment_sqr_root)
+        if blinding is None:
+            blinding = SquareBlinding(com_pk, security_parameter)
+        random_commitment_sqr_root = blinding.random_commitment_sqr_root
+        self.commitment_sqr_root = Commitment(com_pk.generators[0] ** sqr_root * blinding.power_h_sqr_root)
 
         random_commitment_sqr = (random_commitment - sqr_root * random_commitment_sqr_root).mod(self.order)
 
@@ -24,18 +40,21 @@ class ProofSquare:
         generator_com_pk_1 = com_pk.generators[0]
         generator_com_pk_2 = com_pk.generators[1]
 
-        self.commitment_sqr = Commitment(generator_1 ** sqr_root * generator_com_pk_2 ** random_commitment_sqr)
+        # generator_1 ** sqr_root * generator_com_pk_2 ** random_commitment_sqr opens to the same value and random as
+        # commitment_sqr, so there is no need to compute it
+        self.commitment_sqr = commitment_sqr if type(commitment_sqr) == Commitment else Commitment(commitment_sqr)
 
         # Now we need to proof that commitment_sqr_root and commitment_sqr hide the same value
 
         self.proof_same_log = ProofSameLog(
             sqr_root, random_commitment_sqr_root, random_commitment_sqr, generator_com_pk_1, generator_com_pk_2,
-            generator_1, generator_com_pk_2, self.order
+            generator_1, generator_com_pk_2, self.order, blinding=blinding.same_log, profile=profile
         )
 
-    def verify(self, com_pk, commitment_sqr):
+    def verify(self, com_pk, commitment_sqr, context=None, profile=None):
         """
-        Verification of the proof
+        Verification of the proof, optionally deferring its group equations to a VerificationContext. The verifier
+        gives the SecurityProfile (or its name) the proof must have been made with, the default one if not given.
 
         Example:
             >>> G = FFGroup()
@@ -63,35 +82,92 @@ class ProofSquare:
 
         return self.proof_same_log.verify(
             self.commitment_sqr_root, commitment_sqr, com_pk.generators[0], com_pk.generators[1],
-            self.commitment_sqr_root.commitment, com_pk.generators[1]
+            self.commitment_sqr_root.commitment, com_pk.generators[1], context, profile
         )
 
 
+class SquareBlinding:
+    """
+    Randomness of a ProofSquare and the powers of the second generator of com_pk it needs, which do not depend on
+    the square. Preparing it ahead of time leaves three exponentiations to the proof itself.
+    """
+    def __init__(self, com_pk, security_parameter=128):
+        order = com_pk.order
+        security_space = order * Bn.from_num(2).mod_pow(security_parameter, order)
+        self.random_commitment_sqr_root = security_space.random()
+        self.power_h_sqr_root = com_pk.generators[1] ** self.random_commitment_sqr_root
+        self.same_log = SameLogBlinding(order, com_pk.generators[1], com_pk.generators[1],
+                                        security_parameter=security_parameter)
+
+
+class SameLogBlinding:
+    """
+    Random hiding exponents of a ProofSameLog, together with the powers of base_h_one and base_h_two (and optionally
+    base_g_one) they are raised to, so that they can be prepared before the statement is known. The proof must then
+    use the same bases.
+    """
+    def __init__(self, order, base_h_one, base_h_two, base_g_one=None, security_parameter=128):
+        security_space = order * Bn.from_num(2).mod_pow(security_parameter, order)
+        self.random_hiding_exponent = security_space.random()
+        self.random_hiding_commitment_one = security_space.random()
+        self.random_hiding_commitment_two = security_space.random()
+
+        self.power_h_one = base_h_one ** self.random_hiding_commitment_one
+        self.power_h_two = base_h_two ** self.random_hiding_commitment_two
+        self.power_g_one = None if base_g_one is None else base_g_one ** self.random_hiding_exponent
+
+
 class ProofSameLog:
     """
     Proof that two commitments have the same discrete log. We need to work with bases that belong to the same
     group
     """
-    def __init__(self, exponent, random_commitment_one, random_commitment_two, base_g_one, base_h_one, base_g_two, base_h_two, order, security_parameter=128):
+    # Attributes of the compact form of the proof (see primitives.transcript). The challenge follows from the
+    # announcements.
+    TRANSCRIPT = ('announcement_one', 'announcement_two', 'response_exponent', 'response_random_one',
+                  'response_random_two')
+
+    def __init__(self, exponent, random_commitment_one, random_commitment_two, base_g_one, base_h_one, base_g_two, base_h_two, order, security_parameter=None, blinding=None, profile=None):
+        """
+        :param security_parameter: Defaults to the statistical_bits of the profile
+        :param blinding: SameLogBlinding prepared for base_h_one and base_h_two (and base_g_one if it holds its
+        power). If not given, it is drawn here.
+        :param profile: SecurityProfile, or its name, setting the security parameter and the size of the challenge.
+        The default one if not given.
+        """
+        profile = security_profile(profile)
+        if security_parameter is None:
+            security_parameter = profile.statistical_bits
         self.order = order
         self.security_space = self.order * Bn.from_num(2).mod_pow(security_parameter, self.order)
 
-        random_hiding_exponent = self.security_space.random()
-        random_hiding_commitment_one = self.security_space.random()
-        random_hiding_commitment_two = self.security_space.random()
+        if blinding is None:
+            blinding = SameLogBlinding(order, base_h_one, base_h_two, security_parameter=security_parameter)
+        random_hiding_exponent = blinding.random_hiding_exponent
+        random_hiding_commitment_one = blinding.random_hiding_commitment_one
+        random_hiding_commitment_two = blinding.random_hiding_commitment_two
+        power_g_one = blinding.power_g_one
+        if power_g_one is None:
+            power_g_one = base_g_one ** random_hiding_exponent
 
-        commitment_one = Commitment(base_g_one ** random_hiding_exponent * base_h_one ** random_hiding_commitment_one)
-        commitment_two = Commitment(base_g_two ** random_hiding_exponent * base_h_two ** random_hiding_commitment_two)
+        commitment_one = Commitment(power_g_one * blinding.power_h_one)
+        commitment_two = Commitment(base_g_two ** random_hiding_exponent * blinding.power_h_two)
 
-        self.challenge = compute_challenge([commitment_one] + [commitment_two], self.order)
+        # Kept in the proof so that the verification equations can be deferred to a VerificationContext
+        self.announcement_one = commitment_one
+        self.announcement_two = commitment_two
+        self.challenge = compute_challenge([commitment_one] + [commitment_two], self.challenge_space(order, profile))
 
         self.response_exponent = random_hiding_exponent + self.challenge * exponent
         self.response_random_one = random_hiding_commitment_one + self.challenge * random_commitment_one
         self.response_random_two = random_hiding_commitment_two + self.challenge * random_commitment_two
 
-    def verify(self, commitment_one, commitment_two, base_g_one, base_h_one, base_g_two, base_h_two):
+    def verify(self, commitment_one, commitment_two, base_g_one, base_h_one, base_g_two, base_h_two, context=None,
+               profile=None):
         """
-        Verification.
+        Verification. The challenge is derived from the announcements of the proof, in the challenge space of the
+        SecurityProfile (or its name) given by the verifier, the default one if not given. Given a
+        VerificationContext, the two equations checking the announcements are deferred to the context.
         Example:
             >>> G = FFGroup()
             >>> com_pk = PublicKey(G, 1)
@@ -106,6 +182,19 @@ class ProofSameLog:
             >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment)
             True
 
+            >>> context = VerificationContext(G)
+            >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment, context)
+            True
+            >>> context.verify()
+            True
+
+            The size of the challenges is set by the verifier, and a proof with shorter ones is rejected
+            >>> proof = ProofSameLog(shared_exponent, random_commitment, random_commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment, order, profile='eval-80')
+            >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment, profile='eval-80')
+            True
+            >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment)
+            False
+
             Should not verify
             >>> shared_exponent = Bn.from_num(27)
             >>> random_commitment = order.random()
@@ -117,6 +206,12 @@ class ProofSameLog:
             >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment)
             False
 
+            >>> context = VerificationContext(G)
+            >>> proof.verify(commitment_one, commitment_two, com_pk.generators[0], com_pk.generators[1], commitment_one.commitment, commitment_one.commitment, context.child('same_log'))
+            True
+            >>> context.verify(), context.failures
+            (False, ['same_log/announcement_two'])
+
 
         """
         if type(commitment_one) == Commitment:
@@ -125,14 +220,30 @@ class ProofSameLog:
         if type(commitment_two) == Commitment:
             commitment_two = commitment_two.commitment
 
-        return self.challenge == compute_challenge(
-            [base_g_one ** self.response_exponent *
-             base_h_one ** self.response_random_one *
-             commitment_one ** self.challenge.int_neg().mod(self.order)] +
-            [base_g_two ** self.response_exponent *
-             base_h_two ** self.response_random_two *
-             commitment_two ** self.challenge.int_neg().mod(self.order)], self.order
-        )
+        order = base_g_one.order
+        challenge = compute_challenge([self.announcement_one, self.announcement_two],
+                                      self.challenge_space(order, security_profile(profile)))
+        if context is not None:
+            context.check('announcement_one', [base_g_one, base_h_one, commitment_one, self.announcement_one],
+                          [self.response_exponent, self.response_random_one, challenge.int_neg(), -1])
+            context.check('announcement_two', [base_g_two, base_h_two, commitment_two, self.announcement_two],
+                          [self.response_exponent, self.response_random_two, challenge.int_neg(), -1])
+            return True
+
+        # Rather than recomputing the announcements with commitment ** (-challenge mod order), a full size exponent,
+        # we check them as g ** z * h ** z' == announcement * commitment ** challenge, where the challenge stays short
+        response_exponent = self.response_exponent.mod(order)
+        return base_g_one ** response_exponent * base_h_one ** self.response_random_one == \
+            self.announcement_one.commitment * commitment_one ** challenge and \
+            base_g_two ** response_exponent * base_h_two ** self.response_random_two == \
+            self.announcement_two.commitment * commitment_two ** challenge
+
+    @staticmethod
+    def challenge_space(order, profile):
+        """ Challenges are reduced modulo order unless the SecurityProfile profile asks for shorter ones """
+        if profile.challenge_bits is None:
+            return order
+        return Bn.from_num(2).pow(profile.challenge_bits)
 
 if __name__ == '__main__':
     import doctest
@@ -0,0 +1,67 @@
+class SecurityProfile:
+    """
+    Named set of the security parameters of the FF range and square proofs, so that the latency/security trade-off
+    is picked as a whole rather than by editing defaults in each proof.
+
+    :param challenge_bits: Size of the challenges of ProofSameLog (None for challenges modulo the group order) and of
+    the random weights of batched verification
+    :param statistical_bits: Slack of the hiding randoms of ProofSquare and ProofSameLog (their security_parameter)
+    :param range_challenge_bits: Size of the challenges of ProofRange (its security_parameter_1)
+    :param mask_bits: Size of the random root and decomposition of ProofRange (its security_parameter_2), which must
+    exceed the size of the ranges of the modular proofs, up to [-2 ** 2049, 2 ** 2049]
+    """
+    def __init__(self, name, challenge_bits, statistical_bits, range_challenge_bits, mask_bits):
+        self.name = name
+        self.challenge_bits = challenge_bits
+        self.statistical_bits = statistical_bits
+        self.range_challenge_bits = range_challenge_bits
+        self.mask_bits = mask_bits
+
+    def __eq__(self, other):
+        return isinstance(other, SecurityProfile) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return "SecurityProfile({0})".format(self.name)
+
+    @property
+    def weight_bits(self):
+        return 128 if self.challenge_bits is None else self.challenge_bits
+
+
+# 'default' are the parameters the proofs always had. In the others, the masks exceed the range by the statistical
+# parameter.
+PROFILES = {
+    'default': SecurityProfile('default', None, 128, 120, 2050),
+    'eval-80': SecurityProfile('eval-80', 80, 80, 80, 2050),
+    'standard-112': SecurityProfile('standard-112', 112, 112, 112, 2050 + 112),
+    'standard-128': SecurityProfile('standard-128', 128, 128, 128, 2050 + 128),
+}
+
+
+def security_profile(profile=None):
+    """
+    SecurityProfile given by name, or as is. None stands for the default profile.
+
+    Example:
+        >>> security_profile('eval-80').statistical_bits
+        80
+        >>> security_profile() == security_profile(PROFILES['default'])
+        True
+        >>> security_profile('eval-64')
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown security profile eval-64, expecting one of default, eval-80, standard-112, standard-128
+    """
+    if profile is None:
+        return PROFILES['default']
+    if isinstance(profile, SecurityProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError("Unknown security profile {0}, expecting one of {1}".format(profile, ", ".join(PROFILES)))
+    return PROFILES[profile]
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,247 @@
+from petlib.bn import Bn
+
+from primitives.algebra_lib import FFGroup
+from primitives.pedersen import PublicKey, Commitment
+from primitives.polynomial import Polynomial
+from primitives.ring import KeyRing
+
+
+class PolynomialProofBase:
+    """
+    Parts of PolynomialProof that do not depend on the group: the folds over the coefficients, the shape of the proof
+    and the batch verification. The proofs over finite fields (proof_poly_eval_ff) and over elliptic curves
+    (proof_poly_eval_ec) build on it. Everything the verifier reduces is reduced modulo the order of its own com_pk,
+    never modulo the order stored by the prover.
+    """
+    # With workers, the coefficients are folded by chunks of 2^CHUNK_BITS in a process pool, so only polynomials with
+    # more coefficients than that are folded in parallel
+    CHUNK_BITS = 12
+
+    def hidden_polynomial_computation(self, powers, random_hidden, workers=None):
+        """
+        Evaluate polynomial of step 3 in the algorithm description. Coefficient i contributes
+        polynomial[i] * prod_j (random_hidden[j] + powers[j] X if bit j of i is set, else X), and we keep the
+        coefficients of X^0 ... X^bit_length. Computed by folding the coefficients over the bits of their index.
+
+        :param powers: Square ladder of the value to evaluate (see square_ladder)
+        :param random_hidden: Randomness hiding each bit of the index
+        :param workers: Number of processes (or an Executor) to fold chunks of the coefficients in parallel
+        """
+        factors = [([Bn.from_num(0), Bn.from_num(1)], [random_hidden[j], powers[j]]) for j in range(self.bit_length + 1)]
+
+        return Polynomial.fold_linear_factors(self.polynomial, factors, self.order, workers=workers,
+                                              chunk_bits=self.CHUNK_BITS)[:self.bit_length + 1]
+
+    @staticmethod
+    def commit_all(com_pk, openings, workers=None):
+        """
+        Commitments to the (value, random) openings. With workers, the exponentiations run in a pool of threads, which
+        is enough as petlib releases the GIL while in OpenSSL.
+        """
+        if not workers:
+            return [com_pk.commit([value], random) for value, random in openings]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers if isinstance(workers, int) else None) as executor:
+            return list(executor.map(lambda opening: com_pk.commit([opening[0]], opening[1]), openings))
+
+    def product_rhs_calculation(self, polynomial_list, order, workers=None):
+        """
+        Sum over the coefficients of polynomial_list[i] * prod_j (response_random_hidden[j] if bit j of i is set, else
+        challenge), computed by folding the coefficients one bit at a time (see Polynomial.fold_multilinear). None if
+        polynomial_list has more coefficients than the indices of the proof cover, in which case the proof does not
+        verify.
+        """
+        points = self.product_rhs_points(order)
+        if len(polynomial_list) > 2 ** len(points):
+            return None
+        return Polynomial.fold_multilinear(polynomial_list, points, order, workers=workers,
+                                           chunk_bits=self.CHUNK_BITS)
+
+    def product_rhs_points(self, order):
+        return [(self.challenge.mod(order), response.mod(order)) for response in self.response_random_hidden]
+
+    def well_formed(self, bit_length, commitment_to_eval):
+        """
+        Check that the proof has the shape expected for a polynomial whose indices take bit_length + 1 bits, and that
+        it is about commitment_to_eval.
+        """
+        lengths = [len(self.commitments), len(self.commitments_hidden), len(self.commitments_deltas),
+                   len(self.response_random_hidden), len(self.response_random_commitments),
+                   len(self.commitments_exponantiations) + 1, len(self.response_random_exponantiations) + 1]
+
+        return self.bit_length == bit_length and all(length == bit_length + 1 for length in lengths) and \
+            self.commitments[0] == commitment_to_eval
+
+    def in_group(self, group, commitment_eval):
+        """ Whether the commitments of the proof and commitment_eval are elements of the group of prime order """
+        raise NotImplementedError
+
+    @classmethod
+    def batch_verify(cls, proofs, polynomial_list, com_pk, commitments_to_eval, commitments_eval, weight_bits=128):
+        """
+        Verify several proofs of evaluation of the same polynomial (typically membership proofs against one key ring)
+        and return the indices of the proofs that do not verify, i.e. an empty list if all of them do.
+
+        The equations of check1, check2 and check3 of every proof are raised to small random weights and multiplied
+        together, so that all of them are checked with a single multi-exponentiation: the generators and each
+        commitment appear only once, with the sum of their exponents across equations. The product_rhs of all proofs
+        is computed in a single pass over the coefficients (see Polynomial.fold_multilinear_batch). A wrong equation
+        goes unnoticed with probability about 2^-weight_bits. If the combined check fails, the proofs are split in
+        halves that are checked again, until the offending proofs are isolated.
+
+        The weights only bind equations between elements of the group of prime order, so proofs with commitments out
+        of it (see in_group) are rejected before any combination.
+
+        Example:
+            >>> from zero_knowledge_proofs.ff_based.proof_poly_eval_ff import PolynomialProof
+            >>> G = FFGroup()
+            >>> com_pk = PublicKey(G, 1)
+            >>> order = com_pk.order
+            >>> roots = [order.random() for _ in range(5)]
+            >>> key_ring = KeyRing(roots, order)
+            >>> proofs, commitments_to_eval, commitments_eval = [], [], []
+            >>> for value_to_eval in roots[:3] + [order.random()] + roots[3:]:
+            ...     random_to_eval, random_eval = order.random(), order.random()
+            ...     commitments_to_eval.append(com_pk.commit([value_to_eval], random_to_eval))
+            ...     commitments_eval.append(com_pk.commit([Bn.from_num(0)], random_eval))
+            ...     proofs.append(PolynomialProof(com_pk, key_ring, commitments_to_eval[-1], commitments_eval[-1],
+            ...                                   value_to_eval, Bn.from_num(0), random_to_eval, random_eval))
+            >>> PolynomialProof.batch_verify(proofs, key_ring, com_pk, commitments_to_eval, commitments_eval)
+            [3]
+            >>> [proof.verify(com_pk, key_ring, commitment_to_eval, commitment_eval)
+            ...  for proof, commitment_to_eval, commitment_eval in zip(proofs, commitments_to_eval, commitments_eval)]
+            [True, True, True, False, True, True]
+            >>> del proofs[3], commitments_to_eval[3], commitments_eval[3]
+            >>> PolynomialProof.batch_verify(proofs, key_ring, com_pk, commitments_to_eval, commitments_eval)
+            []
+
+            A commitment multiplied by the element of order two is not missed by an even weight
+            >>> from primitives.algebra_lib import FFElement
+            >>> minus_one = FFElement(G.modulo - 1, G.modulo, order)
+            >>> proofs[0].commitments_hidden[0] = Commitment(proofs[0].commitments_hidden[0].commitment * minus_one)
+            >>> PolynomialProof.batch_verify(proofs, key_ring, com_pk, commitments_to_eval, commitments_eval)
+            [0]
+        """
+        if isinstance(polynomial_list, KeyRing):
+            polynomial_list = polynomial_list.coefficients
+        bit_length = cls.index_bit_length(len(polynomial_list))
+
+        entries = list(zip(range(len(proofs)), proofs, commitments_eval))
+        invalid = [index for index, proof, commitment_eval in entries
+                   if not proof.well_formed(bit_length, commitments_to_eval[index]) or
+                   not proof.in_group(com_pk.group, commitment_eval)]
+        candidates = [entry for entry in entries if entry[0] not in invalid]
+
+        def locate(batch):
+            if not batch or cls.combined_check(batch, polynomial_list, com_pk, weight_bits):
+                return []
+            if len(batch) == 1:
+                return [batch[0][0]]
+            return locate(batch[:len(batch) // 2]) + locate(batch[len(batch) // 2:])
+
+        return sorted(invalid + locate(candidates))
+
+    @staticmethod
+    def combined_check(batch, polynomial_list, com_pk, weight_bits):
+        """
+        Random linear combination of the verification equations of the (index, proof, commitment_eval) entries of
+        batch. Each equation is written as (product of commitments) * g^-x * h^-y == 1, so the combination is a single
+        product that must be the identity.
+        """
+        order = com_pk.order
+        weight_bound = Bn.from_num(2).pow(weight_bits)
+        product_rhs_values = Polynomial.fold_multilinear_batch(
+            polynomial_list, [proof.product_rhs_points(order) for _, proof, _ in batch], order)
+
+        bases, exponents = [], []
+        exponent_g, exponent_h = Bn.from_num(0), Bn.from_num(0)
+        for (_, proof, commitment_eval), product_rhs in zip(batch, product_rhs_values):
+            challenge = proof.challenge.mod(order)
+            weights_check1 = [weight_bound.random() for _ in range(proof.bit_length + 1)]
+            weights_check2 = [weight_bound.random() for _ in range(proof.bit_length)] + [Bn.from_num(0)]
+            weight_check3 = weight_bound.random()
+
+            for i in range(proof.bit_length + 1):
+                # commitments[i] appears in check1[i], check2[i] and check2[i - 1]
+                exponent = weights_check1[i].mod_mul(challenge, order)
+                exponent = exponent.mod_sub(weights_check2[i].mod_mul(proof.response_random_hidden[i], order), order)
+                if i > 0:
+                    exponent = exponent.mod_add(weights_check2[i - 1].mod_mul(challenge, order), order)
+                bases += [proof.commitments[i], proof.commitments_hidden[i]]
+                exponents += [exponent, weights_check1[i]]
+                exponent_g = exponent_g.mod_sub(weights_check1[i].mod_mul(proof.response_random_hidden[i], order), order)
+                exponent_h = exponent_h.mod_sub(weights_check1[i].mod_mul(proof.response_random_commitments[i], order),
+                                                order)
+
+            for i in range(proof.bit_length):
+                bases.append(proof.commitments_exponantiations[i])
+                exponents.append(weights_check2[i])
+                exponent_h = exponent_h.mod_sub(weights_check2[i].mod_mul(proof.response_random_exponantiations[i],
+                                                                          order), order)
+
+            power = weight_check3
+            for i in range(proof.bit_length + 1):
+                bases.append(proof.commitments_deltas[i])
+                exponents.append(power)
+                power = power.mod_mul(challenge, order)
+            bases.append(commitment_eval)
+            exponents.append(power)
+            exponent_g = exponent_g.mod_sub(weight_check3.mod_mul(product_rhs, order), order)
+            exponent_h = exponent_h.mod_sub(weight_check3.mod_mul(proof.response_random_deltas, order), order)
+
+        bases += [Commitment(generator) for generator in com_pk.generators]
+        exponents += [exponent_g, exponent_h]
+
+        return com_pk.multi_exponentiation(bases, exponents) == com_pk.commit([Bn.from_num(0)], Bn.from_num(0))
+
+    @staticmethod
+    def index_bit_length(length):
+        """
+        The proof decomposes the indices 0 ... length - 1 of the coefficients in bit_length + 1 bits. We take the
+        fewest bits that fit the degree, so a polynomial just above a power of two is not handled as one of twice its
+        degree. Indices beyond the degree correspond to zero coefficients, which the folds skip.
+
+        Example:
+            >>> [PolynomialProofBase.index_bit_length(length) for length in [2, 5, 513, 514, 1025]]
+            [0, 2, 9, 9, 10]
+        """
+        return max(1, (length - 1).bit_length()) - 1
+
+    @staticmethod
+    def square_ladder(value, length, order):
+        """
+        Compute value^(2^i) mod order for i = 0 ... length - 1 by repeated squaring, so that intermediate values never
+        grow beyond the size of the order.
+
+        Example:
+            >>> PolynomialProofBase.square_ladder(Bn.from_num(3), 4, Bn.from_num(1000))
+            [3, 9, 81, 561]
+        """
+        powers = [value.mod(order)]
+        for _ in range(length - 1):
+            powers.append(powers[-1].mod_mul(powers[-1], order))
+        return powers
+
+    @staticmethod
+    def binary_repr_int(a, length):
+        """
+        Get the binary representation of a number
+        :param a: Value to converto to binary
+        :param length: desired length of the binary string (padded with zeros)
+
+        Order is with lsb in position 0
+        Example:
+            >>> PolynomialProofBase.binary_repr_int(3, 4)
+            [1, 1, 0, 0]
+        """
+        bin_number = [int(x) for x in bin(a)[2:]]
+        to_extend = [0] * (length - len(bin_number))
+        to_extend.extend(bin_number)
+        return to_extend[::-1]
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()